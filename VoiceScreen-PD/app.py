@@ -1,194 +1,438 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify, url_for
 import numpy as np
+import hashlib
+import importlib.util
+import io
+import logging
 import os
-import tempfile
-from werkzeug.utils import secure_filename
-
-# Try to import required packages, with fallbacks
-try:
-    import librosa
-    librosa_available = True
-    print("✅ librosa loaded successfully")
-except ImportError:
-    librosa_available = False
-    print("⚠️  librosa not available - using simulated feature extraction")
-
-try:
-    import joblib
-    # Try to load model
-    try:
-        model = joblib.load('model/parkinson_model.pkl')
-        scaler = joblib.load('model/feature_scaler.pkl')
-        model_loaded = True
-        print("✅ Model loaded successfully")
-    except:
-        model = None
-        scaler = None
-        model_loaded = False
-        print("⚠️  Could not load model files - using simulated predictions")
-except ImportError:
-    joblib_available = False
-    model_loaded = False
-    print("⚠️  joblib not available - using simulated predictions")
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from instrumentation import Metrics, configure_logging
+
+# Queue-backed logger; LOG_LEVEL=WARNING silences the per-request messages
+logger = configure_logging(os.environ.get('LOG_LEVEL', 'INFO'))
+
+# librosa is only located here; its numba/scipy machinery loads on first use,
+# which the warm-up below triggers off the import path
+librosa_available = importlib.util.find_spec('librosa') is not None
+if not librosa_available:
+    logger.warning("⚠️  librosa not available - using simulated feature extraction")
+
+from audio_io import (RESAMPLE_METHODS, audio_info, decode_audio, read_blocks, resample,
+                      source_size, trim_bounds, trim_silence)
+from feature_cache import (FeatureCache, audio_fingerprint, fingerprint_blocks, seeded_rng,
+                           source_fingerprint)
+from client_features import InvalidFrameStats, parse_frame_stats, pcm_samples, verify_frame_stats
+from feature_engine import FRAME_STATS, FeatureEngine, mel_filterbank
+from feature_schema import FEATURE_NAMES, N_MFCC, feature_matrix, feature_vector, missing_features
+from job_queue import JobQueue, QueueFull
+from model_registry import ModelRegistry
+from session_tasks import SESSION_TASKS_VERSION, TASK_EXTRACTORS, TASKS
+from response_format import NotAcceptable, OrjsonProvider, encode, negotiate, shape_body
+from startup import Warmup
+from streaming import BlockExtractor, StreamSessions, StreamTooLong
 
 app = Flask(__name__)
+# orjson for every jsonify() when it is installed
+app.json = OrjsonProvider(app)
 app.config['SECRET_KEY'] = 'voice-screen-pd-hackathon-2024'
-app.config['UPLOAD_FOLDER'] = 'static/audio'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['PITCH_BACKEND'] = os.environ.get('PITCH_BACKEND', 'fast')  # 'fast' (YIN) or 'accurate' (pyin)
+app.config['RESAMPLE_METHOD'] = os.environ.get('RESAMPLE_METHOD', 'hq')  # hq, polyphase or native
+app.config['TRIM_SILENCE_DB'] = float(os.environ.get('TRIM_SILENCE_DB', 0))  # 0 disables trimming
+app.config['VAD_ENABLED'] = os.environ.get('VAD_ENABLED', '1').lower() in ('1', 'true', 'yes')
+app.config['MODEL_REGISTRY_PATH'] = os.environ.get('MODEL_REGISTRY_PATH', 'model/registry')
+app.config['MODEL_RELOAD_INTERVAL'] = float(os.environ.get('MODEL_RELOAD_INTERVAL', 10))  # seconds, 0 disables
+app.config['FEATURE_CACHE_MAX_BYTES'] = int(os.environ.get('FEATURE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+app.config['FEATURE_CACHE_PATH'] = os.environ.get('FEATURE_CACHE_PATH')  # optional sqlite file
+app.config['BATCH_MAX_FILES'] = int(os.environ.get('BATCH_MAX_FILES', 64))
+app.config['BATCH_WORKERS'] = int(os.environ.get('BATCH_WORKERS', os.cpu_count() or 1))
+app.config['ANALYSIS_WORKERS'] = int(os.environ.get('ANALYSIS_WORKERS', 2))
+app.config['JOB_QUEUE_MAX_DEPTH'] = int(os.environ.get('JOB_QUEUE_MAX_DEPTH', 32))
+app.config['JOB_QUEUE_PATH'] = os.environ.get('JOB_QUEUE_PATH')  # optional sqlite file
+# Set by gunicorn.conf.py: this process only preloads the app for forked
+# workers, so the model watcher and job recovery wait for after_fork()
+app.config['PREFORK'] = os.environ.get('PREFORK', '0').lower() in ('1', 'true', 'yes')
+app.config['STREAM_MAX_SESSIONS'] = int(os.environ.get('STREAM_MAX_SESSIONS', 64))
+app.config['STREAM_IDLE_TIMEOUT'] = int(os.environ.get('STREAM_IDLE_TIMEOUT', 120))  # seconds
+# Streams keep per-frame values until finish, so their length is capped
+app.config['STREAM_MAX_SECONDS'] = float(os.environ.get('STREAM_MAX_SECONDS', 300))
+app.config['STARTUP_MODE'] = os.environ.get('STARTUP_MODE', 'background')  # eager, background or lazy
+app.config['PREWARM'] = os.environ.get('PREWARM', '0').lower() in ('1', 'true', 'yes')
+app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '1').lower() in ('1', 'true', 'yes')
+app.config['COMPUTE_SLOTS'] = int(os.environ.get('COMPUTE_SLOTS', 1))  # concurrent extractions per process
+# Recordings longer than this are read and analysed block by block (0 disables)
+app.config['BLOCK_EXTRACTION_SECONDS'] = float(os.environ.get('BLOCK_EXTRACTION_SECONDS', 30))
+app.config['BLOCK_SIZE'] = int(os.environ.get('BLOCK_SIZE', 65536))  # samples per block
+# Accept per-frame statistics computed by the browser at /analyze/pcm
+app.config['CLIENT_FEATURES'] = os.environ.get('CLIENT_FEATURES', '1').lower() in ('1', 'true', 'yes')
+
+# Shared single-pass feature engine (cached filterbanks live for the process)
+feature_engine = FeatureEngine(sr=22050, n_mfcc=N_MFCC, pitch_backend=app.config['PITCH_BACKEND'],
+                               vad=app.config['VAD_ENABLED'])
+if app.config['RESAMPLE_METHOD'] not in RESAMPLE_METHODS:
+    raise ValueError(f"RESAMPLE_METHOD must be one of {RESAMPLE_METHODS}")
+# Loader settings change the features too, so they are part of the cache key
+loader_key = (f"resample={app.config['RESAMPLE_METHOD']}:trim={app.config['TRIM_SILENCE_DB']:g}"
+              f":blocks={app.config['BLOCK_EXTRACTION_SECONDS']:g}")
+feature_cache = FeatureCache(max_bytes=app.config['FEATURE_CACHE_MAX_BYTES'],
+                             disk_path=app.config['FEATURE_CACHE_PATH'])
+compute_slots = threading.BoundedSemaphore(app.config['COMPUTE_SLOTS'])
+
+# Versioned models, validated against the feature schema when they load and
+# hot-swapped when the registry's ACTIVE pointer changes (see model_registry.py)
+model_registry = ModelRegistry(app.config['MODEL_REGISTRY_PATH'], expected_features=FEATURE_NAMES)
+
+def load_models():
+    """Load the active model version and start watching for new ones"""
+    model_registry.refresh()
+    if model_registry.current() is None:
+        logger.warning("⚠️  No compatible model - using simulated predictions")
+    # A preloading master serves nothing; each worker starts its own watcher
+    if not app.config['PREFORK']:
+        model_registry.start_watcher(app.config['MODEL_RELOAD_INTERVAL'])
 
-def extract_voice_features(audio_path):
-    """Extract acoustic features from voice recording - SIMPLIFIED VERSION"""
-    print(f"🔊 Processing audio file: {audio_path}")
+# Hot-path spans and fallback counters, exported at /metrics
+metrics = Metrics()
+metrics.histogram('stage_seconds', 'Time spent in each analysis stage')
+metrics.histogram('request_seconds', 'HTTP request latency by endpoint')
+metrics.counter('requests', 'HTTP requests by endpoint and status code')
+metrics.counter('fallbacks', 'Simulated features or predictions, by reason')
+metrics.counter('client_frame_stats', 'Uploads with browser-computed frame statistics, by outcome')
+
+# Created on first batch request so single-file deployments never fork
+_process_pool = None
+
+def warm_librosa():
+    """Import librosa's lazily loaded submodules and build the filterbank"""
+    if librosa_available:
+        mel_filterbank(feature_engine.sr, feature_engine.n_fft, feature_engine.n_mels)
+        # The first soxr_hq call pays ~1 s of one-off import/setup
+        resample(np.zeros(4410, dtype=np.float32), 44100, feature_engine.sr,
+                 app.config['RESAMPLE_METHOD'])
+        logger.info("✅ librosa loaded successfully")
+
+def prewarm_extraction():
+    """One dummy extraction so JIT compilation and FFT setup happen now"""
+    if not librosa_available:
+        return
+    t = np.arange(44100) / 44100
+    tone = (0.3 * np.sin(2 * np.pi * 150 * t)).astype(np.float32)
+    method = app.config['RESAMPLE_METHOD']
+    engine = feature_engine.at_rate(44100) if method == 'native' else feature_engine
+    features, _ = engine.extract(resample(tone, 44100, feature_engine.sr, method))
+    missing = missing_features(features)
+    if missing:
+        logger.warning("⚠️  Feature engine does not produce schema features %s", missing)
+    logger.info("✅ Feature extraction pre-warmed")
+
+warmup_tasks = [('models', load_models), ('librosa', warm_librosa)]
+if app.config['PREWARM']:
+    warmup_tasks.append(('prewarm', prewarm_extraction))
+warmup = Warmup(warmup_tasks, mode=app.config['STARTUP_MODE'])
+
+def extract_voice_features(audio_source, timings=None):
+    """Extract acoustic features from voice recording
+    
+    ``audio_source`` is a file path or a binary file-like object such as the
+    upload stream, which is decoded in memory. If ``timings`` is a dict it
+    is filled with per-stage durations in seconds.
+    """
+    warmup.wait()
+    if timings is None:
+        timings = {}
+    is_path = isinstance(audio_source, (str, os.PathLike))
+    logger.info("🔊 Processing audio: %s", audio_source if is_path else 'in-memory upload')
     
     try:
         # First, check if the file exists and is readable
-        if not os.path.exists(audio_path):
-            print("❌ Audio file does not exist")
-            return simulate_features()
+        if is_path and not os.path.exists(audio_source):
+            logger.error("❌ Audio file does not exist")
+            return simulate_features(audio_source, 'missing_file')
         
-        file_size = os.path.getsize(audio_path)
-        print(f"📁 File size: {file_size} bytes")
+        file_size = source_size(audio_source)
+        logger.debug("📁 File size: %d bytes", file_size)
         
         if file_size == 0:
-            print("❌ Audio file is empty")
-            return simulate_features()
+            logger.error("❌ Audio file is empty")
+            return simulate_features(audio_source, 'empty_file')
         
         # If librosa is available, try to use it
         if librosa_available:
             try:
-                print("🎵 Using librosa for feature extraction...")
-                # Load audio file with error handling
-                y, sr = librosa.load(audio_path, sr=22050, mono=True)
-                print(f"✅ Audio loaded: {len(y)} samples, {sr} Hz sample rate")
+                # Long recordings are never decoded whole (see extract_in_blocks)
+                if app.config['BLOCK_EXTRACTION_SECONDS'] > 0:
+                    info = audio_info(audio_source)
+                    if info is not None and info[1] > app.config['BLOCK_EXTRACTION_SECONDS'] * info[0]:
+                        return extract_in_blocks(audio_source, info[0], timings)
                 
-                features = {}
+                # Decode at the native rate and check the cache before any DSP
+                with metrics.span('decode', timings):
+                    y, sr = decode_audio(audio_source)
+                    cache_key = audio_fingerprint(
+                        y, sr, f"{feature_engine.config_key()}:{loader_key}")
+                    cached = feature_cache.get(cache_key)
+                if cached is not None:
+                    logger.info("♻️  Returning cached features")
+                    return cached
                 
-                # 1. Basic amplitude features
-                features['rms_energy'] = np.sqrt(np.mean(y**2))
-                features['max_amplitude'] = np.max(np.abs(y))
-                
-                # 2. Pitch estimation (simplified)
+                # Request threads only do I/O in parallel; the DSP runs in one
+                # of COMPUTE_SLOTS per process so threads never contend for cores
+                with metrics.span('wait', timings):
+                    compute_slots.acquire()
                 try:
-                    f0, voiced_flag, voiced_probs = librosa.pyin(y, fmin=80, fmax=300)
-                    f0_clean = f0[voiced_flag & ~np.isnan(f0)]
+                    if app.config['TRIM_SILENCE_DB'] > 0:
+                        with metrics.span('trim', timings):
+                            y = trim_silence(y, sr, top_db=app.config['TRIM_SILENCE_DB'])
                     
-                    if len(f0_clean) > 0:
-                        features['mean_f0'] = np.mean(f0_clean)
-                        features['std_f0'] = np.std(f0_clean)
-                        features['f0_range'] = np.max(f0_clean) - np.min(f0_clean)
-                    else:
-                        features['mean_f0'] = 120
-                        features['std_f0'] = 10
-                        features['f0_range'] = 50
-                except:
-                    features['mean_f0'] = 120
-                    features['std_f0'] = 10
-                    features['f0_range'] = 50
-                
-                # 3. Spectral features
-                spectral_centroids = librosa.feature.spectral_centroid(y=y, sr=sr)
-                features['spectral_centroid_mean'] = np.mean(spectral_centroids)
-                
-                # 4. Zero crossing rate (voice activity)
-                zcr = librosa.feature.zero_crossing_rate(y)
-                features['zcr_mean'] = np.mean(zcr)
-                
-                # 5. MFCCs (simplified - just first 5)
-                try:
-                    mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=5)
-                    for i in range(5):
-                        features[f'mfcc_{i+1}_mean'] = np.mean(mfccs[i])
-                        features[f'mfcc_{i+1}_std'] = np.std(mfccs[i])
-                except:
-                    for i in range(5):
-                        features[f'mfcc_{i+1}_mean'] = np.random.normal(0, 1)
-                        features[f'mfcc_{i+1}_std'] = np.random.normal(1, 0.2)
-                
-                # 6. Add some simulated Parkinson's-specific features
-                features['jitter_relative'] = np.random.normal(0.004, 0.001)
-                features['shimmer_relative'] = np.random.normal(0.035, 0.01)
-                features['hnr'] = np.random.normal(18, 3)
+                    # 'native' skips the resample and matches the engine to the file
+                    method = app.config['RESAMPLE_METHOD']
+                    engine = feature_engine.at_rate(sr) if method == 'native' else feature_engine
+                    with metrics.span('resample', timings):
+                        y = resample(y, sr, engine.sr, method)
+                    logger.debug("✅ Audio loaded: %d samples, %d Hz sample rate", len(y), engine.sr)
+                    
+                    features, stage_timings = engine.extract(y)
+                finally:
+                    compute_slots.release()
+                metrics.record_stages(stage_timings)
+                feature_cache.put(cache_key, features)
+                timings.update(stage_timings)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("⏱️  Stage timings: " + ", ".join(
+                        f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in stage_timings.items()))
                 
-                print(f"✅ Successfully extracted {len(features)} features")
+                logger.info("✅ Successfully extracted %d features", len(features))
                 return features
                 
             except Exception as e:
-                print(f"❌ Librosa processing failed: {e}")
-                return simulate_features()
+                logger.error("❌ Librosa processing failed: %s", e)
+                return simulate_features(audio_source, 'extraction_failed')
         
         else:
             # Librosa not available, use simulation
-            print("🔧 Librosa not available, using simulated features")
-            return simulate_features()
+            logger.warning("🔧 Librosa not available, using simulated features")
+            return simulate_features(audio_source, 'librosa_unavailable')
             
     except Exception as e:
-        print(f"❌ Feature extraction completely failed: {e}")
-        return simulate_features()
+        logger.error("❌ Feature extraction completely failed: %s", e)
+        return simulate_features(audio_source, 'extraction_failed')
 
-def simulate_features():
-    """Simulate realistic voice features for demonstration"""
-    print("🎭 Generating simulated voice features...")
+def extract_in_blocks(audio_source, sr, timings):
+    """extract_voice_features for a long WAV/FLAC/OGG with bounded memory
+    
+    The source is re-read in BLOCK_SIZE blocks for each pass (fingerprint,
+    optional trim bounds, then the BlockExtractor passes), so peak memory
+    does not grow with the recording length. Pitch uses the YIN backend and
+    'polyphase' resampling is done by the streaming soxr resampler.
+    """
+    blocksize = app.config['BLOCK_SIZE']
+    with metrics.span('decode', timings):
+        cache_key = fingerprint_blocks(read_blocks(audio_source, blocksize), sr,
+                                       f"{feature_engine.config_key()}:{loader_key}")
+        cached = feature_cache.get(cache_key)
+    if cached is not None:
+        logger.info("♻️  Returning cached features")
+        return cached
     
-    features = {}
+    with metrics.span('wait', timings):
+        compute_slots.acquire()
+    try:
+        start, stop = 0, None
+        if app.config['TRIM_SILENCE_DB'] > 0:
+            with metrics.span('trim', timings):
+                start, stop = trim_bounds(lambda: read_blocks(audio_source, blocksize), sr,
+                                          top_db=app.config['TRIM_SILENCE_DB'])
+        
+        method = app.config['RESAMPLE_METHOD']
+        engine = feature_engine.at_rate(sr) if method == 'native' else feature_engine
+        extractor = BlockExtractor(engine, input_sr=sr)
+        features, stage_timings = extractor.extract(
+            lambda: read_blocks(audio_source, blocksize, start, stop))
+    finally:
+        compute_slots.release()
     
-    # Realistic voice features based on typical values
-    features['mean_f0'] = np.random.normal(120, 20)  # Fundamental frequency
-    features['std_f0'] = np.random.normal(15, 5)     # Pitch variation
-    features['f0_range'] = np.random.normal(50, 15)  # Pitch range
+    metrics.record_stages(stage_timings)
+    feature_cache.put(cache_key, features)
+    timings.update(stage_timings)
+    logger.info("✅ Extracted %d features in blocks", len(features))
+    return features
+
+# Simulated features when extraction is impossible: (mean, std) of one
+# normal draw per schema feature, around typical voice values
+SIMULATED_FEATURES = {
+    'mean_f0': (120, 20), 'std_f0': (15, 5), 'f0_range': (50, 15),  # Pitch
+    'jitter_relative': (0.004, 0.001), 'shimmer_relative': (0.035, 0.01),
+    'hnr': (18, 3),  # Parkinson's-related instability and voice quality
+    'rms_energy': (0.1, 0.03), 'max_amplitude': (0.3, 0.1),
+    'spectral_centroid_mean': (1500, 500), 'zcr_mean': (0.1, 0.03),
+    **{f'mfcc_{i+1}_mean': (0, 1) for i in range(N_MFCC)},
+    **{f'mfcc_{i+1}_std': (1, 0.2) for i in range(N_MFCC)},
+}
+SIMULATED_MEAN, SIMULATED_STD = np.array([SIMULATED_FEATURES[name] for name in FEATURE_NAMES]).T
+
+def extract_client_pcm(pcm, frame_stats, timings):
+    """Features of 16-bit PCM at the engine rate with browser frame statistics
     
-    # Parkinson's-related features
-    features['jitter_relative'] = np.random.normal(0.004, 0.001)  # Pitch instability
-    features['shimmer_relative'] = np.random.normal(0.035, 0.01)  # Amplitude instability
-    features['hnr'] = np.random.normal(18, 3)                     # Voice quality
+    The statistics are checked against the audio on every frame
+    (client_features.py) and supply the VAD, amplitude and ZCR values; pitch,
+    perturbation, spectral centroid and MFCCs are computed here as usual.
+    Raises InvalidFrameStats when the upload is malformed or the statistics
+    disagree.
+    """
+    warmup.wait()
+    with metrics.span('decode', timings):
+        y = pcm_samples(pcm)
+        if len(y) == 0:
+            raise InvalidFrameStats('No audio samples')
+        stats = parse_frame_stats(frame_stats, feature_engine, len(y))
+        # Not trimmed or resampled, so not the same key as an upload of this PCM
+        cache_key = audio_fingerprint(y, feature_engine.sr, f"{feature_engine.config_key()}:client")
+        cached = feature_cache.get(cache_key)
+    if cached is not None:
+        logger.info("♻️  Returning cached features")
+        return cached
     
-    # Spectral features
-    features['rms_energy'] = np.random.normal(0.1, 0.03)
-    features['max_amplitude'] = np.random.normal(0.3, 0.1)
-    features['spectral_centroid_mean'] = np.random.normal(1500, 500)
-    features['zcr_mean'] = np.random.normal(0.1, 0.03)
+    with metrics.span('wait', timings):
+        compute_slots.acquire()
+    try:
+        with metrics.span('verify', timings):
+            verify_frame_stats(feature_engine, y, stats)
+        features, stage_timings = feature_engine.extract(y, frame_stats=stats)
+    finally:
+        compute_slots.release()
+    metrics.record_stages(stage_timings)
+    feature_cache.put(cache_key, features)
+    timings.update(stage_timings)
+    logger.info("✅ Extracted %d features with client frame statistics", len(features))
+    return features
+
+def extract_task_features(task, audio_source, timings=None):
+    """Reading or DDK features of one session utterance (see session_tasks.py)
     
-    # MFCC features
-    for i in range(5):
-        features[f'mfcc_{i+1}_mean'] = np.random.normal(0, 1)
-        features[f'mfcc_{i+1}_std'] = np.random.normal(1, 0.2)
+    The upload is decoded and resampled once and the task's extractor runs on
+    that buffer. Unlike extract_voice_features, failures raise instead of
+    falling back to simulated values; these features are not scored.
+    """
+    warmup.wait()
+    if timings is None:
+        timings = {}
+    with metrics.span('decode', timings):
+        y, sr = decode_audio(audio_source)
+        cache_key = audio_fingerprint(
+            y, sr, f"{feature_engine.config_key()}:{loader_key}:task={task}-v{SESSION_TASKS_VERSION}")
+        cached = feature_cache.get(cache_key)
+    if cached is not None:
+        return cached
     
-    print(f"✅ Generated {len(features)} simulated features")
+    with metrics.span('wait', timings):
+        compute_slots.acquire()
+    try:
+        method = app.config['RESAMPLE_METHOD']
+        engine = feature_engine.at_rate(sr) if method == 'native' else feature_engine
+        with metrics.span('resample', timings):
+            y = resample(y, sr, engine.sr, method)
+        with metrics.span(task, timings):
+            features = TASK_EXTRACTORS[task](engine, y)
+    finally:
+        compute_slots.release()
+    feature_cache.put(cache_key, features)
+    return features
+
+def simulate_features(audio_source, reason='unknown'):
+    """Simulate realistic voice features for demonstration
+    
+    The draw is seeded from the upload's bytes, so the same recording always
+    gets the same features (and risk score) and threads share no RNG state.
+    """
+    metrics.inc('fallbacks', stage='features', reason=reason)
+    logger.warning("🎭 Generating simulated voice features (%s)", reason)
+    
+    try:
+        key = source_fingerprint(audio_source)
+    except (OSError, ValueError) as e:
+        logger.debug("Cannot hash the upload (%s); seeding from the reason", e)
+        key = hashlib.blake2b(reason.encode(), digest_size=20).hexdigest()
+    values = seeded_rng(key).normal(SIMULATED_MEAN, SIMULATED_STD)
+    features = dict(zip(FEATURE_NAMES, values.tolist()))
+    
+    logger.debug("✅ Generated %d simulated features", len(features))
     return features
 
 def predict_risk(features):
     """Predict Parkinson's risk using model or intelligent simulation"""
-    print("🧠 Making prediction...")
+    warmup.wait()
+    logger.debug("🧠 Making prediction...")
     
-    if not model_loaded:
+    # One bundle for the whole request, even if a swap happens meanwhile
+    bundle = model_registry.current()
+    if bundle is None:
         # Intelligent simulation based on realistic voice patterns
-        print("🤖 Using intelligent simulated prediction")
+        metrics.inc('fallbacks', stage='prediction', reason='model_unavailable')
+        logger.warning("🤖 Using intelligent simulated prediction")
         risk_score = intelligent_simulation(features)
         return 0, risk_score
     
     try:
-        # Prepare feature vector for actual model
-        feature_names = [
-            'mean_f0', 'std_f0', 'f0_range', 'jitter_relative', 
-            'shimmer_relative', 'hnr', 'rms_energy', 'max_amplitude',
-            'spectral_centroid_mean', 'zcr_mean'
-        ] + [f'mfcc_{i+1}_mean' for i in range(5)] + [f'mfcc_{i+1}_std' for i in range(5)]
-        
-        feature_vector = [features.get(name, 0) for name in feature_names]
+        # Prepare the feature vector; scaling happens inside predict_proba
+        with metrics.span('assemble'):
+            X = feature_vector(features)[None, :]
         
-        # Scale features and predict
-        features_scaled = scaler.transform([feature_vector])
-        prediction = model.predict(features_scaled)[0]
-        probability = model.predict_proba(features_scaled)[0][1]
+        with metrics.span('predict'):
+            # Scaler included; the class follows from the probability
+            probability = float(bundle.predict_proba(X)[0])
+            prediction = bundle.classes[int(probability > 0.5)]
+        model_registry.shadow(X, [probability])
         
         risk_score = int(probability * 100)
-        print(f"✅ Model prediction: {risk_score}% risk")
+        logger.info("✅ Model prediction: %d%% risk", risk_score)
         return prediction, risk_score
         
     except Exception as e:
-        print(f"❌ Model prediction failed: {e}")
+        metrics.inc('fallbacks', stage='prediction', reason='model_failed')
+        logger.error("❌ Model prediction failed: %s", e)
         risk_score = intelligent_simulation(features)
         return 0, risk_score
 
+def predict_risk_batch(feature_dicts):
+    """Predict risk for many recordings with one scaler/model call
+    
+    Returns a list of (prediction, risk_score) tuples in input order.
+    """
+    if not feature_dicts:
+        return []
+    warmup.wait()
+    
+    bundle = model_registry.current()
+    if bundle is None:
+        metrics.inc('fallbacks', len(feature_dicts), stage='prediction', reason='model_unavailable')
+        logger.warning("🤖 Using intelligent simulated prediction for %d recordings", len(feature_dicts))
+        return [(0, intelligent_simulation(features)) for features in feature_dicts]
+    
+    try:
+        with metrics.span('assemble'):
+            X = feature_matrix(feature_dicts)
+        
+        # One transform and one ensemble traversal for the whole batch;
+        # the class follows from the probabilities
+        with metrics.span('predict'):
+            positive = bundle.predict_proba(X)
+            predictions = bundle.classes[(positive > 0.5).astype(int)]
+        model_registry.shadow(X, positive)
+        risk_scores = (positive * 100).astype(int)
+        
+        logger.info("✅ Model prediction for %d recordings", len(feature_dicts))
+        return list(zip(predictions.tolist(), risk_scores.tolist()))
+        
+    except Exception as e:
+        metrics.inc('fallbacks', len(feature_dicts), stage='prediction', reason='model_failed')
+        logger.error("❌ Batch model prediction failed: %s", e)
+        return [(0, intelligent_simulation(features)) for features in feature_dicts]
+
 def intelligent_simulation(features):
     """Intelligent risk simulation based on voice characteristics"""
     risk = 50  # Base risk
@@ -219,19 +463,32 @@ def intelligent_simulation(features):
     if f0_std > 20:
         risk += 10
     
-    # Add some randomness for demonstration
-    risk += np.random.randint(-10, 15)
+    # Add some randomness for demonstration, seeded by the features so a
+    # recording keeps its score
+    rng = np.random.default_rng(feature_vector(features).view(np.uint32))
+    risk += int(rng.integers(-10, 15))
     
     # Ensure risk is between 0-100
     final_risk = max(5, min(95, risk))
     
-    print(f"🎯 Simulated risk score: {final_risk}%")
-    print(f"   - Jitter: {jitter:.4f}")
-    print(f"   - Shimmer: {shimmer:.4f}") 
-    print(f"   - HNR: {hnr:.1f}")
+    logger.info("🎯 Simulated risk score: %d%% (jitter %.4f, shimmer %.4f, HNR %.1f)",
+                final_risk, jitter, shimmer, hnr)
     
     return final_risk
 
+# Async /analyze jobs; worker threads start on the first submission
+job_queue = JobQueue(lambda payload: analyze_source(io.BytesIO(payload)),
+                     workers=app.config['ANALYSIS_WORKERS'],
+                     max_depth=app.config['JOB_QUEUE_MAX_DEPTH'],
+                     db_path=app.config['JOB_QUEUE_PATH'],
+                     recover=not app.config['PREFORK'])
+
+# Live recording streams (chunked POST of raw PCM)
+stream_sessions = StreamSessions(feature_engine,
+                                 max_sessions=app.config['STREAM_MAX_SESSIONS'],
+                                 idle_timeout=app.config['STREAM_IDLE_TIMEOUT'],
+                                 max_seconds=app.config['STREAM_MAX_SECONDS'])
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -246,57 +503,505 @@ def analyze_audio():
         if audio_file.filename == '':
             return jsonify({'error': 'No file selected'})
         
-        # Save uploaded file temporarily
-        filename = secure_filename(audio_file.filename)
-        temp_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        audio_file.save(temp_path)
-        
-        # Extract features
-        features = extract_voice_features(temp_path)
+        # Asynchronous mode: queue the job and answer right away
+        if wants_async():
+            try:
+                job_id = job_queue.submit(audio_file.read())
+            except QueueFull as e:
+                response = jsonify({'error': str(e)})
+                response.headers['Retry-After'] = '5'
+                return response, 429
+            return jsonify({
+                'job_id': job_id,
+                'status': 'queued',
+                'status_url': url_for('job_status', job_id=job_id),
+                'events_url': url_for('job_events', job_id=job_id)
+            }), 202
         
-        if features is None:
-            return jsonify({'error': 'Feature extraction failed'})
+        # Decode straight from the request stream; nothing is written to disk
+        # for WAV/FLAC/OGG, and concurrent uploads cannot collide on a filename
+        return send_result(analyze_source(audio_file.stream))
+            
+    except Exception as e:
+        logger.exception("Analysis error: %s", e)
+        return jsonify({'error': str(e)})
+
+@app.route('/analyze/pcm', methods=['GET', 'POST'])
+def analyze_pcm():
+    """Pre-extraction mode: browser PCM plus per-frame statistics
+    
+    GET describes the framing the client must reproduce. POST takes the
+    multipart files 'audio' (mono little-endian 16-bit PCM at that rate) and
+    'frame_stats' (little-endian float32 FRAME_STATS rows, one per frame).
+    """
+    if not app.config['CLIENT_FEATURES']:
+        return jsonify({'error': 'Client feature extraction is disabled'}), 404
+    if request.method == 'GET':
+        return jsonify({
+            'sample_rate': feature_engine.sr,
+            'n_fft': feature_engine.n_fft,
+            'hop_length': feature_engine.hop_length,
+            'format': 's16',
+            'frame_stats': FRAME_STATS
+        })
+    
+    audio, frame_stats = request.files.get('audio'), request.files.get('frame_stats')
+    if audio is None or frame_stats is None:
+        return jsonify({'error': "Both 'audio' and 'frame_stats' are required"}), 400
+    if request.values.get('sample_rate', str(feature_engine.sr)) != str(feature_engine.sr):
+        return jsonify({'error': f"sample_rate must be {feature_engine.sr}"}), 400
+    
+    timings = {}
+    try:
+        features = extract_client_pcm(audio.read(), frame_stats.read(), timings)
+    except InvalidFrameStats as e:
+        metrics.inc('client_frame_stats', outcome='rejected')
+        logger.warning("🚫 Rejected client frame statistics: %s", e)
+        return jsonify({'error': str(e)}), 422
+    metrics.inc('client_frame_stats', outcome='accepted')
+    return send_result(build_analysis_result(features, timings))
+
+def analyze_source(audio_source):
+    """Extract and score one recording; returns the /analyze response body"""
+    timings = {}
+    features = extract_voice_features(audio_source, timings=timings)
+    
+    if features is None:
+        return {'error': 'Feature extraction failed'}
+    
+    return build_analysis_result(features, timings)
+
+def build_analysis_result(features, timings):
+    """Score extracted features and shape the /analyze response body"""
+    prediction, risk_score = predict_risk(features)
+    # Share of frames the VAD kept; None when gating was not applied
+    features = dict(features)
+    voiced_fraction = features.pop('voiced_fraction', None)
+    
+    return {
+        'risk_score': risk_score,
+        'prediction': int(prediction),
+        'confidence': min(0.95, risk_score / 100 + 0.1),
+        'voiced_fraction': voiced_fraction,
+        'features': features,
+        'timings': {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()}
+    }
+
+def send_result(body, status=200):
+    """Analysis body in the negotiated fields and encoding (see response_format.py)"""
+    try:
+        fmt = negotiate(request)
+    except NotAcceptable as e:
+        return jsonify({'error': str(e)}), 406
+    response = encode(shape_body(body, fmt), fmt, jsonify)
+    response.vary.update(('Accept', 'Prefer'))
+    return response, status
+
+def wants_async():
+    """Async mode via ?async=1 (or form field) or 'Prefer: respond-async'"""
+    flag = request.values.get('async', '').lower() in ('1', 'true', 'yes')
+    return flag or 'respond-async' in request.headers.get('Prefer', '')
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return send_result(job)
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """Server-Sent Events: one event per status change, then the result"""
+    if job_queue.get(job_id) is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    
+    def stream():
+        last_status = None
+        while True:
+            job = job_queue.wait(job_id, last_status=last_status, timeout=15)
+            if job is None:
+                yield 'event: failed\ndata: {"error": "Unknown job"}\n\n'
+                return
+            if job['status'] == last_status:
+                yield ': keep-alive\n\n'
+                continue
+            last_status = job['status']
+            yield f"event: {last_status}\ndata: {app.json.dumps(job)}\n\n"
+            if last_status in ('done', 'failed'):
+                return
+    
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/stream', methods=['POST'])
+def open_stream():
+    """Start a live stream; chunks are raw little-endian PCM (f32 or s16)"""
+    warmup.wait()
+    params = request.get_json(silent=True) or request.values
+    try:
+        sample_rate = int(params.get('sample_rate', feature_engine.sr))
+        stream_id = stream_sessions.open(sample_rate=sample_rate,
+                                         sample_format=params.get('format', 'f32'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 429
+    
+    return jsonify({
+        'stream_id': stream_id,
+        'chunk_url': url_for('stream_chunk', stream_id=stream_id),
+        'finish_url': url_for('finish_stream', stream_id=stream_id)
+    }), 201
+
+@app.route('/stream/<stream_id>/chunk', methods=['POST'])
+def stream_chunk(stream_id):
+    try:
+        frames = stream_sessions.feed(stream_id, request.get_data())
+    except StreamTooLong as e:
+        return jsonify({'error': str(e)}), 413
+    except (ValueError, RuntimeError) as e:
+        return jsonify({'error': str(e)}), 400
+    if frames is None:
+        return jsonify({'error': 'Unknown stream'}), 404
+    return jsonify({'frames': frames})
+
+@app.route('/stream/<stream_id>/finish', methods=['POST'])
+def finish_stream(stream_id):
+    try:
+        result = stream_sessions.finish(stream_id)
+    except (ValueError, RuntimeError) as e:
+        return jsonify({'error': str(e)}), 400
+    if result is None:
+        return jsonify({'error': 'Unknown stream'}), 404
+    
+    features, timings = result
+    return send_result(build_analysis_result(features, timings))
+
+def get_process_pool():
+    """Process pool for batch extraction, sized to the available cores"""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=app.config['BATCH_WORKERS'],
+                                            initializer=_init_batch_worker)
+    return _process_pool
+
+def pool_result(pool, future):
+    """Result of a future from ``pool``; a broken pool is dropped so the next call rebuilds it"""
+    global _process_pool
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        if _process_pool is pool:
+            pool.shutdown(wait=False)
+            _process_pool = None
+        raise
+
+def _init_batch_worker():
+    """Forked workers need their own log listener thread"""
+    global compute_slots
+    configure_logging(logger.level, reset=True)
+    # A request thread may have held a slot when the pool forked
+    compute_slots = threading.BoundedSemaphore(app.config['COMPUTE_SLOTS'])
+
+def after_fork(recover_jobs=False):
+    """Restart per-process threads in a pre-forked server worker (gunicorn.conf.py)
+    
+    The models, librosa and the feature engine were loaded before the fork
+    and are shared copy-on-write; only threads and locks are re-created.
+    sqlite connections are reopened on first use in each process. Persisted
+    jobs are recovered only where ``recover_jobs`` is set, so they run once.
+    """
+    global _process_pool
+    _init_batch_worker()
+    _process_pool = None
+    model_registry.after_fork()
+    model_registry.start_watcher(app.config['MODEL_RELOAD_INTERVAL'])
+    if recover_jobs:
+        job_queue.recover()
+
+def upload_cache_key(data):
+    """Feature cache key of raw upload bytes, for lookups before decoding"""
+    digest = hashlib.blake2b(data, digest_size=20).hexdigest()
+    return f"upload:{digest}:{feature_engine.config_key()}:{loader_key}"
+
+def _extract_batch_item(filename, data):
+    """Process-pool worker: extract features for one uploaded file"""
+    timings = {}
+    features = extract_voice_features(io.BytesIO(data), timings=timings)
+    return features, timings
+
+def session_cache_key(task, data):
+    """Feature cache key of one session upload; the vowel shares the /analyze key"""
+    if task == 'vowel':
+        return upload_cache_key(data)
+    return f"{upload_cache_key(data)}:task={task}-v{SESSION_TASKS_VERSION}"
+
+def _extract_session_item(task, data):
+    """Process-pool worker: features of one session utterance, with timings"""
+    timings = {}
+    start = time.perf_counter()
+    if task == 'vowel':
+        features = extract_voice_features(io.BytesIO(data), timings=timings)
+    else:
+        features = extract_task_features(task, io.BytesIO(data), timings)
+    timings['total'] = time.perf_counter() - start
+    return features, timings
+
+def collect_batch_uploads(files):
+    """(filename, bytes) pairs from multipart 'audio' files and zip archives"""
+    max_files = app.config['BATCH_MAX_FILES']
+    max_unpacked = 4 * app.config['MAX_CONTENT_LENGTH']
+    uploads = []
+    
+    for storage in files.getlist('audio') + files.getlist('archive'):
+        if not storage or storage.filename == '':
+            continue
+        data = storage.read()
+        if storage.filename.lower().endswith('.zip') or zipfile.is_zipfile(io.BytesIO(data)):
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                members = [info for info in archive.infolist()
+                           if not info.is_dir() and not info.filename.startswith('__MACOSX/')]
+                if sum(info.file_size for info in members) > max_unpacked:
+                    raise ValueError('Archive is too large once unpacked')
+                for info in members:
+                    uploads.append((info.filename, archive.read(info)))
+        else:
+            uploads.append((storage.filename, data))
+        if len(uploads) > max_files:
+            raise ValueError(f'At most {max_files} files per batch')
+    
+    return uploads
+
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    try:
+        uploads = collect_batch_uploads(request.files)
+    except (ValueError, zipfile.BadZipFile) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not uploads:
+        return jsonify({'error': 'No audio files provided'}), 400
+    
+    # Never fork while the warm-up thread may hold the import lock
+    warmup.wait()
+    
+    try:
+        extract_start = time.perf_counter()
+        # Each item holds (features, timings) or the exception that failed it,
+        # so one bad file or crashed worker costs only its own entry
+        if len(uploads) == 1:
+            try:
+                extracted = [_extract_batch_item(*uploads[0])]
+            except Exception as e:
+                extracted = [e]
+        else:
+            # Pool children only have forked copies of the cache, so lookups
+            # and new entries happen here, keyed by the uploaded bytes
+            keys = [upload_cache_key(data) for _, data in uploads]
+            extracted = [feature_cache.get(key) for key in keys]
+            extracted = [(cached, {}) if cached is not None else None for cached in extracted]
+            futures = {}
+            if None in extracted:
+                pool = get_process_pool()
+                futures = {i: pool.submit(_extract_batch_item, *uploads[i])
+                           for i, item in enumerate(extracted) if item is None}
+            for i, future in futures.items():
+                try:
+                    features, timings = pool_result(pool, future)
+                except Exception as e:
+                    extracted[i] = e
+                    continue
+                feature_cache.put(keys[i], features)
+                # Stage spans ran in the workers; record them here
+                metrics.record_stages(timings)
+                extracted[i] = (features, timings)
+        extract_seconds = time.perf_counter() - extract_start
         
-        # Predict risk
-        prediction, risk_score = predict_risk(features)
+        predict_start = time.perf_counter()
+        scored = [item for item in extracted if not isinstance(item, Exception)]
+        scores = iter(predict_risk_batch([features for features, _ in scored]) if scored else [])
+        predict_seconds = time.perf_counter() - predict_start
         
-        # Clean up
-        try:
-            os.remove(temp_path)
-        except:
-            pass
+        results = []
+        for (name, _), item in zip(uploads, extracted):
+            if isinstance(item, Exception):
+                logger.error("❌ Batch file '%s' failed: %s", name, item)
+                results.append({'filename': name, 'error': str(item)})
+                continue
+            features, timings = item
+            prediction, risk_score = next(scores)
+            results.append({
+                'filename': name,
+                'risk_score': risk_score,
+                'prediction': int(prediction),
+                'confidence': min(0.95, risk_score / 100 + 0.1),
+                'voiced_fraction': features.pop('voiced_fraction', None),
+                'features': features,
+                'timings': {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()}
+            })
         
-        return jsonify({
-            'risk_score': risk_score,
-            'prediction': int(prediction),
-            'confidence': min(0.95, risk_score / 100 + 0.1),
-            'features': features
+        return send_result({
+            'count': len(results),
+            'results': results,
+            'timings': {
+                'extract': round(extract_seconds * 1000, 2),
+                'predict': round(predict_seconds * 1000, 2)
+            }
         })
-            
+    
     except Exception as e:
-        print(f"Analysis error: {e}")
+        logger.exception("Batch analysis error: %s", e)
         return jsonify({'error': str(e)})
 
+@app.route('/analyze/session', methods=['POST'])
+def analyze_session():
+    """Score a screening session: one recording per speech task
+    
+    Multipart files are named by task (session_tasks.TASKS) and all of them
+    are extracted at once in the process pool, so the session takes about
+    as long as its slowest task. Only the vowel is scored, as in /analyze:
+    the deployed model is trained on sustained vowels alone, so reading and
+    DDK features are reported unscored in ``task_features`` until a model
+    trained on whole sessions exists.
+    """
+    uploads = {}
+    for task, storage in request.files.items():
+        if task not in TASKS:
+            return jsonify({'error': f"Unknown task '{task}' (expected one of {TASKS})"}), 400
+        if storage.filename != '':
+            uploads[task] = storage.read()
+    if 'vowel' not in uploads:
+        return jsonify({'error': 'A session needs a sustained vowel recording to score'}), 400
+    
+    # Never fork while the warm-up thread may hold the import lock
+    warmup.wait()
+    
+    session_start = time.perf_counter()
+    # Pool children only have forked copies of the cache (see analyze_batch)
+    keys = {task: session_cache_key(task, data) for task, data in uploads.items()}
+    outcomes = {}
+    for task, key in keys.items():
+        cached = feature_cache.get(key)
+        if cached is not None:
+            outcomes[task] = (cached, {})
+    pending = {task: data for task, data in uploads.items() if task not in outcomes}
+    if len(pending) > 1 and app.config['BATCH_WORKERS'] > 1:
+        pool = get_process_pool()
+        futures = {task: pool.submit(_extract_session_item, task, data) for task, data in pending.items()}
+        for task, future in futures.items():
+            try:
+                outcomes[task] = pool_result(pool, future)
+            except Exception as e:
+                outcomes[task] = e
+            else:
+                # Stage spans ran in the workers; record them here
+                metrics.record_stages(outcomes[task][1])
+    else:
+        for task, data in pending.items():
+            try:
+                outcomes[task] = _extract_session_item(task, data)
+            except Exception as e:
+                outcomes[task] = e
+    for task in pending:
+        if not isinstance(outcomes[task], Exception):
+            feature_cache.put(keys[task], outcomes[task][0])
+    session_seconds = time.perf_counter() - session_start
+    
+    tasks, task_features = {}, {}
+    for task, outcome in outcomes.items():
+        if isinstance(outcome, Exception):
+            logger.error("❌ Session task '%s' failed: %s", task, outcome)
+            tasks[task] = {'error': str(outcome)}
+            continue
+        features, timings = outcome
+        tasks[task] = {'timings': {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()}}
+        if task != 'vowel':
+            task_features.update(features)
+    if 'error' in tasks['vowel']:
+        return jsonify({'error': tasks['vowel']['error']}), 500
+    
+    result = build_analysis_result(outcomes['vowel'][0], {'session': session_seconds})
+    result['task_features'] = task_features
+    result['tasks'] = tasks
+    return send_result(result)
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    start = g.pop('request_start', None)
+    if start is not None and app.config['METRICS_ENABLED']:
+        endpoint = request.endpoint or 'unmatched'
+        metrics.observe('request_seconds', time.perf_counter() - start, endpoint=endpoint)
+        metrics.inc('requests', endpoint=endpoint, status=response.status_code)
+    return response
+
+@metrics.collector
+def service_gauges():
+    """Cache, queue and stream statistics, read at scrape time"""
+    cache = feature_cache.stats()
+    queue_stats = job_queue.stats()
+    return [
+        ('feature_cache_hits_total', 'counter', 'Feature cache hits', cache['hits'], {}),
+        ('feature_cache_misses_total', 'counter', 'Feature cache misses', cache['misses'], {}),
+        ('feature_cache_bytes', 'gauge', 'Bytes held by the in-memory feature cache', cache['bytes'], {}),
+        ('job_queue_depth', 'gauge', 'Async analysis jobs waiting', queue_stats['depth'], {}),
+        ('job_queue_running', 'gauge', 'Async analysis jobs running', queue_stats['running'], {}),
+        ('open_streams', 'gauge', 'Open live-recording streams', len(stream_sessions), {}),
+        ('ready', 'gauge', '1 once warm-up has finished', int(warmup.ready), {}),
+    ]
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    if not app.config['METRICS_ENABLED']:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/health/live')
+def liveness_check():
+    """Liveness: the process is up and serving requests"""
+    return jsonify({'status': 'alive'})
+
+@app.route('/health/ready')
+def readiness_check():
+    """Readiness: models loaded and warm-up finished"""
+    status = warmup.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
 @app.route('/health')
 def health_check():
     return jsonify({
         'status': 'healthy',
+        'ready': warmup.ready,
+        'startup': warmup.status(),
         'librosa_available': librosa_available,
-        'model_loaded': model_loaded
+        'model_loaded': model_registry.current() is not None,
+        'model': model_registry.stats(),
+        'feature_cache': feature_cache.stats(),
+        'job_queue': job_queue.stats(),
+        'open_streams': len(stream_sessions)
     })
 
+# Eager mode warms up here; background mode starts its thread
+warmup.start()
+
 if __name__ == '__main__':
-    if not os.path.exists(app.config['UPLOAD_FOLDER']):
-        os.makedirs(app.config['UPLOAD_FOLDER'])
+    warmup.wait()
     
     print("\n" + "="*50)
     print("🎤 VoiceScreen PD - Parkinson's Risk Assessment")
     print("="*50)
-    print("✅ Backend server starting...")
-    print("📍 Access at: http://localhost:5000")
+    port = int(os.environ.get('PORT', 5000))
+    debug = os.environ.get('FLASK_DEBUG', '0').lower() in ('1', 'true', 'yes')
+    print("✅ Development server starting...")
+    print(f"📍 Access at: http://localhost:{port}")
+    print("🚀 Production: gunicorn -c gunicorn.conf.py wsgi:app")
     print("🔧 Status:")
     print(f"   - Librosa: {'✅ Available' if librosa_available else '⚠️ Simulated'}")
-    print(f"   - ML Model: {'✅ Loaded' if model_loaded else '⚠️ Simulated'}")
+    print(f"   - ML Model: {'✅ Loaded' if model_registry.current() else '⚠️ Simulated'}")
     print("="*50 + "\n")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=debug, host=os.environ.get('HOST', '0.0.0.0'), port=port, threaded=True)
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""Audio decoding helpers for VoiceScreen PD.
+
+Decoding is kept separate from resampling so callers can fingerprint the
+native PCM (e.g. for the feature cache) before doing any librosa work.
+
+Resampling methods (``RESAMPLE_METHODS``):
+
+* ``hq``        - librosa's default soxr_hq, as ``librosa.load(sr=...)`` did
+* ``polyphase`` - scipy's polyphase FIR (``resample_poly``); cheaper for
+                  the common 44.1/48 kHz -> 22.05 kHz ratios
+* ``native``    - no resampling; the caller extracts at the native rate
+                  with ``FeatureEngine.at_rate``
+"""
+import math
+import os
+import tempfile
+
+import numpy as np
+
+try:
+    import soundfile as sf
+    soundfile_available = True
+except ImportError:
+    soundfile_available = False
+
+try:
+    import librosa
+    librosa_available = True
+except ImportError:
+    librosa_available = False
+
+
+def source_size(source):
+    """Size in bytes of a path or seekable file-like object"""
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    position = source.tell()
+    size = source.seek(0, os.SEEK_END)
+    source.seek(position)
+    return size
+
+
+def _decode_via_temp_file(source):
+    """Formats libsndfile cannot read need ffmpeg, which wants a real file"""
+    data = source.read()
+    with tempfile.NamedTemporaryFile(suffix='.audio', delete=False) as handle:
+        handle.write(data)
+        temp_path = handle.name
+    try:
+        return librosa.load(temp_path, sr=None, mono=True)
+    finally:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def decode_audio(source):
+    """Decode to mono float32 at the native sample rate; returns (y, sr)
+
+    ``source`` is a path or a binary file-like object (e.g. the upload
+    stream). libsndfile decodes WAV/FLAC/OGG straight from memory; anything
+    else (e.g. browser WebM) falls back to librosa's audioread/ffmpeg path,
+    which is the only case that touches the disk for in-memory sources.
+    """
+    if soundfile_available:
+        try:
+            y, sr = sf.read(source, dtype='float32', always_2d=True)
+            return np.ascontiguousarray(y.mean(axis=1) if y.shape[1] > 1 else y[:, 0]), sr
+        except RuntimeError:
+            if hasattr(source, 'seek'):
+                source.seek(0)
+    if not librosa_available:
+        raise RuntimeError("No decoder available for this audio format")
+    if isinstance(source, (str, os.PathLike)):
+        y, sr = librosa.load(source, sr=None, mono=True)
+    else:
+        y, sr = _decode_via_temp_file(source)
+    return y.astype(np.float32, copy=False), sr
+
+
+def audio_info(source):
+    """``(sample_rate, n_samples)`` from the file header, or None if unreadable
+
+    Only formats libsndfile reads (WAV/FLAC/OGG) can be read in blocks.
+    """
+    if not soundfile_available:
+        return None
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    try:
+        info = sf.info(source)
+    except RuntimeError:
+        return None
+    finally:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+    return info.samplerate, info.frames
+
+
+def read_blocks(source, blocksize=65536, start=0, stop=None):
+    """Mono float32 blocks of samples ``[start, stop)`` at the native rate
+
+    Decodes ``blocksize`` samples at a time with ``soundfile.blocks``; the
+    values equal the matching slice of ``decode_audio(source)[0]``.
+    """
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    with sf.SoundFile(source) as handle:
+        if start:
+            handle.seek(start)
+        frames = -1 if stop is None else max(0, stop - start)
+        for block in handle.blocks(blocksize, frames=frames, dtype='float32', always_2d=True):
+            yield np.ascontiguousarray(block.mean(axis=1) if block.shape[1] > 1 else block[:, 0])
+
+
+RESAMPLE_METHODS = ('hq', 'polyphase', 'native')
+
+
+def resample(y, orig_sr, target_sr, method='hq'):
+    """Resample ``y`` from ``orig_sr`` to ``target_sr`` (see RESAMPLE_METHODS)"""
+    if method not in RESAMPLE_METHODS:
+        raise ValueError(f"Unknown resample method {method!r} (expected one of {RESAMPLE_METHODS})")
+    if orig_sr == target_sr or method == 'native':
+        return y
+    if method == 'polyphase':
+        from scipy.signal import resample_poly
+        factor = math.gcd(int(orig_sr), int(target_sr))
+        return resample_poly(y, target_sr // factor, orig_sr // factor).astype(np.float32, copy=False)
+    return librosa.resample(y, orig_sr=orig_sr, target_sr=target_sr)
+
+
+def trim_silence(y, sr, top_db=40.0, block_seconds=0.01):
+    """Drop leading/trailing audio more than ``top_db`` below the loudest block
+
+    Works on non-overlapping ~10 ms blocks of the native-rate signal, so it
+    costs one pass over the samples and runs before any resampling. Returns
+    a view of ``y``; if nothing is above the threshold ``y`` is returned.
+    """
+    block = max(1, int(sr * block_seconds))
+    n_blocks = len(y) // block
+    if n_blocks < 2:
+        return y
+    blocks = y[:n_blocks * block].reshape(n_blocks, block)
+    power = np.einsum('ij,ij->i', blocks, blocks) / block
+    peak = power.max()
+    if peak <= 0:
+        return y
+    loud = np.flatnonzero(power >= peak * 10.0 ** (-top_db / 10.0))
+    # Keep one block of margin on each side for onsets and decays
+    start = max(0, (loud[0] - 1) * block)
+    end = min(len(y), (loud[-1] + 2) * block)
+    return y[start:end]
+
+
+def trim_bounds(read, sr, top_db=40.0, block_seconds=0.01):
+    """``(start, stop)`` sample range ``trim_silence`` keeps, read in blocks
+
+    ``read()`` returns a fresh iterator over the native-rate blocks; it is
+    called twice, once for the loudest 10 ms block and once for the first
+    and last block above the threshold. ``stop`` is None when nothing is
+    trimmed.
+    """
+    block = max(1, int(sr * block_seconds))
+
+    def powers():
+        carry = np.zeros(0, dtype=np.float32)
+        for chunk in read():
+            chunk = np.concatenate([carry, chunk]) if len(carry) else chunk
+            n_blocks = len(chunk) // block
+            blocks = chunk[:n_blocks * block].reshape(n_blocks, block)
+            yield np.einsum('ij,ij->i', blocks, blocks) / block, len(chunk) - len(carry)
+            carry = chunk[n_blocks * block:]
+
+    peak, n_blocks, n_samples = None, 0, 0
+    for power, samples in powers():
+        n_samples += samples
+        n_blocks += len(power)
+        if len(power):
+            peak = power.max() if peak is None else max(peak, power.max())
+    if n_blocks < 2 or peak <= 0:
+        return 0, None
+
+    threshold = peak * 10.0 ** (-top_db / 10.0)
+    first, last, index = None, None, 0
+    for power, _ in powers():
+        loud = np.flatnonzero(power >= threshold)
+        if len(loud):
+            if first is None:
+                first = index + int(loud[0])
+            last = index + int(loud[-1])
+        index += len(power)
+    # Keep one block of margin on each side for onsets and decays
+    return max(0, (first - 1) * block), min(n_samples, (last + 2) * block)
+
@@ -0,0 +1,192 @@
+"""Parity and cost of browser pre-extraction (POST /analyze/pcm).
+
+Runs the recorder's AudioWorklet (static/js/feature-capture-processor.js)
+under node on synthetic voices, feeding it 128-sample render quanta at the
+engine rate like the browser does, and posts the PCM and frame statistics
+it produces to /analyze/pcm. Each result must agree with
+extract_voice_features on a WAV of the same 16-bit samples within
+--tolerance (relative, per feature); tampered statistics, in the loudest
+frame or in an arbitrary quiet one, must be rejected. It also prints server
+CPU time per request and upload bytes next to a 48 kHz WAV upload and the
+48 kHz float32 live stream, for information only: every frame is verified,
+so no server CPU saving is claimed. Exits non-zero on any parity failure.
+
+    python benchmarks/bench_client_features.py [--seconds 3] [--tolerance 1e-3]
+"""
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Every request must be computed, not answered from the feature cache
+os.environ['FEATURE_CACHE_MAX_BYTES'] = '0'
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from bench_pipeline import VOICE_PROFILES
+from bench_perturbation import perturbed_voice
+from bench_vad import with_silence
+from feature_engine import ENERGY, FRAME_STATS, RMS, ZCR
+
+WORKLET = os.path.join(ROOT, 'static', 'js', 'feature-capture-processor.js')
+
+# Minimal AudioWorkletGlobalScope: load the processor, push render quanta,
+# flush, and write the concatenated PCM and FRAME_STATS rows
+NODE_DRIVER = r"""
+const fs = require('fs');
+const [worklet, input, pcmOut, statsOut, rate, nFft, hopLength] = process.argv.slice(1);
+let Processor = null;
+globalThis.sampleRate = Number(rate);
+globalThis.AudioWorkletProcessor = class {
+    constructor() { this.port = { postMessage: (message) => messages.push(message), onmessage: null }; }
+};
+globalThis.registerProcessor = (name, cls) => { Processor = cls; };
+const messages = [];
+require(worklet);
+const node = new Processor({ processorOptions: {
+    sampleRate: Number(rate), nFft: Number(nFft), hopLength: Number(hopLength) } });
+const raw = fs.readFileSync(input);
+const samples = new Float32Array(raw.buffer, raw.byteOffset, raw.length / 4);
+for (let i = 0; i < samples.length; i += 128) {
+    node.process([[samples.subarray(i, Math.min(i + 128, samples.length))]]);
+}
+node.port.onmessage({ data: 'flush' });
+const pcm = [], stats = [];
+for (const message of messages) {
+    if (message.done) { console.log(JSON.stringify(message)); continue; }
+    pcm.push(Buffer.from(message.pcm.buffer));
+    stats.push(Buffer.from(message.stats.buffer));
+}
+fs.writeFileSync(pcmOut, Buffer.concat(pcm));
+fs.writeFileSync(statsOut, Buffer.concat(stats));
+"""
+
+
+def run_worklet(y, engine, tmp):
+    """(pcm bytes, frame_stats bytes, node seconds) from the browser worklet"""
+    paths = [os.path.join(tmp, name) for name in ('input.f32', 'pcm.s16', 'stats.f32')]
+    y.astype('<f4').tofile(paths[0])
+    start = time.perf_counter()
+    subprocess.run(['node', '-e', NODE_DRIVER, WORKLET, *paths, str(engine.sr),
+                    str(engine.n_fft), str(engine.hop_length)], check=True, capture_output=True)
+    elapsed = time.perf_counter() - start
+    with open(paths[1], 'rb') as pcm, open(paths[2], 'rb') as stats:
+        return pcm.read(), stats.read(), elapsed
+
+
+def post_pcm(client, pcm, stats, sr):
+    response = client.post('/analyze/pcm', data={
+        'audio': (io.BytesIO(pcm), 'recording.pcm'),
+        'frame_stats': (io.BytesIO(stats), 'frame_stats.f32'),
+        'sample_rate': str(sr)})
+    return response.status_code, response.get_json()
+
+
+def relative_diff(a, b):
+    return abs(a - b) / max(abs(b), 1e-6)
+
+
+def cpu_per_call(function, repeat):
+    """Median process CPU seconds of ``function()``"""
+    samples = []
+    for _ in range(repeat):
+        start = time.process_time()
+        function()
+        samples.append(time.process_time() - start)
+    return float(np.median(samples))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=3.0, help='length of each recording')
+    parser.add_argument('--tolerance', type=float, default=1e-3, help='max relative feature difference')
+    parser.add_argument('--repeat', type=int, default=5, help='requests per CPU measurement')
+    args = parser.parse_args()
+
+    import app as server
+    from audio_io import resample
+    server.warmup.wait()
+    engine = server.feature_engine
+    client = server.app.test_client()
+
+    cases = {}
+    for seed, (profile, params) in enumerate(VOICE_PROFILES.items()):
+        y, _, _ = perturbed_voice(params['f0'], args.seconds, engine.sr, params['jitter'],
+                                  params['shimmer'], noise=params['noise'], seed=seed)
+        cases[profile] = y
+        cases[f'{profile} + silence'] = with_silence(y, engine.sr, 0.3, seed=seed)
+    cases['silence'] = np.zeros(engine.sr, dtype=np.float32)
+
+    failures = []
+    print(f"{'recording':<24} {'frames':>6} {'status':>6} {'worst_feature':<24} {'rel_diff':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, y in cases.items():
+            pcm, stats, _ = run_worklet(y, engine, tmp)
+            status, result = post_pcm(client, pcm, stats, engine.sr)
+            wav = io.BytesIO()
+            sf.write(wav, np.frombuffer(pcm, '<i2'), engine.sr, format='WAV', subtype='PCM_16')
+            wav.seek(0)
+            reference = server.extract_voice_features(wav)
+            if status != 200:
+                failures.append(f"{name}: HTTP {status} {result.get('error')}")
+                print(f"{name:<24} {len(stats) // 20:>6} {status:>6} {result.get('error')}")
+                continue
+            worst = max(result['features'], key=lambda k: relative_diff(result['features'][k], reference[k]))
+            diff = relative_diff(result['features'][worst], reference[worst])
+            print(f"{name:<24} {len(stats) // 20:>6} {status:>6} {worst:<24} {diff:>9.2e}")
+            if diff > args.tolerance:
+                failures.append(f"{name}: {worst} differs by {diff:.2e}")
+
+        # A client inflating its loudest frame (which sets the VAD threshold)
+        # or any other frame is caught
+        y = cases[next(iter(VOICE_PROFILES))]
+        pcm, stats, node_seconds = run_worklet(y, engine, tmp)
+        clean = np.frombuffer(stats, '<f4').reshape(-1, len(FRAME_STATS))
+        quiet = int(np.argsort(clean[:, RMS])[len(clean) // 2])
+        for label, row, column, factor in [('loudest-frame RMS', int(clean[:, RMS].argmax()), RMS, 1.5),
+                                           (f'frame {quiet} energy', quiet, ENERGY, 1.2),
+                                           (f'frame {quiet} ZCR', quiet, ZCR, 0.8)]:
+            forged = clean.copy()
+            forged[row, column] *= factor
+            status, result = post_pcm(client, pcm, forged.tobytes(), engine.sr)
+            print(f"tampered {label}: HTTP {status} ({result.get('error')})")
+            if status != 422:
+                failures.append(f'tampered {label} was accepted')
+
+        # Server CPU and upload size against a 48 kHz browser-rate upload
+        y48 = resample(y, engine.sr, 48000)
+        wav48 = io.BytesIO()
+        sf.write(wav48, y48, 48000, format='WAV', subtype='PCM_16')
+
+        def upload():
+            client.post('/analyze', data={'audio': (io.BytesIO(wav48.getvalue()), 'recording.wav')})
+
+        def pre_extracted():
+            post_pcm(client, pcm, stats, engine.sr)
+
+        upload_cpu = cpu_per_call(upload, args.repeat)
+        client_cpu = cpu_per_call(pre_extracted, args.repeat)
+        print(f"\n{'mode':<34} {'upload_bytes':>12} {'server_cpu_ms':>13}")
+        print(f"{'/analyze, 48 kHz 16-bit WAV':<34} {len(wav48.getvalue()):>12} {1000 * upload_cpu:>13.1f}")
+        print(f"{'/stream, 48 kHz float32':<34} {4 * len(y48):>12} {'-':>13}")
+        print(f"{'/analyze/pcm, 22.05 kHz + stats':<34} {len(pcm) + len(stats):>12} "
+              f"{1000 * client_cpu:>13.1f}")
+        print(f"server CPU {client_cpu / upload_cpu:.2f}x the WAV upload, "
+              f"browser worklet {1000 * node_seconds:.0f} ms under node for {args.seconds:g}s of audio")
+
+    if failures:
+        print('❌ ' + '\n❌ '.join(failures))
+        sys.exit(1)
+    print(f"✅ Pre-extracted features agree within {args.tolerance:g}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Parity check and latency microbenchmark for compiled model inference.
+
+Compares CompiledModel against the sklearn scaler + model on random inputs
+(exits non-zero on any mismatch), then times single-row and batch calls.
+
+    python benchmarks/bench_inference.py [--rows 10000] [--repeat 200]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from compiled_model import CompiledModel, export_model
+
+
+def timed(function, repeat):
+    """Median wall time of ``function()`` in microseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return 1e6 * float(np.median(samples))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default=os.path.join(ROOT, 'model', 'parkinson_model.pkl'))
+    parser.add_argument('--scaler', default=os.path.join(ROOT, 'model', 'feature_scaler.pkl'))
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    scaler = joblib.load(args.scaler)
+    with tempfile.TemporaryDirectory() as tmp:
+        compiled = CompiledModel.load(export_model(model, scaler, os.path.join(tmp, 'model.npz')))
+
+    # Raw feature rows around the scaler's training distribution, plus
+    # rows that sit exactly on the scaler mean (ties at thresholds)
+    rng = np.random.default_rng(0)
+    X = scaler.mean_ + scaler.scale_ * rng.standard_normal((args.rows, compiled.n_features)) * 1.5
+    X[:10] = scaler.mean_
+
+    expected = model.predict_proba(scaler.transform(X))[:, 1]
+    actual = compiled.predict_proba(X)
+    max_error = float(np.max(np.abs(expected - actual)))
+    labels_match = np.array_equal(model.predict(scaler.transform(X)), compiled.predict(X))
+    print(f"Parity over {args.rows} rows: max |p_sklearn - p_compiled| = {max_error:.2e}, "
+          f"labels {'match' if labels_match else 'DIFFER'}")
+
+    row = X[:1]
+    sklearn_single = timed(lambda: (model.predict(scaler.transform(row)),
+                                    model.predict_proba(scaler.transform(row))), args.repeat)
+    compiled_single = timed(lambda: compiled.predict_proba(row), args.repeat)
+    batch = X[:1000]
+    sklearn_batch = timed(lambda: model.predict_proba(scaler.transform(batch)), max(5, args.repeat // 20))
+    compiled_batch = timed(lambda: compiled.predict_proba(batch), max(5, args.repeat // 20))
+
+    print(f"{'':<28} {'sklearn_us':>11} {'compiled_us':>12} {'speedup':>8}")
+    print(f"{'single row (predict+proba)':<28} {sklearn_single:>11.1f} {compiled_single:>12.1f} "
+          f"{sklearn_single / compiled_single:>7.1f}x")
+    print(f"{'batch of 1000':<28} {sklearn_batch:>11.1f} {compiled_batch:>12.1f} "
+          f"{sklearn_batch / compiled_batch:>7.1f}x")
+
+    if max_error > 1e-9 or not labels_match:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""Load test: /analyze throughput as the number of server workers grows.
+
+For each worker count the server is started with WEB_CONCURRENCY set (by
+default ``gunicorn -c gunicorn.conf.py wsgi:app``), warmed up, and then
+driven by closed-loop clients posting distinct recordings for a fixed
+time, so neither the feature cache nor a lucky queue flatters the numbers.
+Efficiency is throughput / (workers x single-worker throughput); with one
+worker per free core it should stay close to 1.
+
+    python benchmarks/bench_load.py [--workers 1 2 4] [--seconds 20]
+                                    [--min-efficiency 0.8]
+"""
+import argparse
+import io
+import json
+import os
+import shlex
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+import numpy as np
+import soundfile as sf
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_perturbation import perturbed_voice
+
+DEFAULT_COMMAND = 'gunicorn -c gunicorn.conf.py wsgi:app'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def recordings(count, seconds, sr=22050):
+    """``count`` WAV files of one voice with different background noise"""
+    voice, _, _ = perturbed_voice(150, seconds, sr, 0.004, 0.04, noise=0.005, seed=0)
+    rng = np.random.default_rng(1)
+    files = []
+    for _ in range(count):
+        y = voice + (1e-4 * rng.standard_normal(len(voice))).astype(np.float32)
+        buffer = io.BytesIO()
+        sf.write(buffer, y, sr, format='WAV', subtype='PCM_16')
+        files.append(buffer.getvalue())
+    return files
+
+
+def multipart(data, filename='recording.wav'):
+    """(body, content type) of a form with one 'audio' file"""
+    boundary = uuid.uuid4().hex
+    head = (f'--{boundary}\r\nContent-Disposition: form-data; name="audio"; filename="{filename}"\r\n'
+            f'Content-Type: audio/wav\r\n\r\n').encode()
+    return head + data + f'\r\n--{boundary}--\r\n'.encode(), f'multipart/form-data; boundary={boundary}'
+
+
+def start_server(command, workers, port, threads):
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), WEB_THREADS=str(threads),
+               BIND=f'127.0.0.1:{port}', PORT=str(port), HOST='127.0.0.1',
+               FEATURE_CACHE_MAX_BYTES='0', MODEL_RELOAD_INTERVAL='0', LOG_LEVEL='WARNING')
+    return subprocess.Popen(shlex.split(command), cwd=ROOT, env=env, start_new_session=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+def wait_ready(base_url, server, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited: {server.stderr.read().decode(errors='replace')[-2000:]}")
+        try:
+            with urllib.request.urlopen(f'{base_url}/health/ready', timeout=2) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.2)
+    raise RuntimeError('Server did not become ready')
+
+
+def stop_server(server):
+    if server.poll() is None:
+        os.killpg(server.pid, signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            os.killpg(server.pid, signal.SIGKILL)
+
+
+def drive(url, bodies, clients, seconds):
+    """Closed-loop clients for ``seconds``; returns (latencies, errors, elapsed)"""
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def client(index):
+        position = index
+        while time.monotonic() < deadline:
+            body, content_type = bodies[position % len(bodies)]
+            position += clients
+            request = urllib.request.Request(url, data=body, headers={'Content-Type': content_type})
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=120) as response:
+                    result = json.loads(response.read())
+                ok = 'risk_score' in result
+            except (urllib.error.URLError, OSError, ValueError) as e:
+                ok, result = False, str(e)
+            elapsed = time.perf_counter() - start
+            with lock:
+                (latencies if ok else errors).append(elapsed if ok else result)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    cores = os.cpu_count() or 1
+    default_workers = sorted({1, 2, max(1, cores // 2), cores} & set(range(1, cores + 1)))
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers)
+    parser.add_argument('--clients-per-worker', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4, help='WEB_THREADS per worker')
+    parser.add_argument('--seconds', type=float, default=20.0, help='measurement time per step')
+    parser.add_argument('--warmup-seconds', type=float, default=3.0)
+    parser.add_argument('--audio-seconds', type=float, default=3.0, help='length of each recording')
+    parser.add_argument('--command', default=DEFAULT_COMMAND, help='server command (reads WEB_CONCURRENCY)')
+    parser.add_argument('--min-efficiency', type=float, default=None,
+                        help='exit non-zero if any step scales worse than this')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    if max(args.workers) > cores:
+        print(f"⚠️  {cores} cores available; steps above that cannot scale")
+    bodies = [multipart(data) for data in recordings(64, args.audio_seconds)]
+
+    print(f"{'workers':>7} {'clients':>7} {'req/s':>8} {'p50_ms':>8} {'p95_ms':>8} "
+          f"{'errors':>6} {'speedup':>8} {'efficiency':>10}")
+    results = []
+    single = None
+    for workers in args.workers:
+        port = free_port()
+        server = start_server(args.command, workers, port, args.threads)
+        try:
+            wait_ready(f'http://127.0.0.1:{port}', server, timeout=120)
+            url = f'http://127.0.0.1:{port}/analyze?fields=compact'
+            clients = workers * args.clients_per_worker
+            drive(url, bodies, clients, args.warmup_seconds)
+            latencies, errors, elapsed = drive(url, bodies, clients, args.seconds)
+        finally:
+            stop_server(server)
+
+        throughput = len(latencies) / elapsed
+        single = single or throughput / workers
+        speedup = throughput / single
+        step = {'workers': workers, 'clients': clients, 'throughput': round(throughput, 2),
+                'p50_ms': round(1000 * float(np.percentile(latencies, 50)), 1) if latencies else None,
+                'p95_ms': round(1000 * float(np.percentile(latencies, 95)), 1) if latencies else None,
+                'errors': len(errors), 'speedup': round(speedup, 2),
+                'efficiency': round(speedup / workers, 3)}
+        results.append(step)
+        print(f"{workers:>7} {clients:>7} {throughput:>8.2f} {step['p50_ms'] or 0:>8.1f} "
+              f"{step['p95_ms'] or 0:>8.1f} {len(errors):>6} {speedup:>7.2f}x {step['efficiency']:>10.3f}")
+        if errors:
+            print(f"   first error: {errors[0]}")
+
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump({'cores': cores, 'command': args.command, 'steps': results}, handle, indent=2)
+    if args.min_efficiency is not None:
+        worst = min(step['efficiency'] for step in results)
+        if worst < args.min_efficiency:
+            print(f"❌ Scaling efficiency {worst:.3f} is below {args.min_efficiency}")
+            sys.exit(1)
+        print(f"✅ Scaling efficiency >= {args.min_efficiency} at every step")
+
+
+if __name__ == '__main__':
+    main()
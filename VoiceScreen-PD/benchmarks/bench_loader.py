@@ -0,0 +1,115 @@
+"""Speed and accuracy of the loader options (resample method, silence trim).
+
+For each input sample rate, synthetic healthy/Parkinson's-like voices are
+analysed with the reference loader (soxr_hq to 22.05 kHz) and with each
+alternative. Reported per option: median time of the loading stage
+(trim + resample) and of the whole extraction, plus the relative error of
+the 20 features ``predict_risk`` consumes (median over features, and the
+worst feature).
+
+The trim rows pad each voice with a second of low-level noise at both ends
+and compare against the unpadded reference, so they show how much of the
+padding's effect trimming removes.
+
+    python benchmarks/bench_loader.py [--rates 16000 44100 48000] [--per-feature]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from audio_io import resample, trim_silence
+from bench_perturbation import perturbed_voice
+from bench_pipeline import VOICE_PROFILES
+from feature_engine import FeatureEngine
+
+OPTIONS = {
+    'hq': {'method': 'hq', 'trim': None, 'pad': False},
+    'polyphase': {'method': 'polyphase', 'trim': None, 'pad': False},
+    'native': {'method': 'native', 'trim': None, 'pad': False},
+    'hq, padded': {'method': 'hq', 'trim': None, 'pad': True},
+    'hq, padded+trim': {'method': 'hq', 'trim': 40.0, 'pad': True},
+    'polyphase, padded+trim': {'method': 'polyphase', 'trim': 40.0, 'pad': True},
+}
+
+
+def voices(sr, seconds, count):
+    """Deterministic voices alternating between the two profiles"""
+    for seed in range(count):
+        params = VOICE_PROFILES['parkinsons' if seed % 2 else 'healthy']
+        y, _, _ = perturbed_voice(params['f0'] + 10 * seed, seconds, sr, params['jitter'],
+                                  params['shimmer'], noise=params['noise'], seed=seed)
+        yield y
+
+
+def pad_with_silence(y, sr, seed):
+    rng = np.random.default_rng(seed)
+    silence = (1e-4 * rng.standard_normal(sr)).astype(np.float32)
+    return np.concatenate([silence, y, silence])
+
+
+def run_option(engine, y, sr, option):
+    """Features and (load, total) seconds for one loader option"""
+    start = time.perf_counter()
+    if option['trim'] is not None:
+        y = trim_silence(y, sr, top_db=option['trim'])
+    target = engine.at_rate(sr) if option['method'] == 'native' else engine
+    y = resample(y, sr, target.sr, option['method'])
+    load = time.perf_counter() - start
+    features, _ = target.extract(y)
+    return features, load, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rates', type=int, nargs='+', default=[16000, 44100, 48000])
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--voices', type=int, default=4)
+    parser.add_argument('--per-feature', action='store_true', help='print every feature error')
+    args = parser.parse_args()
+
+    engine = FeatureEngine()
+    # Warm the filterbanks and the resamplers so the first option is not penalized
+    for sr in args.rates:
+        for option in OPTIONS.values():
+            run_option(engine, np.zeros(sr // 2, dtype=np.float32) + 1e-3, sr, option)
+
+    for sr in args.rates:
+        print(f"\n{sr} Hz input, {args.seconds:g} s voices")
+        print(f"{'option':<24} {'load_ms':>8} {'total_ms':>9} {'median_err':>11} {'max_err':>8}  worst feature")
+        signals = list(voices(sr, args.seconds, args.voices))
+        reference = [run_option(engine, y, sr, OPTIONS['hq'])[0] for y in signals]
+        names = list(reference[0])
+        errors_by_option = {}
+        for label, option in OPTIONS.items():
+            loads, totals, errors = [], [], []
+            for seed, (y, expected) in enumerate(zip(signals, reference)):
+                if option['pad']:
+                    y = pad_with_silence(y, sr, seed)
+                features, load, total = run_option(engine, y, sr, option)
+                loads.append(load)
+                totals.append(total)
+                errors.append([abs(features[name] - expected[name]) / max(abs(expected[name]), 1e-9)
+                               for name in names])
+            errors = np.median(np.array(errors), axis=0)
+            errors_by_option[label] = errors
+            worst = int(np.argmax(errors))
+            print(f"{label:<24} {1000 * np.median(loads):>8.2f} {1000 * np.median(totals):>9.2f} "
+                  f"{np.median(errors):>11.4f} {errors[worst]:>8.4f}  {names[worst]}")
+
+        if args.per_feature:
+            labels = [label for label in OPTIONS if label != 'hq']
+            print(f"\n{'feature':<24} " + ' '.join(f'{label[:12]:>12}' for label in labels))
+            for index, name in enumerate(names):
+                print(f"{name:<24} " + ' '.join(f'{errors_by_option[label][index]:>12.4f}'
+                                                for label in labels))
+
+
+if __name__ == '__main__':
+    main()
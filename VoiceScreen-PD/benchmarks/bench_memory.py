@@ -0,0 +1,93 @@
+"""Peak memory of in-memory vs block extraction as recordings get longer.
+
+Writes a synthetic voice of each length to a temporary WAV (uploads above
+500 KB are spooled to disk the same way), then extracts features twice
+under tracemalloc: decoding the whole file (decode_audio + resample +
+FeatureEngine.extract) and block by block (read_blocks + BlockExtractor).
+The block peak must stay flat as the length grows; the script exits
+non-zero when the longest recording's block peak exceeds the shortest's by
+more than --max-growth.
+
+    python benchmarks/bench_memory.py [--seconds 15 30 60 120 240] [--sr 44100]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from audio_io import decode_audio, read_blocks, resample
+from bench_perturbation import perturbed_voice
+from bench_vad import with_silence
+from feature_engine import FeatureEngine
+from streaming import BlockExtractor
+
+
+def traced(function):
+    """``(result, peak MiB, seconds)`` of ``function()``"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        result = function()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak / 2 ** 20, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, nargs='+', default=[15, 30, 60, 120, 240])
+    parser.add_argument('--sr', type=int, default=44100, help='sample rate of the recordings')
+    parser.add_argument('--blocksize', type=int, default=65536)
+    parser.add_argument('--max-growth', type=float, default=1.25)
+    args = parser.parse_args()
+
+    engine = FeatureEngine(vad=True)
+    # JIT and filterbank set-up stay out of the first row
+    engine.extract(np.zeros(engine.sr, dtype=np.float32))
+    print(f"{'seconds':>7} {'file_MiB':>8} {'full_MiB':>9} {'block_MiB':>9} "
+          f"{'full_s':>7} {'block_s':>7} {'max_rel_diff':>12}")
+    block_peaks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for seconds in args.seconds:
+            # A sustained vowel with silence around it, as the recorder produces
+            y, _, _ = perturbed_voice(150, seconds * 0.8, args.sr, 0.004, 0.04, noise=0.005, seed=1)
+            path = os.path.join(tmp, f'{seconds:g}s.wav')
+            sf.write(path, with_silence(y, args.sr, 0.2, seed=2), args.sr, subtype='PCM_16')
+            del y
+
+            def full():
+                signal, sr = decode_audio(path)
+                return engine.extract(resample(signal, sr, engine.sr))[0]
+
+            def blocks():
+                extractor = BlockExtractor(engine, input_sr=args.sr)
+                return extractor.extract(lambda: read_blocks(path, args.blocksize))[0]
+
+            full_features, full_peak, full_time = traced(full)
+            block_features, block_peak, block_time = traced(blocks)
+            block_peaks.append(block_peak)
+            drift = max(abs(block_features[name] - full_features[name]) / max(abs(full_features[name]), 1e-6)
+                        for name in full_features)
+            print(f"{seconds:>7g} {os.path.getsize(path) / 2 ** 20:>8.1f} {full_peak:>9.1f} "
+                  f"{block_peak:>9.1f} {full_time:>7.2f} {block_time:>7.2f} {drift:>12.2e}")
+
+    growth = block_peaks[-1] / block_peaks[0]
+    if growth > args.max_growth:
+        print(f"❌ Block peak grew {growth:.2f}x from {args.seconds[0]:g}s to {args.seconds[-1]:g}s")
+        sys.exit(1)
+    print(f"✅ Block peak grew {growth:.2f}x from {args.seconds[0]:g}s to {args.seconds[-1]:g}s")
+
+
+if __name__ == '__main__':
+    main()
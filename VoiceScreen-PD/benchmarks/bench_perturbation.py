@@ -0,0 +1,103 @@
+"""Accuracy and overhead benchmark for the jitter/shimmer/HNR analyzer.
+
+Synthesizes vowels with known cycle-to-cycle period and amplitude
+perturbation, compares the measured values with the truth, and reports how
+much the perturbation stage adds to the total extraction time. Exits
+non-zero when the stage adds more than --budget to request time at any
+length.
+
+    python benchmarks/bench_perturbation.py [--lengths 2 10 30] [--repeat 5]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from feature_engine import FeatureEngine
+
+
+def perturbed_voice(f0, seconds, sr, jitter, shimmer, noise=0.005, seed=0):
+    """Harmonic vowel with per-cycle period/amplitude jitter
+
+    Returns ``(y, true_jitter, true_shimmer)`` using the local definitions
+    (mean absolute difference of consecutive cycles over the mean).
+    """
+    rng = np.random.default_rng(seed)
+    n_cycles = int(seconds * f0 * 1.2) + 2
+    periods = (1.0 / f0) * (1.0 + jitter * rng.standard_normal(n_cycles))
+    amps = 1.0 + shimmer * rng.standard_normal(n_cycles)
+    starts = np.concatenate([[0.0], np.cumsum(periods)])
+    t = np.arange(int(seconds * sr)) / sr
+    used = np.searchsorted(starts, t[-1]) + 1
+    phase = np.interp(t, starts[:used], 2 * np.pi * np.arange(used))
+    cycle = np.minimum(np.searchsorted(starts, t, side='right') - 1, n_cycles - 1)
+    y = amps[cycle] * sum(np.sin(k * phase) / k ** 1.5 for k in range(1, 6))
+    y = 0.3 * y / np.max(np.abs(y)) + noise * rng.standard_normal(len(t))
+    p, a = periods[:used - 1], amps[:used - 1]
+    true_jitter = np.mean(np.abs(np.diff(p))) / np.mean(p)
+    true_shimmer = np.mean(np.abs(np.diff(a))) / np.mean(a)
+    return y.astype(np.float32), true_jitter, true_shimmer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lengths', type=float, nargs='+', default=[2, 10, 30])
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--sr', type=int, default=22050)
+    parser.add_argument('--budget', type=float, default=0.10,
+                        help='max share the stage may add to request time')
+    args = parser.parse_args()
+
+    engine = FeatureEngine(sr=args.sr)
+    engine.extract(perturbed_voice(150, 0.5, args.sr, 0.005, 0.03)[0])
+
+    print("Accuracy (3 s vowels):")
+    print(f"{'f0':>5} {'jit_true':>9} {'jit_meas':>9} {'shim_true':>9} {'shim_meas':>9} {'hnr_db':>7}")
+    for f0 in (100, 150, 220):
+        for jitter, shimmer in ((0.002, 0.02), (0.006, 0.05), (0.012, 0.10)):
+            y, true_j, true_s = perturbed_voice(f0, 3, args.sr, jitter, shimmer)
+            features, _ = engine.extract(y)
+            print(f"{f0:>5} {true_j:>9.4f} {features['jitter_relative']:>9.4f} "
+                  f"{true_s:>9.4f} {features['shimmer_relative']:>9.4f} {features['hnr']:>7.1f}")
+
+    print("\nOverhead of the perturbation stage (median of repeats, 44.1 kHz WAV input):")
+    print(f"{'len_s':>6} {'request_ms':>10} {'engine_ms':>9} {'perturb_ms':>10} {'of_engine':>9} {'of_request':>10}")
+    over_budget = []
+    for seconds in args.lengths:
+        y, _, _ = perturbed_voice(150, seconds, 44100, 0.005, 0.04)
+        wav = io.BytesIO()
+        sf.write(wav, y, 44100, format='WAV')
+        requests, engines, stage = [], [], []
+        for _ in range(args.repeat):
+            wav.seek(0)
+            start = time.perf_counter()
+            signal, _ = librosa.load(wav, sr=args.sr, mono=True)
+            engine_start = time.perf_counter()
+            _, timings = engine.extract(signal)
+            end = time.perf_counter()
+            requests.append(end - start)
+            engines.append(end - engine_start)
+            stage.append(timings['perturbation'])
+        request_ms, engine_ms, stage_ms = (1000 * np.median(v) for v in (requests, engines, stage))
+        share = stage_ms / (request_ms - stage_ms)
+        print(f"{seconds:>6.1f} {request_ms:>10.1f} {engine_ms:>9.1f} {stage_ms:>10.1f} "
+              f"{stage_ms / (engine_ms - stage_ms):>9.1%} {share:>10.1%}"
+              f"{'' if share < args.budget else f'  (over {args.budget:.0%} budget)'}")
+        if share >= args.budget:
+            over_budget.append(f"{seconds:g} s: {share:.1%}")
+
+    if over_budget:
+        print(f"\n❌ Perturbation stage over the {args.budget:.0%} budget at " + ', '.join(over_budget))
+        sys.exit(1)
+    print(f"\n✅ Perturbation stage within the {args.budget:.0%} budget")
+
+
+if __name__ == '__main__':
+    main()
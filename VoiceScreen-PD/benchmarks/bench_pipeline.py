@@ -0,0 +1,211 @@
+"""End-to-end benchmark for the analysis pipeline.
+
+Generates deterministic synthetic voices (healthy-like and Parkinson's-like
+perturbation, following create_sample_data.py) at several lengths and sample
+rates, then measures:
+
+* per-stage extraction time (``extract_voice_features`` timings)
+* model inference (``predict_risk``)
+* full /analyze requests through the Flask test client at several
+  concurrency levels (latency and throughput)
+
+Results (p50/p95/p99 in ms, requests/s, peak RSS) are written as JSON. With
+``--baseline`` the run is compared against a stored result and the script
+exits non-zero when any metric regressed by more than ``--tolerance``.
+
+    python benchmarks/bench_pipeline.py --out bench.json
+    python benchmarks/bench_pipeline.py --baseline bench.json --tolerance 0.15
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import soundfile as sf
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_perturbation import perturbed_voice
+
+# Same group means as create_sample_data.py (healthy, Parkinson's)
+VOICE_PROFILES = {
+    'healthy': {'f0': 120, 'jitter': 0.003, 'shimmer': 0.03, 'noise': 0.004},
+    'parkinsons': {'f0': 110, 'jitter': 0.006, 'shimmer': 0.05, 'noise': 0.015},
+}
+
+
+def synthetic_wav(profile, seconds, sr, seed=0):
+    """Deterministic WAV bytes for one voice profile"""
+    params = VOICE_PROFILES[profile]
+    y, _, _ = perturbed_voice(params['f0'], seconds, sr, params['jitter'], params['shimmer'],
+                              noise=params['noise'], seed=seed)
+    buffer = io.BytesIO()
+    sf.write(buffer, y, sr, format='WAV', subtype='PCM_16')
+    return buffer.getvalue()
+
+
+def percentiles(samples_ms):
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {'p50': round(float(p50), 3), 'p95': round(float(p95), 3),
+            'p99': round(float(p99), 3), 'mean': round(float(samples.mean()), 3),
+            'n': int(len(samples))}
+
+
+def peak_rss_mb():
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def bench_stages(app, wavs, repeat):
+    """Per-stage extraction latency, keyed by ``<stage>/<length>s@<sr>``"""
+    results = {}
+    for (seconds, sr), wav in wavs.items():
+        samples = {}
+        for _ in range(repeat):
+            timings = {}
+            start = time.perf_counter()
+            app.extract_voice_features(io.BytesIO(wav), timings)
+            timings['total'] = time.perf_counter() - start
+            for stage, value in timings.items():
+                samples.setdefault(stage, []).append(1000 * value)
+        for stage, values in samples.items():
+            results[f'extract.{stage}/{seconds:g}s@{sr}'] = percentiles(values)
+    return results
+
+
+def bench_inference(app, features, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        app.predict_risk(features)
+        samples.append(1000 * (time.perf_counter() - start))
+    return {'inference.predict_risk': percentiles(samples)}
+
+
+def bench_requests(app, wav, concurrency_levels, n_requests):
+    """/analyze latency and throughput at each concurrency level"""
+    metrics, throughput = {}, {}
+
+    def one_request(_):
+        client = app.app.test_client()
+        start = time.perf_counter()
+        response = client.post('/analyze', data={'audio': (io.BytesIO(wav), 'bench.wav')})
+        elapsed = 1000 * (time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f'/analyze returned {response.status_code}')
+        return elapsed
+
+    for concurrency in concurrency_levels:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(one_request, range(n_requests)))
+        wall = time.perf_counter() - start
+        metrics[f'request.analyze/c{concurrency}'] = percentiles(latencies)
+        throughput[f'request.analyze/c{concurrency}'] = round(n_requests / wall, 3)
+    return metrics, throughput
+
+
+def compare(current, baseline, tolerance):
+    """Regressions of ``current`` against ``baseline`` (list of strings)"""
+    regressions = []
+    for name, stats in current['metrics'].items():
+        previous = baseline.get('metrics', {}).get(name)
+        if previous is None:
+            continue
+        for key in ('p50', 'p95'):
+            # Sub-millisecond stages are dominated by timer noise
+            if previous[key] >= 0.5 and stats[key] > previous[key] * (1 + tolerance):
+                regressions.append(f'{name} {key}: {previous[key]:.2f} -> {stats[key]:.2f} ms')
+    for name, value in current['throughput'].items():
+        previous = baseline.get('throughput', {}).get(name)
+        if previous and value < previous * (1 - tolerance):
+            regressions.append(f'{name} throughput: {previous:.2f} -> {value:.2f} req/s')
+    previous_rss = baseline.get('peak_rss_mb')
+    if previous_rss and current['peak_rss_mb'] > previous_rss * (1 + tolerance):
+        regressions.append(f"peak RSS: {previous_rss:.1f} -> {current['peak_rss_mb']:.1f} MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lengths', type=float, nargs='+', default=[1, 5, 15])
+    parser.add_argument('--rates', type=int, nargs='+', default=[16000, 22050, 44100])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--requests', type=int, default=16, help='requests per concurrency level')
+    parser.add_argument('--out', help='write results JSON here')
+    parser.add_argument('--baseline', help='compare against this results JSON')
+    parser.add_argument('--tolerance', type=float, default=0.10)
+    args = parser.parse_args()
+
+    # Every run must do the full work: no feature cache, warm-up before timing
+    os.environ['FEATURE_CACHE_MAX_BYTES'] = '0'
+    os.environ['STARTUP_MODE'] = 'eager'
+    os.environ.setdefault('PREWARM', '1')
+    os.chdir(ROOT)
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+
+    wavs = {(seconds, sr): synthetic_wav('parkinsons' if i % 2 else 'healthy', seconds, sr, seed=i)
+            for i, (seconds, sr) in enumerate((s, r) for s in args.lengths for r in args.rates)}
+    request_wav = synthetic_wav('healthy', 3.0, 44100, seed=100)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        metrics = bench_stages(app, wavs, args.repeat)
+        features = app.extract_voice_features(io.BytesIO(request_wav))
+        metrics.update(bench_inference(app, features, max(50, args.repeat * 20)))
+        request_metrics, throughput = bench_requests(app, request_wav, args.concurrency, args.requests)
+    metrics.update(request_metrics)
+
+    result = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'model': (app.model_registry.stats()['active'] or {}).get('version'),
+            'pitch_backend': app.feature_engine.pitch_backend,
+        },
+        'metrics': metrics,
+        'throughput': throughput,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+    print(f"{'metric':<40} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9}")
+    for name, stats in metrics.items():
+        print(f"{name:<40} {stats['p50']:>9.2f} {stats['p95']:>9.2f} {stats['p99']:>9.2f}")
+    for name, value in throughput.items():
+        print(f"{name:<40} {value:>9.2f} req/s")
+    print(f"peak RSS: {result['peak_rss_mb']} MB")
+
+    if args.out:
+        with open(args.out, 'w') as handle:
+            json.dump(result, handle, indent=2)
+        print(f"Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"   - {line}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
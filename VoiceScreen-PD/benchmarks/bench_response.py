@@ -0,0 +1,102 @@
+"""Payload size and encoding time of the /analyze response formats.
+
+Builds /analyze and /analyze/batch bodies from features of synthetic
+voices and encodes them the way the app does for each negotiated format:
+the stdlib JSON provider (the previous behaviour), orjson, compact fields
+and msgpack with the packed float32 feature vector. Sizes are reported raw
+and gzipped (what a compressing proxy would send).
+
+    python benchmarks/bench_response.py [--batch 32] [--repeat 2000]
+"""
+import argparse
+import gzip
+import os
+import sys
+import time
+
+import numpy as np
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_pipeline import VOICE_PROFILES
+from bench_perturbation import perturbed_voice
+from feature_engine import FeatureEngine
+import response_format
+from response_format import OrjsonProvider, ResponseFormat, encode, shape_body
+
+# (label, JSON provider, ResponseFormat)
+OPTIONS = [
+    ('json (stdlib)', DefaultJSONProvider, ResponseFormat(False, 'json')),
+    ('json (orjson)', OrjsonProvider, ResponseFormat(False, 'json')),
+    ('compact json', OrjsonProvider, ResponseFormat(True, 'json')),
+    ('msgpack', OrjsonProvider, ResponseFormat(False, 'msgpack')),
+    ('compact msgpack', OrjsonProvider, ResponseFormat(True, 'msgpack')),
+]
+
+
+def analysis_result(features, risk_score, timings):
+    """Same shape as app.build_analysis_result"""
+    features = dict(features)
+    return {
+        'risk_score': risk_score,
+        'prediction': int(risk_score > 50),
+        'confidence': min(0.95, risk_score / 100 + 0.1),
+        'voiced_fraction': features.pop('voiced_fraction', None),
+        'features': features,
+        'timings': {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()}
+    }
+
+
+def timed(function, repeat):
+    """Median wall time of ``function()`` in microseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return 1e6 * float(np.median(samples))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--batch', type=int, default=32, help='results per batch body')
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    if response_format.orjson is None or response_format.msgpack is None:
+        sys.exit('orjson and msgpack are needed for this benchmark')
+
+    engine = FeatureEngine(vad=True)
+    results = []
+    for seed, profile in enumerate(VOICE_PROFILES):
+        params = VOICE_PROFILES[profile]
+        y, _, _ = perturbed_voice(params['f0'], 2.0, engine.sr, params['jitter'], params['shimmer'],
+                                  noise=params['noise'], seed=seed)
+        features, timings = engine.extract(y)
+        results.append(analysis_result(features, 20 + 30 * seed, timings))
+    single = results[0]
+    batch = {'count': args.batch,
+             'results': [dict(results[i % len(results)], filename=f'{i}.wav') for i in range(args.batch)],
+             'timings': {'extract': 812.4, 'predict': 1.9}}
+
+    print(f"{'format':<16} {'body':<7} {'bytes':>7} {'gzip':>6} {'encode_us':>10} {'vs_stdlib':>9}")
+    for name, body, repeat in (('single', single, args.repeat), ('batch', batch, max(20, args.repeat // 20))):
+        baseline = None
+        for label, provider, fmt in OPTIONS:
+            app = Flask(__name__)
+            app.json = provider(app)
+            with app.app_context():
+                def run():
+                    return encode(shape_body(body, fmt), fmt, jsonify).get_data()
+                payload = run()
+                elapsed = timed(run, repeat)
+            baseline = baseline or elapsed
+            print(f"{label:<16} {name:<7} {len(payload):>7} {len(gzip.compress(payload)):>6} "
+                  f"{elapsed:>10.1f} {baseline / elapsed:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""Latency of /analyze/session against its slowest task.
+
+Synthesizes one recording per speech task (a sustained vowel, a read
+passage with known pauses and /pa-ta-ka/ repetitions at a known syllable
+rate) and measures each task on its own and the whole session through the
+Flask test client. With at least one core per task the session should take
+about as long as its slowest task rather than their sum; the script exits
+non-zero when the session exceeds the slowest task by more than
+--max-overhead there, or when the DDK rate or reading pause count is off.
+With fewer cores or BATCH_WORKERS than tasks the latency gate cannot hold
+and is skipped with a notice; --require-latency makes that a failure.
+
+    python benchmarks/bench_session.py [--repeat 5] [--ddk-rate 6] [--require-latency]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Every request must be computed, not answered from the feature cache
+os.environ['FEATURE_CACHE_MAX_BYTES'] = '0'
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from bench_perturbation import perturbed_voice
+
+SR = 22050
+
+
+def wav(y):
+    buffer = io.BytesIO()
+    sf.write(buffer, y, SR, format='WAV', subtype='PCM_16')
+    return buffer.getvalue()
+
+
+def ddk(seconds, rate, seed=0):
+    """Voice gated into ``rate`` syllables per second"""
+    voice, _, _ = perturbed_voice(140, seconds, SR, 0.004, 0.04, seed=seed)
+    t = np.arange(len(voice)) / SR
+    window = np.hanning(int(0.02 * SR))
+    gate = np.convolve(((t * rate) % 1.0 < 0.45).astype(float), window / window.sum(), 'same')
+    return (voice * gate).astype(np.float32)
+
+
+def reading(phrases, pause_seconds, seed=0):
+    """``phrases`` one-second phrases at rising pitch separated by pauses"""
+    rng = np.random.default_rng(seed)
+    parts = []
+    for i in range(phrases):
+        phrase, _, _ = perturbed_voice(110 + 15 * i, 1.0, SR, 0.004, 0.04, seed=seed + i)
+        parts.append(phrase)
+        if i < phrases - 1:
+            parts.append(3e-4 * rng.standard_normal(int(pause_seconds * SR)))
+    return np.concatenate(parts).astype(np.float32)
+
+
+def median_seconds(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--ddk-rate', type=float, default=6.0, help='syllables per second')
+    parser.add_argument('--max-overhead', type=float, default=1.3,
+                        help='allowed session / slowest-task ratio with a core per task')
+    parser.add_argument('--require-latency', action='store_true',
+                        help='fail instead of skipping the latency gate on too few cores')
+    args = parser.parse_args()
+
+    import app as server
+    server.warmup.wait()
+    client = server.app.test_client()
+
+    vowel, _, _ = perturbed_voice(150, 3.0, SR, 0.004, 0.04, seed=0)
+    recordings = {'vowel': wav(vowel), 'reading': wav(reading(5, 0.4)),
+                  'ddk': wav(ddk(6.0, args.ddk_rate))}
+
+    def session():
+        response = client.post('/analyze/session', data={
+            task: (io.BytesIO(data), f'{task}.wav') for task, data in recordings.items()})
+        return response.get_json()
+
+    session()  # starts the process pool
+    print(f"{'task':<8} {'ms':>8}")
+    task_seconds = {}
+    for task, data in recordings.items():
+        task_seconds[task], _ = median_seconds(lambda: server._extract_session_item(task, data), args.repeat)
+        print(f"{task:<8} {1000 * task_seconds[task]:>8.1f}")
+    session_seconds, result = median_seconds(session, args.repeat)
+    slowest, total = max(task_seconds.values()), sum(task_seconds.values())
+    cores = os.cpu_count() or 1
+    print(f"{'session':<8} {1000 * session_seconds:>8.1f}  "
+          f"({session_seconds / slowest:.2f}x slowest task, {session_seconds / total:.2f}x sum; "
+          f"{cores} cores, BATCH_WORKERS={server.app.config['BATCH_WORKERS']})")
+    print(f"risk_score {result['risk_score']}, task_features {result['task_features']}")
+
+    failures = []
+    skipped = None
+    measured_rate = result['task_features'].get('ddk_rate', 0.0)
+    if abs(measured_rate - args.ddk_rate) > 0.1 * args.ddk_rate:
+        failures.append(f"DDK rate {measured_rate:.2f}/s, expected {args.ddk_rate:g}/s")
+    if result['task_features'].get('reading_pause_count') != 4:
+        failures.append(f"{result['task_features'].get('reading_pause_count')} reading pauses, expected 4")
+    if cores >= len(recordings) and server.app.config['BATCH_WORKERS'] >= len(recordings):
+        if session_seconds > args.max_overhead * slowest:
+            failures.append(f"session took {session_seconds / slowest:.2f}x the slowest task")
+    else:
+        skipped = (f"{cores} cores and BATCH_WORKERS={server.app.config['BATCH_WORKERS']}, "
+                   f"{len(recordings)} needed to run every task at once")
+        if args.require_latency:
+            failures.append(f"latency gate cannot run: {skipped}")
+        else:
+            print(f"⏭️  Latency gate ({args.max_overhead:g}x slowest task) skipped: {skipped}")
+
+    if failures:
+        print('❌ ' + '\n❌ '.join(failures))
+        sys.exit(1)
+    if skipped:
+        print('✅ Session features as expected; latency NOT verified on this machine')
+    else:
+        print('✅ Session features and latency as expected')
+
+
+if __name__ == '__main__':
+    main()
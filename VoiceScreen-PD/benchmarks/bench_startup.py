@@ -0,0 +1,82 @@
+"""Cold-start benchmark for the Flask app in each startup mode.
+
+Each configuration runs in a fresh interpreter and reports the time to
+import ``app``, the time until the readiness probe passes, and the latency
+of the first /analyze request (a generated WAV tone).
+
+    python benchmarks/bench_startup.py [--runs 3]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+PROBE = r'''
+import io, json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter() - start
+client = app.app.test_client()
+ready = None
+while ready is None:
+    if client.get('/health/ready').status_code == 200:
+        ready = time.perf_counter() - start
+    elif app.warmup.mode == 'lazy':
+        break
+    else:
+        time.sleep(0.005)
+wav = sys.stdin.buffer.read()
+request_start = time.perf_counter()
+response = client.post('/analyze', data={'audio': (io.BytesIO(wav), 'probe.wav')})
+first_request = time.perf_counter() - request_start
+# One write: the app's log listener thread must not land between the JSON and its newline
+sys.stdout.write(json.dumps({'import': imported, 'ready': ready, 'first_request': first_request,
+                             'total': time.perf_counter() - start, 'status': response.status_code}) + '\n')
+'''
+
+
+def tone_wav(seconds=3.0, sr=44100):
+    """A sustained vowel-like tone as WAV bytes"""
+    import io
+    import soundfile as sf
+    t = np.arange(int(seconds * sr)) / sr
+    y = sum(0.3 / k * np.sin(2 * np.pi * 140 * k * t) for k in range(1, 6))
+    buffer = io.BytesIO()
+    sf.write(buffer, y.astype(np.float32), sr, format='WAV')
+    return buffer.getvalue()
+
+
+def run(mode, prewarm, wav):
+    env = dict(os.environ, STARTUP_MODE=mode, PREWARM='1' if prewarm else '0')
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, env=env, input=wav,
+                            capture_output=True, check=True).stdout.decode()
+    # Log lines from the app may follow the result
+    return json.loads([line for line in output.splitlines() if line.startswith('{')][-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+    wav = tone_wav()
+
+    print(f"{'mode':<18} {'import_s':>9} {'ready_s':>8} {'first_req_s':>12} {'total_s':>8}")
+    for mode in ('eager', 'background', 'lazy'):
+        for prewarm in (False, True):
+            results = [run(mode, prewarm, wav) for _ in range(args.runs)]
+            median = {key: float(np.median([r[key] for r in results]))
+                      for key in ('import', 'first_request', 'total')}
+            ready = [r['ready'] for r in results if r['ready'] is not None]
+            label = f"{mode}{'+prewarm' if prewarm else ''}"
+            print(f"{label:<18} {median['import']:>9.3f} "
+                  f"{(f'{np.median(ready):.3f}' if ready else '-'):>8} "
+                  f"{median['first_request']:>12.3f} {median['total']:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Speedup and feature drift of voice-activity gating.
+
+Each synthetic voice is embedded in low-level background noise so that a
+given fraction of the recording is silence (split between the start and
+the end). Features are extracted with the gate off and on and compared
+with the features of the voice alone; the gate should remove most of the
+drift the silence causes while skipping the silent frames.
+
+    python benchmarks/bench_vad.py [--silence 0 0.25 0.5 0.75] [--backend fast]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_perturbation import perturbed_voice
+from bench_pipeline import VOICE_PROFILES
+from feature_engine import FeatureEngine
+
+
+def with_silence(y, sr, fraction, seed):
+    """``y`` padded with background noise to make ``fraction`` of the total"""
+    if fraction <= 0:
+        return y
+    rng = np.random.default_rng(seed)
+    total = int(len(y) / (1 - fraction))
+    noise = (3e-4 * rng.standard_normal(total - len(y))).astype(np.float32)
+    lead = len(noise) // 2
+    return np.concatenate([noise[:lead], y, noise[lead:]])
+
+
+def median_time(engine, y, backend, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        features, _ = engine.extract(y, pitch_backend=backend)
+        samples.append(time.perf_counter() - start)
+    return features, float(np.median(samples))
+
+
+def drift(features, reference):
+    """Median and max relative error over the reference feature names"""
+    errors = np.array([abs(features[name] - reference[name]) / max(abs(reference[name]), 1e-9)
+                       for name in reference])
+    return float(np.median(errors)), float(errors.max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--silence', type=float, nargs='+', default=[0.0, 0.25, 0.5, 0.75])
+    parser.add_argument('--seconds', type=float, default=4.0, help='phonation length')
+    parser.add_argument('--sr', type=int, default=22050)
+    parser.add_argument('--backend', default='fast', choices=['fast', 'accurate'])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    plain = FeatureEngine(sr=args.sr)
+    gated = FeatureEngine(sr=args.sr, vad=True)
+    voices = []
+    for seed, profile in enumerate(VOICE_PROFILES):
+        params = VOICE_PROFILES[profile]
+        y, _, _ = perturbed_voice(params['f0'], args.seconds, args.sr, params['jitter'],
+                                  params['shimmer'], noise=params['noise'], seed=seed)
+        voices.append((profile, y, plain.extract(y, pitch_backend=args.backend)[0]))
+    gated.extract(voices[0][1][:args.sr])
+
+    print(f"{'profile':<11} {'silence':>7} {'voiced':>7} {'off_ms':>8} {'on_ms':>8} {'speedup':>8} "
+          f"{'off_drift':>10} {'on_drift':>9} {'on_max':>7}")
+    for profile, y, reference in voices:
+        for fraction in args.silence:
+            signal = with_silence(y, args.sr, fraction, seed=1)
+            off, off_time = median_time(plain, signal, args.backend, args.repeat)
+            on, on_time = median_time(gated, signal, args.backend, args.repeat)
+            off_drift, _ = drift(off, reference)
+            on_drift, on_max = drift(on, reference)
+            print(f"{profile:<11} {fraction:>7.2f} {on['voiced_fraction']:>7.2f} "
+                  f"{1000 * off_time:>8.1f} {1000 * on_time:>8.1f} {off_time / on_time:>7.2f}x "
+                  f"{off_drift:>10.4f} {on_drift:>9.4f} {on_max:>7.3f}")
+
+
+if __name__ == '__main__':
+    main()
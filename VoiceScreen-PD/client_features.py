@@ -0,0 +1,88 @@
+"""Validation of per-frame statistics computed by the browser.
+
+In pre-extraction mode the recorder's AudioWorklet
+(static/js/feature-capture-processor.js) frames the recording exactly like
+FeatureEngine.frame at the engine rate and computes FeatureEngine.frame_stats
+for every frame: RMS, ZCR, spectral centroid and the energy and peak of the
+hop each frame owns. It uploads them with the 16-bit PCM it measured, and
+the server derives the VAD mask, RMS, max amplitude and ZCR from them.
+
+Trust model: the values feed the model, so nothing the client sends is
+taken on trust. Besides shape and range checks, the RMS, ZCR, energy and
+peak of every frame are recomputed from the PCM (cheap passes, no STFT)
+and must agree within STATS_RTOL/STATS_ATOL, which only absorbs float32 vs
+float64 rounding. The spectral centroid is not used at all: the engine
+takes it from the STFT it computes for the MFCCs anyway. A random sample of
+client centroids is still checked so an inconsistent client is rejected.
+The server therefore does about the same work as for an upload of the same
+PCM; what the browser saves is the upload size and the server-side decode
+and resample, not feature CPU.
+"""
+import numpy as np
+
+from feature_engine import CENTROID, ENERGY, FRAME_STATS, PEAK, RMS, ZCR
+
+# Relative/absolute agreement between browser and server values; the
+# browser computes in float64, the server in float32
+STATS_RTOL = 1e-3
+STATS_ATOL = 1e-6
+# Client centroids spot-checked for each upload (every other column is
+# checked on every frame)
+VERIFY_FRAMES = 32
+# Columns that feed features, recomputed for every frame
+LEVEL_COLUMNS = [RMS, ZCR, ENERGY, PEAK]
+
+
+class InvalidFrameStats(ValueError):
+    """Client frame statistics are malformed or disagree with the audio"""
+
+
+def pcm_samples(data):
+    """Little-endian 16-bit PCM bytes -> float32 in [-1, 1)"""
+    if len(data) % 2:
+        raise InvalidFrameStats('PCM length must be a whole number of 16-bit samples')
+    return np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+
+
+def parse_frame_stats(data, engine, n_samples):
+    """Little-endian float32 FRAME_STATS rows for ``n_samples`` of audio"""
+    n_frames = engine.n_frames(n_samples)
+    if len(data) != 4 * n_frames * len(FRAME_STATS):
+        raise InvalidFrameStats(f"expected {n_frames} frames of {len(FRAME_STATS)} float32 "
+                                f"values {FRAME_STATS} for {n_samples} samples")
+    stats = np.frombuffer(data, dtype='<f4').reshape(n_frames, len(FRAME_STATS))
+    if not np.isfinite(stats).all():
+        raise InvalidFrameStats('frame statistics must be finite')
+    tolerance = 1.0 + STATS_RTOL
+    limits = {RMS: 1.0, ZCR: 1.0, CENTROID: engine.sr / 2, PEAK: 1.0,
+              ENERGY: engine.hop_length}
+    for column, limit in limits.items():
+        values = stats[:, column]
+        if values.min() < 0 or values.max() > limit * tolerance:
+            raise InvalidFrameStats(f"{FRAME_STATS[column]} must be within [0, {limit:g}]")
+    return stats
+
+
+def _check_columns(stats, expected, index, columns, rtol, atol):
+    agree = np.isclose(stats[np.ix_(index, columns)], expected[:, columns], rtol=rtol, atol=atol)
+    if not agree.all():
+        row, column = np.argwhere(~agree)[0]
+        column = columns[column]
+        raise InvalidFrameStats(
+            f"{FRAME_STATS[column]} of frame {index[row]} is {stats[index[row], column]:.6g}, "
+            f"expected {expected[row, column]:.6g}")
+
+
+def verify_frame_stats(engine, y, stats, n_checks=VERIFY_FRAMES, rtol=STATS_RTOL, atol=STATS_ATOL):
+    """Recompute the frame statistics and raise InvalidFrameStats on disagreement
+
+    RMS, ZCR, energy and peak are checked on every frame; the centroid, which
+    no feature uses, on ``n_checks`` random frames. Returns the frame count.
+    """
+    n_frames = len(stats)
+    _check_columns(stats, engine.frame_stats(y, centroid=False), np.arange(n_frames),
+                   LEVEL_COLUMNS, rtol, atol)
+    # Not seeded from the upload: the client must not be able to predict it
+    index = np.sort(np.random.default_rng().choice(n_frames, size=min(n_checks, n_frames), replace=False))
+    _check_columns(stats, engine.frame_stats(y, index), index, [CENTROID], rtol, atol)
+    return n_frames
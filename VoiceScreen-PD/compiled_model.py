@@ -0,0 +1,202 @@
+"""Pickle-free inference for the trained tree ensemble.
+
+``export_model`` flattens a fitted RandomForestClassifier (or XGBoost
+classifier) and its StandardScaler into a few NumPy arrays - node features,
+thresholds, children and leaf values - saved as one .npz file.
+``CompiledModel`` evaluates every tree of the ensemble at once with
+vectorized index arithmetic: one pass per tree level, no sklearn input
+validation, and the class is derived from the probability instead of a
+second traversal.
+
+Run ``python compiled_model.py`` to export the current model/*.pkl files.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+COMPILED_MODEL_PATH = 'model/parkinson_model.npz'
+# Pickles the export was made from; a changed pickle makes the export stale
+SOURCE_PATHS = ('model/parkinson_model.pkl', 'model/feature_scaler.pkl')
+
+
+def _digest(paths):
+    """Content hash of the given files"""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        with open(path, 'rb') as handle:
+            digest.update(handle.read())
+    return digest.hexdigest()
+
+
+def _flatten_sklearn_forest(model):
+    """Node arrays for a fitted sklearn forest (or single tree)"""
+    estimators = getattr(model, 'estimators_', [model])
+    positive = list(model.classes_).index(model.classes_[-1])
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        index = np.arange(tree.node_count) + offset
+        is_leaf = tree.children_left == -1
+        # Leaves point at themselves, so extra iterations are no-ops
+        left.append(np.where(is_leaf, index, tree.children_left + offset))
+        right.append(np.where(is_leaf, index, tree.children_right + offset))
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+        counts = tree.value[:, 0, :]
+        value.append(counts[:, positive] / np.maximum(counts.sum(axis=1), 1e-12))
+        roots.append(offset)
+        offset += tree.node_count
+    depth = max(estimator.tree_.max_depth for estimator in estimators)
+    return feature, threshold, left, right, value, roots, depth
+
+
+def _flatten_xgboost(model):
+    """Node arrays for a fitted binary XGBoost classifier"""
+    booster = model.get_booster()
+    names = booster.feature_names
+    config = json.loads(booster.save_config())
+    base_score = float(config['learner']['learner_model_param']['base_score'])
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    depth = 0
+    for dump in booster.get_dump(dump_format='json'):
+        nodes = []
+
+        def walk(node, level):
+            nodes.append((node, level))
+            for child in node.get('children', []):
+                walk(child, level + 1)
+
+        walk(json.loads(dump), 0)
+        local = {node['nodeid']: offset + i for i, (node, _) in enumerate(nodes)}
+        for i, (node, level) in enumerate(nodes):
+            depth = max(depth, level)
+            if 'leaf' in node:
+                feature.append([0])
+                threshold.append([np.inf])
+                left.append([offset + i])
+                right.append([offset + i])
+                value.append([node['leaf']])
+            else:
+                split = node['split']
+                column = names.index(split) if names and split in names else int(split.lstrip('f'))
+                feature.append([column])
+                # XGBoost goes left when x < t (float32); x <= prev(t) is equivalent
+                threshold.append([float(np.nextafter(np.float32(node['split_condition']),
+                                                     np.float32(-np.inf)))])
+                left.append([local[node['yes']]])
+                right.append([local[node['no']]])
+                value.append([0.0])
+        roots.append(offset)
+        offset += len(nodes)
+    margin = float(np.log(base_score / (1.0 - base_score)))
+    return feature, threshold, left, right, value, roots, depth, margin
+
+
+def export_model(model, scaler, path=COMPILED_MODEL_PATH, feature_names=None, source_paths=()):
+    """Flatten a fitted model + StandardScaler into a compact .npz
+
+    ``source_paths`` are the pickles the model was saved to; their content
+    hash is recorded so ``load_compiled_model`` can detect a stale export.
+    """
+    if hasattr(model, 'get_booster'):
+        feature, threshold, left, right, value, roots, depth, margin = _flatten_xgboost(model)
+        kind = 'boosted'
+    else:
+        feature, threshold, left, right, value, roots, depth = _flatten_sklearn_forest(model)
+        kind, margin = 'forest', 0.0
+
+    n_features = int(scaler.n_features_in_)
+    mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+    np.savez(
+        path,
+        kind=np.array(kind),
+        classes=np.asarray(model.classes_),
+        feature_names=np.array(feature_names if feature_names is not None else [], dtype=str),
+        scaler_mean=np.asarray(mean, dtype=np.float64),
+        scaler_scale=np.asarray(scale, dtype=np.float64),
+        feature=np.concatenate(feature).astype(np.int32),
+        threshold=np.concatenate(threshold).astype(np.float64),
+        left=np.concatenate(left).astype(np.int32),
+        right=np.concatenate(right).astype(np.int32),
+        value=np.concatenate(value).astype(np.float64),
+        roots=np.asarray(roots, dtype=np.int32),
+        depth=np.array(depth),
+        base_margin=np.array(margin),
+        source_digest=np.array(_digest(source_paths) if source_paths else ''),
+    )
+    return path
+
+
+class CompiledModel:
+    """Vectorized evaluator for an exported tree ensemble"""
+
+    def __init__(self, arrays):
+        self.kind = str(arrays['kind'])
+        self.classes = arrays['classes']
+        self.feature_names = [str(name) for name in arrays['feature_names']]
+        self.mean = arrays['scaler_mean']
+        self.scale = arrays['scaler_scale']
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.depth = int(arrays['depth'])
+        self.base_margin = float(arrays['base_margin'])
+        self.n_features = len(self.mean)
+        self.source_digest = str(arrays.get('source_digest', ''))
+
+    @classmethod
+    def load(cls, path=COMPILED_MODEL_PATH):
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls({name: arrays[name] for name in arrays.files})
+
+    def predict_proba(self, X):
+        """Probability of the positive class for each row of ``X`` (unscaled)"""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[1]} features, but the model is expecting "
+                             f"{self.n_features} features as input.")
+        # Trees compare in float32, as sklearn and XGBoost do
+        X_scaled = ((X - self.mean) / self.scale).astype(np.float32)
+        # Flat take() on 1-D arrays is much cheaper than 2-D fancy indexing
+        flat = X_scaled.ravel()
+        row_offset = (np.arange(len(X_scaled)) * self.n_features)[:, None]
+        node = np.broadcast_to(self.roots, (len(X_scaled), len(self.roots))).copy()
+        for _ in range(self.depth):
+            go_left = flat.take(row_offset + self.feature.take(node)) <= self.threshold.take(node)
+            node = np.where(go_left, self.left.take(node), self.right.take(node))
+        leaves = self.value.take(node)
+        if self.kind == 'boosted':
+            return 1.0 / (1.0 + np.exp(-(self.base_margin + leaves.sum(axis=1))))
+        return leaves.mean(axis=1)
+
+    def predict(self, X):
+        """Class labels derived from the probabilities (no second traversal)"""
+        return self.classes[(self.predict_proba(X) > 0.5).astype(int)]
+
+
+def load_compiled_model(path=COMPILED_MODEL_PATH, source_paths=SOURCE_PATHS):
+    """Load the export, or None if it is missing or its pickles changed"""
+    if not os.path.exists(path):
+        return None
+    compiled = CompiledModel.load(path)
+    if compiled.source_digest and all(os.path.exists(source) for source in source_paths):
+        if _digest(source_paths) != compiled.source_digest:
+            return None
+    return compiled
+
+
+if __name__ == '__main__':
+    import joblib
+
+    model = joblib.load('model/parkinson_model.pkl')
+    scaler = joblib.load('model/feature_scaler.pkl')
+    export_model(model, scaler, source_paths=SOURCE_PATHS)
+    print(f"✅ Exported compiled model to {COMPILED_MODEL_PATH}")
@@ -1,4 +1,3 @@
-import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
@@ -6,64 +5,52 @@ from sklearn.preprocessing import StandardScaler
 import joblib
 import os
 
-def create_sample_dataset():
-    """Create a realistic sample dataset for demonstration"""
-    np.random.seed(42)
-    n_samples = 200
-    
-    # Feature names based on UCI Parkinson's dataset
-    features = [
-        'mean_f0', 'std_f0', 'min_f0', 'max_f0', 
-        'jitter_absolute', 'jitter_relative',
-        'shimmer_absolute', 'shimmer_relative', 'hnr'
-    ] + [f'mfcc_{i+1}_mean' for i in range(13)] + [f'mfcc_{i+1}_std' for i in range(13)]
+from compiled_model import SOURCE_PATHS, export_model
+from feature_schema import FEATURE_NAMES
+
+# (mean, std) per schema feature for healthy (class 0) and Parkinson's
+# (class 1) speakers, loosely based on the UCI Parkinson's dataset and scaled
+# to what FeatureEngine measures on a sustained vowel
+FEATURE_DISTRIBUTIONS = {
+    'mean_f0': ((150, 35), (145, 35)),                       # slightly lower pitch
+    'std_f0': ((1.5, 1.0), (3.0, 1.5)),                      # higher variation
+    'f0_range': ((8, 5), (15, 8)),
+    'jitter_relative': ((0.004, 0.0015), (0.009, 0.003)),    # higher jitter
+    'shimmer_relative': ((0.035, 0.01), (0.065, 0.02)),      # higher shimmer
+    'hnr': ((22, 3), (16, 4)),                               # lower HNR
+    'rms_energy': ((0.06, 0.03), (0.05, 0.03)),
+    'max_amplitude': ((0.3, 0.15), (0.3, 0.15)),
+    'spectral_centroid_mean': ((1400, 400), (1800, 500)),    # breathier voice
+    'zcr_mean': ((0.04, 0.02), (0.05, 0.025)),
+    'mfcc_1_mean': ((-330, 50), (-300, 50)),
+    'mfcc_2_mean': ((80, 25), (65, 25)),
+    'mfcc_3_mean': ((20, 20), (25, 20)),
+    'mfcc_4_mean': ((20, 15), (20, 15)),
+    'mfcc_5_mean': ((5, 15), (8, 15)),
+    'mfcc_1_std': ((25, 10), (20, 10)),
+    'mfcc_2_std': ((12, 5), (10, 5)),
+    'mfcc_3_std': ((10, 4), (9, 4)),
+    'mfcc_4_std': ((8, 3), (8, 3)),
+    'mfcc_5_std': ((7, 3), (7, 3)),
+}
+
+def create_sample_dataset(n_samples=200, parkinsons_fraction=0.3, seed=42):
+    """Create a realistic sample dataset for demonstration
     
-    # Create realistic data
-    data = []
-    targets = []
+    Every feature column is drawn in one vectorized call, so generating
+    millions of rows takes seconds.
+    """
+    rng = np.random.default_rng(seed)
+    features = list(FEATURE_NAMES)
     
-    for i in range(n_samples):
-        # Healthy individuals (class 0)
-        if i < 140:
-            row = [
-                np.random.normal(120, 20),    # mean_f0 - normal pitch
-                np.random.normal(15, 5),      # std_f0
-                np.random.normal(80, 10),     # min_f0
-                np.random.normal(180, 20),    # max_f0
-                np.random.normal(0.00004, 0.00001),  # jitter_absolute
-                np.random.normal(0.003, 0.001),      # jitter_relative
-                np.random.normal(0.02, 0.005),       # shimmer_absolute
-                np.random.normal(0.03, 0.01),        # shimmer_relative
-                np.random.normal(20, 3),             # hnr - higher for healthy
-            ]
-            # Add MFCC features
-            for j in range(26):  # 13 means + 13 stds
-                row.append(np.random.normal(0, 1))
-            
-            data.append(row)
-            targets.append(0)
-        
-        # Parkinson's individuals (class 1)
-        else:
-            row = [
-                np.random.normal(110, 25),    # mean_f0 - slightly lower
-                np.random.normal(25, 8),      # std_f0 - higher variation
-                np.random.normal(70, 15),     # min_f0
-                np.random.normal(160, 25),    # max_f0
-                np.random.normal(0.00008, 0.00002),  # jitter_absolute - higher
-                np.random.normal(0.006, 0.002),      # jitter_relative - higher
-                np.random.normal(0.035, 0.008),      # shimmer_absolute - higher
-                np.random.normal(0.05, 0.015),       # shimmer_relative - higher
-                np.random.normal(15, 4),             # hnr - lower for Parkinson's
-            ]
-            # Add MFCC features with different distribution
-            for j in range(26):
-                row.append(np.random.normal(0.5, 1.2))
-            
-            data.append(row)
-            targets.append(1)
+    # First 70% healthy, the rest Parkinson's (as before)
+    targets = (np.arange(n_samples) >= round(n_samples * (1 - parkinsons_fraction))).astype(int)
+    params = np.array([FEATURE_DISTRIBUTIONS[name] for name in features])  # (features, class, 2)
+    means = params[:, :, 0].T[targets]
+    stds = params[:, :, 1].T[targets]
+    data = means + stds * rng.standard_normal((n_samples, len(features)))
     
-    return np.array(data), np.array(targets), features
+    return data, targets, features
 
 def train_simple_model():
     """Train a simple model with sample data"""
@@ -107,11 +94,13 @@ def train_simple_model():
     
     joblib.dump(model, 'model/parkinson_model.pkl')
     joblib.dump(scaler, 'model/feature_scaler.pkl')
+    export_model(model, scaler, feature_names=feature_names, source_paths=SOURCE_PATHS)
     
     print("✅ Model trained and saved successfully!")
     print("📁 Model files created in 'model/' directory:")
     print("   - parkinson_model.pkl")
     print("   - feature_scaler.pkl")
+    print("   - parkinson_model.npz (compiled for serving)")
     
     return model, scaler
 
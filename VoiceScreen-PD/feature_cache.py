@@ -0,0 +1,158 @@
+"""Content-addressed cache for extracted voice features.
+
+Entries are keyed by a hash of the decoded PCM plus the extractor
+configuration, so re-submitted recordings skip feature extraction entirely.
+There is an in-process LRU tier bounded by size and an optional on-disk
+sqlite tier that survives restarts and is shared between workers. sqlite
+connections must not cross a fork, so each process opens its own.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def audio_fingerprint(y, sr, config_key):
+    """Stable key for a decoded signal and the extractor config"""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{config_key}|{sr}|{y.dtype.str}|".encode())
+    digest.update(np.ascontiguousarray(y))
+    return digest.hexdigest()
+
+
+def fingerprint_blocks(blocks, sr, config_key):
+    """``audio_fingerprint`` of float32 blocks, without joining them"""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{config_key}|{sr}|{np.dtype(np.float32).str}|".encode())
+    for block in blocks:
+        digest.update(np.ascontiguousarray(block, dtype=np.float32))
+    return digest.hexdigest()
+
+
+def source_fingerprint(source, chunk_size=1 << 20):
+    """Hash of the raw bytes of a path or seekable stream (position is kept)
+
+    Used where the audio could not be decoded; a missing path hashes its name.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    if isinstance(source, (str, os.PathLike)):
+        if not os.path.exists(source):
+            digest.update(os.fsencode(source))
+            return digest.hexdigest()
+        with open(source, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    position = source.tell()
+    source.seek(0)
+    try:
+        for chunk in iter(lambda: source.read(chunk_size), b''):
+            digest.update(chunk)
+    finally:
+        source.seek(position)
+    return digest.hexdigest()
+
+
+def seeded_rng(key):
+    """Independent numpy Generator seeded from a hex fingerprint"""
+    return np.random.default_rng(int(key, 16))
+
+
+class FeatureCache:
+    """Two-tier (memory LRU + optional sqlite) feature cache"""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, disk_path=None):
+        self.max_bytes = max_bytes
+        self.disk_path = disk_path or None
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'memory_hits': 0,
+                          'disk_hits': 0, 'evictions': 0}
+        self._disk = None
+        self._disk_pid = None
+        if self.disk_path:
+            disk = self._connection()
+            disk.execute('PRAGMA journal_mode=WAL')
+            disk.execute(
+                'CREATE TABLE IF NOT EXISTS features (key TEXT PRIMARY KEY, payload TEXT NOT NULL)')
+            disk.commit()
+
+    def _connection(self):
+        """This process's sqlite connection, opened after a fork"""
+        if self._disk_pid != os.getpid():
+            self._disk = sqlite3.connect(self.disk_path, check_same_thread=False)
+            self._disk_pid = os.getpid()
+        return self._disk
+
+    def get(self, key):
+        """Cached features for ``key`` (a fresh dict) or None"""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self._counters['hits'] += 1
+                self._counters['memory_hits'] += 1
+                return json.loads(payload)
+
+            if self.disk_path:
+                row = self._connection().execute(
+                    'SELECT payload FROM features WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    self._store(key, row[0])
+                    self._counters['hits'] += 1
+                    self._counters['disk_hits'] += 1
+                    return json.loads(row[0])
+
+            self._counters['misses'] += 1
+            return None
+
+    def put(self, key, features):
+        """Store a feature dict in every tier"""
+        payload = json.dumps({name: float(value) for name, value in features.items()})
+        with self._lock:
+            self._store(key, payload)
+            if self.disk_path:
+                disk = self._connection()
+                disk.execute(
+                    'INSERT OR REPLACE INTO features (key, payload) VALUES (?, ?)', (key, payload))
+                disk.commit()
+
+    def _store(self, key, payload):
+        """Insert into the memory tier, evicting least recently used entries"""
+        size = len(payload) + len(key)
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous) + len(key)
+        self._entries[key] = payload
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            old_key, old_payload = self._entries.popitem(last=False)
+            self._bytes -= len(old_payload) + len(old_key)
+            self._counters['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self.disk_path:
+                disk = self._connection()
+                disk.execute('DELETE FROM features')
+                disk.commit()
+
+    def stats(self):
+        """Counters for the /health endpoint"""
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return dict(self._counters,
+                        entries=len(self._entries),
+                        bytes=self._bytes,
+                        max_bytes=self.max_bytes,
+                        hit_rate=round(self._counters['hits'] / lookups, 4) if lookups else 0.0,
+                        disk_enabled=self.disk_path is not None)
@@ -0,0 +1,301 @@
+"""Single-pass acoustic feature engine for VoiceScreen PD.
+
+The signal is framed once and a single magnitude spectrogram is computed;
+the spectral centroid, MFCCs, zero crossing rate and RMS are all derived
+from those shared buffers instead of letting every librosa feature call
+re-frame the audio and redo its own STFT.
+"""
+import time
+import warnings
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    import librosa
+    librosa_available = True
+except ImportError:
+    librosa_available = False
+
+from perturbation import perturbation_features
+from pitch import pitch_stats, track_pitch
+from vad import active_spans, voice_activity
+
+# Bump whenever extraction output changes so cached features are invalidated
+FEATURE_ENGINE_VERSION = 6
+
+# Columns of the per-frame statistics a client may compute itself (see
+# FeatureEngine.frame_stats and client_features.py)
+FRAME_STATS = ('rms', 'zcr', 'centroid', 'energy', 'peak')
+RMS, ZCR, CENTROID, ENERGY, PEAK = range(len(FRAME_STATS))
+
+
+@lru_cache(maxsize=8)
+def mel_filterbank(sr, n_fft, n_mels, fmax=None):
+    """Mel filterbank for a given configuration, built once per process"""
+    with warnings.catch_warnings():
+        # Bands above a low native rate's Nyquist are empty, as they are
+        # (up to the resampler's stopband) after upsampling to the reference
+        warnings.simplefilter('ignore', UserWarning)
+        return librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels, fmax=fmax).astype(np.float32)
+
+
+@lru_cache(maxsize=8)
+def dct_matrix(n_mfcc, n_mels):
+    """Orthonormal DCT-II basis, equivalent to scipy.fft.dct(norm='ortho')"""
+    n = np.arange(n_mels)
+    k = np.arange(n_mfcc)[:, None]
+    basis = np.cos(np.pi / n_mels * (n + 0.5) * k) * np.sqrt(2.0 / n_mels)
+    basis[0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+
+
+@lru_cache(maxsize=8)
+def hann_window(n_fft):
+    """Periodic Hann window, matching librosa's default STFT window"""
+    n = np.arange(n_fft)
+    return (0.5 - 0.5 * np.cos(2.0 * np.pi * n / n_fft)).astype(np.float32)
+
+
+class FeatureEngine:
+    """Compute the spectral feature set from one framing and one STFT
+
+    ``reference`` is the ``(sr, n_fft)`` the features are expressed in when
+    the engine runs at another sample rate (see ``at_rate``): the mel bank
+    and spectral centroid stop at the reference Nyquist, mel power is scaled
+    to the reference frame length and ZCR is per reference-rate sample.
+
+    With ``vad=True`` a voice-activity mask (see vad.py) is computed once from
+    the frame RMS/ZCR, and pitch, perturbation, STFT, spectral and MFCC
+    statistics only see the active frames.
+    """
+
+    def __init__(self, sr=22050, n_fft=2048, hop_length=512, n_mels=128,
+                 n_mfcc=5, top_db=80.0, pitch_backend='fast', reference=None, vad=False):
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mels = n_mels
+        self.n_mfcc = n_mfcc
+        self.top_db = top_db
+        self.pitch_backend = pitch_backend
+        self.reference = reference
+        self.vad = vad
+        if reference is not None:
+            reference_sr, reference_n_fft = reference
+            self.fmax = reference_sr / 2
+            self.zcr_scale = sr / reference_sr
+            self.mel_db_offset = float(20.0 * np.log10(reference_n_fft / n_fft))
+        else:
+            self.fmax = None
+            self.zcr_scale = 1.0
+            self.mel_db_offset = 0.0
+
+    def at_rate(self, sr):
+        """An engine for audio at ``sr`` producing features comparable to this one
+
+        Frame and hop keep (close to) the same duration, rounded to a power
+        of two for the FFT, so the pyin/YIN frames cover the same time span.
+        """
+        if sr == self.sr:
+            return self
+        n_fft = int(2 ** round(np.log2(self.n_fft * sr / self.sr)))
+        hop_length = max(1, n_fft * self.hop_length // self.n_fft)
+        return FeatureEngine(sr=sr, n_fft=n_fft, hop_length=hop_length, n_mels=self.n_mels,
+                             n_mfcc=self.n_mfcc, top_db=self.top_db,
+                             pitch_backend=self.pitch_backend, reference=(self.sr, self.n_fft),
+                             vad=self.vad)
+
+    def config_key(self):
+        """Identifies everything that affects the extracted values"""
+        key = (f"engine-v{FEATURE_ENGINE_VERSION}:sr={self.sr}:n_fft={self.n_fft}:"
+               f"hop={self.hop_length}:mels={self.n_mels}:mfcc={self.n_mfcc}:"
+               f"top_db={self.top_db}:pitch={self.pitch_backend}")
+        if self.reference is not None:
+            key += f":reference={self.reference[0]}/{self.reference[1]}"
+        if self.vad:
+            key += ":vad"
+        return key
+
+    def frame(self, y):
+        """Centered, zero-padded frames of ``y`` as a strided view (no copy)"""
+        pad = self.n_fft // 2
+        y_padded = np.pad(np.asarray(y, dtype=np.float32), pad, mode='constant')
+        if len(y_padded) < self.n_fft:
+            y_padded = np.pad(y_padded, (0, self.n_fft - len(y_padded)))
+        return sliding_window_view(y_padded, self.n_fft)[::self.hop_length]
+
+    def magnitude_spectrogram(self, frames):
+        """|STFT| with shape (n_frames, 1 + n_fft // 2)"""
+        return np.abs(np.fft.rfft(frames * hann_window(self.n_fft), axis=1))
+
+    def spectral_centroid(self, S):
+        freqs = np.linspace(0, self.sr / 2, S.shape[1], dtype=np.float32)
+        if self.fmax is not None and self.fmax < self.sr / 2:
+            n_bins = int(np.searchsorted(freqs, self.fmax, side='right'))
+            S, freqs = S[:, :n_bins], freqs[:n_bins]
+        total = S.sum(axis=1)
+        total[total < np.finfo(np.float32).tiny] = 1.0
+        return (S @ freqs) / total
+
+    def zero_crossing_rate(self, frames, threshold=1e-10):
+        signs = np.signbit(np.where(np.abs(frames) <= threshold, 0, frames))
+        crossings = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1)
+        return crossings * (self.zcr_scale / frames.shape[1])
+
+    def frame_rms(self, frames):
+        """Per-frame RMS, equivalent to librosa.feature.rms(y=y)"""
+        return np.sqrt(np.einsum('ij,ij->i', frames, frames) / frames.shape[1])
+
+    def log_mel(self, S):
+        """Log-power mel spectrogram (dB, before the top_db floor)"""
+        mel = (S ** 2) @ mel_filterbank(self.sr, self.n_fft, self.n_mels, self.fmax).T
+        log_mel = 10.0 * np.log10(np.maximum(mel, 1e-10))
+        if self.mel_db_offset:
+            log_mel += self.mel_db_offset
+        return log_mel
+
+    def cepstrum(self, log_mel, max_db=None):
+        """MFCCs from log-mel frames; ``max_db`` is the global peak for top_db"""
+        if self.top_db is not None:
+            peak = log_mel.max() if max_db is None else max_db
+            log_mel = np.maximum(log_mel, peak - self.top_db)
+        return log_mel @ dct_matrix(self.n_mfcc, self.n_mels).T
+
+    def mfcc(self, S):
+        """MFCCs from the shared magnitude spectrogram (n_frames, n_mfcc)"""
+        return self.cepstrum(self.log_mel(S))
+
+    def frame_stats(self, y, index=None, centroid=True):
+        """Per-frame FRAME_STATS rows, shape (n_frames, 5), for frames ``index``
+
+        RMS, ZCR and spectral centroid of each frame, and the energy (sum of
+        squares) and peak of the hop of samples the frame owns (see
+        ``_sample_ranges``). Owned hops tile the signal, so their sums and
+        maxima give the whole-signal or gated RMS and the max amplitude.
+        With ``centroid=False`` the STFT is skipped and that column is NaN.
+        """
+        y = np.asarray(y, dtype=np.float32)
+        frames = self.frame(y)
+        index = np.arange(len(frames)) if index is None else np.asarray(index)
+        frames = frames[index]
+        stats = np.full((len(index), len(FRAME_STATS)), np.nan, dtype=np.float32)
+        stats[:, RMS] = self.frame_rms(frames)
+        stats[:, ZCR] = self.zero_crossing_rate(frames)
+        if centroid:
+            stats[:, CENTROID] = self.spectral_centroid(self.magnitude_spectrogram(frames))
+        # Lay the owned hops out as rows: frame i owns samples from
+        # i * hop - hop // 2, so shift by half a hop and zero-fill the tail
+        half = self.hop_length // 2
+        hops = np.zeros(self.n_frames(len(y)) * self.hop_length, dtype=np.float32)
+        hops[half:half + len(y)] = y[:len(hops) - half]
+        hops = hops.reshape(-1, self.hop_length)[index]
+        stats[:, ENERGY] = np.einsum('ij,ij->i', hops.astype(np.float64), hops)
+        stats[:, PEAK] = np.abs(hops).max(axis=1)
+        return stats
+
+    def n_frames(self, n_samples):
+        """Number of frames ``frame`` cuts from ``n_samples`` samples"""
+        return 1 + max(n_samples + 2 * (self.n_fft // 2) - self.n_fft, 0) // self.hop_length
+
+    def _sample_ranges(self, spans, n_samples):
+        """Sample ranges covered by frame spans (each frame owns one hop)"""
+        half = self.hop_length // 2
+        return [(max(0, start * self.hop_length - half), min(n_samples, stop * self.hop_length - half))
+                for start, stop in spans]
+
+    def _track_pitch(self, y, frames, spans, backend):
+        """f0 for the analysed frames; pyin runs once per active span"""
+        if backend != 'accurate' or spans is None:
+            return track_pitch(y, self.sr, frames, backend=backend, hop_length=self.hop_length)
+        f0, voiced = [], []
+        for start, stop in spans:
+            segment = y[start * self.hop_length:stop * self.hop_length]
+            # pyin frames the segment itself; ``frames`` only sets the frame length
+            span_f0, span_voiced = track_pitch(segment, self.sr, frames, backend=backend,
+                                               hop_length=self.hop_length)
+            f0.append(span_f0[:stop - start])
+            voiced.append(span_voiced[:stop - start])
+        return np.concatenate(f0), np.concatenate(voiced)
+
+    def extract(self, y, pitch_backend=None, frame_stats=None):
+        """Extract features from a mono signal; returns (features, timings)
+
+        ``pitch_backend`` overrides the engine default ('fast' or 'accurate').
+        With VAD enabled, ``features['voiced_fraction']`` is the share of
+        frames that were analysed. ``frame_stats`` are FRAME_STATS rows for
+        every frame, computed elsewhere (the browser) and already verified;
+        the VAD, RMS, max amplitude and ZCR are then derived from them.
+        """
+        timings = {}
+        features = {}
+
+        start = time.perf_counter()
+        frames = self.frame(y)
+        timings['frame'] = time.perf_counter() - start
+
+        spans = None
+        zcr = None
+        if self.vad:
+            start = time.perf_counter()
+            if frame_stats is None:
+                zcr = self.zero_crossing_rate(frames)
+                mask = voice_activity(self.frame_rms(frames), zcr)
+            else:
+                zcr = frame_stats[:, ZCR]
+                mask = voice_activity(frame_stats[:, RMS], zcr)
+            features['voiced_fraction'] = float(mask.mean())
+            # Nothing detected: analyse everything rather than return defaults
+            if mask.any() and not mask.all():
+                spans = active_spans(mask)
+                frames = frames[mask]
+                zcr = zcr[mask]
+            timings['vad'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if frame_stats is not None:
+            analysed = frame_stats if spans is None else frame_stats[mask]
+            n_samples = len(y) if spans is None else sum(b - a for a, b in self._sample_ranges(spans, len(y)))
+            energy = float(analysed[:, ENERGY].sum(dtype=np.float64))
+            features['rms_energy'] = float(np.sqrt(energy / max(1, n_samples)))
+            features['max_amplitude'] = float(frame_stats[:, PEAK].max())
+            if zcr is None:
+                zcr = analysed[:, ZCR]
+        elif spans is None:
+            features['rms_energy'] = float(np.sqrt(np.mean(np.square(y, dtype=np.float64))))
+            features['max_amplitude'] = float(np.max(np.abs(y)))
+        else:
+            ranges = self._sample_ranges(spans, len(y))
+            energy = sum(float(np.square(y[a:b], dtype=np.float64).sum()) for a, b in ranges)
+            features['rms_energy'] = float(np.sqrt(energy / max(1, sum(b - a for a, b in ranges))))
+            features['max_amplitude'] = float(np.max(np.abs(y)))
+        timings['amplitude'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        f0, voiced = self._track_pitch(y, frames, spans, pitch_backend or self.pitch_backend)
+        features.update(pitch_stats(f0, voiced))
+        timings['pitch'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        features.update(perturbation_features(
+            frames, f0, voiced, self.sr, step=max(1, self.n_fft // self.hop_length)))
+        timings['perturbation'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        S = self.magnitude_spectrogram(frames)
+        timings['stft'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        features['spectral_centroid_mean'] = float(np.mean(self.spectral_centroid(S)))
+        features['zcr_mean'] = float(np.mean(zcr if zcr is not None else self.zero_crossing_rate(frames)))
+        timings['spectral'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        mfccs = self.mfcc(S)
+        for i in range(self.n_mfcc):
+            features[f'mfcc_{i+1}_mean'] = float(np.mean(mfccs[:, i]))
+            features[f'mfcc_{i+1}_std'] = float(np.std(mfccs[:, i]))
+        timings['mfcc'] = time.perf_counter() - start
+
+        return features, timings
@@ -0,0 +1,46 @@
+"""Feature schema shared by the extractors, the training scripts and serving.
+
+FEATURE_NAMES is the column order of every model the app can load: the
+training scripts build their matrices in this order and pass the names to
+``export_model``, and the model registry rejects bundles whose names or
+width differ when it loads them, so requests never discover a mismatch.
+``feature_vector``/``feature_matrix`` write extracted feature dicts straight
+into float32 arrays in schema order; FEATURE_INDEX maps a name to its
+column for code that addresses single features (the training scripts).
+"""
+import numpy as np
+
+N_MFCC = 5
+
+# Column order of the model input
+FEATURE_NAMES = (
+    'mean_f0', 'std_f0', 'f0_range', 'jitter_relative',
+    'shimmer_relative', 'hnr', 'rms_energy', 'max_amplitude',
+    'spectral_centroid_mean', 'zcr_mean'
+) + tuple(f'mfcc_{i+1}_mean' for i in range(N_MFCC)) + tuple(f'mfcc_{i+1}_std' for i in range(N_MFCC))
+N_FEATURES = len(FEATURE_NAMES)
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_NAMES)}
+# Value used when an extractor did not produce a feature
+MISSING_VALUE = 0.0
+
+
+def missing_features(features):
+    """Schema names absent from a feature dict (or list of names)"""
+    return [name for name in FEATURE_NAMES if name not in features]
+
+
+def feature_vector(features, out=None):
+    """Write one feature dict into a float32 row of length N_FEATURES"""
+    if out is None:
+        out = np.empty(N_FEATURES, dtype=np.float32)
+    get = features.get
+    out[:] = [get(name, MISSING_VALUE) for name in FEATURE_NAMES]
+    return out
+
+
+def feature_matrix(feature_dicts):
+    """Stack feature dicts into a float32 ``(len(feature_dicts), N_FEATURES)`` matrix"""
+    values = np.fromiter((features.get(name, MISSING_VALUE) for features in feature_dicts
+                          for name in FEATURE_NAMES),
+                         dtype=np.float32, count=len(feature_dicts) * N_FEATURES)
+    return values.reshape(len(feature_dicts), N_FEATURES)
@@ -0,0 +1,167 @@
+"""Columnar feature store for training on directories of recordings.
+
+``build_feature_store`` walks a directory of audio files, extracts the
+serving features for every file on a process pool (the same FeatureEngine
+settings as the app) and saves one .npz with a float32 column per feature
+plus ``path``, ``label``, ``size`` and ``mtime``. Re-running it only
+extracts new or modified files; a different engine configuration
+invalidates the whole store.
+
+Labels come from the first directory level below the root, e.g.
+``corpus/healthy/*.wav`` and ``corpus/parkinsons/*.wav`` (see LABEL_NAMES),
+or from a CSV of ``path,label`` rows.
+"""
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from audio_io import decode_audio, resample
+from feature_engine import FeatureEngine
+from feature_schema import N_MFCC
+
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.ogg', '.mp3', '.webm', '.m4a')
+LABEL_NAMES = {'healthy': 0, 'control': 0, 'hc': 0, '0': 0,
+               'parkinsons': 1, 'parkinson': 1, 'pd': 1, '1': 1}
+
+_engine = None
+
+
+def _worker_engine(sr, vad):
+    global _engine
+    if _engine is None:
+        _engine = FeatureEngine(sr=sr, n_mfcc=N_MFCC, vad=vad)
+    return _engine
+
+
+def _extract_file(args):
+    """Process-pool worker: ``(path, features or None, error or None)``"""
+    path, sr, vad = args
+    try:
+        y, native_sr = decode_audio(path)
+        features, _ = _worker_engine(sr, vad).extract(resample(y, native_sr, sr))
+        return path, features, None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def find_recordings(root, labels_csv=None):
+    """``{path: label}`` for the audio files under ``root`` (-1 if unknown)"""
+    explicit = {}
+    if labels_csv:
+        with open(labels_csv, newline='') as handle:
+            for row in csv.reader(handle):
+                if len(row) >= 2 and row[1].strip().lower() in LABEL_NAMES:
+                    explicit[os.path.normpath(os.path.join(root, row[0]))] = LABEL_NAMES[row[1].strip().lower()]
+
+    recordings = {}
+    for directory, _, files in os.walk(root):
+        for name in sorted(files):
+            if not name.lower().endswith(AUDIO_EXTENSIONS):
+                continue
+            path = os.path.normpath(os.path.join(directory, name))
+            if path in explicit:
+                recordings[path] = explicit[path]
+                continue
+            top = os.path.relpath(path, root).split(os.sep)[0].lower()
+            recordings[path] = LABEL_NAMES.get(top, -1)
+    return recordings
+
+
+def load_feature_store(path):
+    """Load a store as a dict of column arrays (plus ``config_key``)"""
+    with np.load(path, allow_pickle=False) as store:
+        return {name: store[name] for name in store.files}
+
+
+def store_matrix(store, feature_names=None):
+    """``(X, y, feature_names)`` for the labelled rows of a store"""
+    if feature_names is None:
+        feature_names = [str(name) for name in store['feature_names']]
+    labelled = store['label'] >= 0
+    X = np.column_stack([store[f'feature:{name}'][labelled] for name in feature_names])
+    return X.astype(np.float64), store['label'][labelled], list(feature_names)
+
+
+def _save(path, rows, feature_names, config_key):
+    paths = sorted(rows)
+    columns = {f'feature:{name}': np.array([rows[p]['features'].get(name, np.nan) for p in paths],
+                                           dtype=np.float32)
+               for name in feature_names}
+    temp_path = path + '.tmp.npz'
+    np.savez(
+        temp_path,
+        config_key=np.array(config_key),
+        feature_names=np.array(feature_names, dtype=str),
+        path=np.array(paths, dtype=str),
+        label=np.array([rows[p]['label'] for p in paths], dtype=np.int8),
+        size=np.array([rows[p]['size'] for p in paths], dtype=np.int64),
+        mtime=np.array([rows[p]['mtime'] for p in paths], dtype=np.float64),
+        **columns)
+    os.replace(temp_path, path)
+
+
+def build_feature_store(root, store_path, labels_csv=None, workers=None, sr=22050, vad=True,
+                        checkpoint_every=2000, chunksize=16):
+    """Extract features for every recording under ``root`` into ``store_path``
+
+    Returns ``(store, stats)`` where ``stats`` counts reused, extracted and
+    failed files. The store is checkpointed every ``checkpoint_every``
+    extractions so an interrupted run resumes where it stopped.
+    """
+    config_key = FeatureEngine(sr=sr, n_mfcc=N_MFCC, vad=vad).config_key()
+    recordings = find_recordings(root, labels_csv)
+
+    rows = {}
+    feature_names = []
+    if os.path.exists(store_path):
+        previous = load_feature_store(store_path)
+        if str(previous['config_key']) == config_key:
+            feature_names = [str(name) for name in previous['feature_names']]
+            for i, path in enumerate(previous['path']):
+                rows[str(path)] = {
+                    'label': int(previous['label'][i]),
+                    'size': int(previous['size'][i]),
+                    'mtime': float(previous['mtime'][i]),
+                    'features': {name: float(previous[f'feature:{name}'][i]) for name in feature_names}
+                }
+
+    pending = []
+    for path, label in recordings.items():
+        info = os.stat(path)
+        row = rows.get(path)
+        if row is not None and row['size'] == info.st_size and row['mtime'] == info.st_mtime:
+            row['label'] = label
+            continue
+        rows[path] = {'label': label, 'size': info.st_size, 'mtime': info.st_mtime, 'features': None}
+        pending.append(path)
+    # Recordings that were deleted since the last run
+    for path in [path for path in rows if path not in recordings]:
+        del rows[path]
+
+    stats = {'files': len(recordings), 'reused': len(recordings) - len(pending),
+             'extracted': 0, 'failed': 0, 'seconds': 0.0}
+    start = time.perf_counter()
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_extract_file, [(path, sr, vad) for path in pending], chunksize=chunksize)
+            for count, (path, features, error) in enumerate(results, 1):
+                if features is None:
+                    print(f"⚠️  Skipping {path}: {error}")
+                    del rows[path]
+                    stats['failed'] += 1
+                    continue
+                if not feature_names:
+                    feature_names = list(features)
+                rows[path]['features'] = features
+                stats['extracted'] += 1
+                if checkpoint_every and count % checkpoint_every == 0:
+                    _save(store_path, {p: r for p, r in rows.items() if r['features'] is not None},
+                          feature_names, config_key)
+                    print(f"💾 {count}/{len(pending)} files extracted")
+    stats['seconds'] = round(time.perf_counter() - start, 3)
+
+    _save(store_path, rows, feature_names, config_key)
+    return load_feature_store(store_path), stats
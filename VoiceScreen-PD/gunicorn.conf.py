@@ -0,0 +1,55 @@
+"""Gunicorn settings: pre-forked worker processes with I/O threads.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Feature extraction is CPU-bound, so throughput comes from processes: one
+per core by default. Each process runs a few threads that read uploads and
+write responses while at most COMPUTE_SLOTS of them run the DSP. The app
+is loaded in the master before forking (see wsgi.py) and each worker then
+restarts its own threads (app.after_fork).
+
+Environment:
+    BIND              address to listen on (0.0.0.0:5000)
+    WEB_CONCURRENCY   worker processes (CPU cores)
+    WEB_THREADS       I/O threads per worker (4)
+    WEB_TIMEOUT       seconds before a silent worker is restarted (120)
+    WEB_MAX_REQUESTS  recycle a worker after this many requests (0 = never)
+    COMPUTE_SLOTS     concurrent extractions per worker (1, read by app.py)
+
+Async jobs, live streams, the feature cache and /metrics are per worker:
+route /jobs/* and /stream/* with sticky sessions (or run one worker for
+them) and scrape every worker, or set FEATURE_CACHE_PATH to share the cache.
+With JOB_QUEUE_PATH, jobs left unfinished by the previous run are re-queued
+in the first worker only.
+"""
+import multiprocessing
+import os
+
+# One BLAS/OpenMP thread per process; parallelism comes from the workers.
+# Set before the app (and so numpy) is imported.
+for variable in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(variable, '1')
+# The master must finish the warm-up before it forks
+os.environ.setdefault('STARTUP_MODE', 'eager')
+# The master only preloads: no registry watcher thread there, and jobs it
+# recovered would be copied into, and run by, every worker
+os.environ['PREFORK'] = '1'
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 4))
+timeout = int(os.environ.get('WEB_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+preload_app = True
+accesslog = '-' if os.environ.get('ACCESS_LOG', '0').lower() in ('1', 'true', 'yes') else None
+
+
+def post_fork(server, worker):
+    from app import after_fork
+    # worker.age counts spawns: only the first worker of this server run
+    # re-queues the jobs left unfinished by the previous one
+    after_fork(recover_jobs=worker.age == 1)
@@ -0,0 +1,172 @@
+"""Hot-path instrumentation: timing spans, counters and logging.
+
+``Metrics`` keeps Prometheus-style counters and fixed-bucket latency
+histograms in plain dicts behind one lock, so recording a span costs a
+``perf_counter`` pair and a bisect. ``render`` produces the text exposition
+format served by ``/metrics``.
+
+``configure_logging`` routes the ``voicescreen`` logger through a
+``QueueHandler``: request threads only enqueue records and a listener
+thread does the stdout writes. With ``LOG_LEVEL=WARNING`` the per-request
+info/debug messages are dropped before any formatting happens.
+"""
+import atexit
+import bisect
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+LOGGER_NAME = 'voicescreen'
+
+# Seconds; covers sub-millisecond model calls up to long uploads
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Metrics:
+    """Registry of counters and histograms with Prometheus text output"""
+
+    def __init__(self, prefix='voicescreen'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._help = {}
+        self._counters = {}
+        self._histograms = {}
+        self._buckets = {}
+        self._collectors = []
+
+    def counter(self, name, help_text):
+        """Declare a counter (``<prefix>_<name>_total``)"""
+        self._help[name] = ('counter', help_text)
+        self._counters.setdefault(name, {})
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        """Declare a histogram (``<prefix>_<name>``)"""
+        self._help[name] = ('histogram', help_text)
+        self._histograms.setdefault(name, {})
+        self._buckets[name] = tuple(buckets)
+
+    def collector(self, function):
+        """Register ``function() -> [(name, type, help, value, labels)]`` for gauges
+
+        Collectors run at scrape time, so values that already live elsewhere
+        (cache and queue statistics) cost nothing on the request path.
+        """
+        self._collectors.append(function)
+        return function
+
+    def inc(self, name, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = _label_key(labels)
+        buckets = self._buckets[name]
+        index = bisect.bisect_left(buckets, value)
+        with self._lock:
+            series = self._histograms[name].get(key)
+            if series is None:
+                series = self._histograms[name][key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def span(self, stage, timings=None, histogram='stage_seconds'):
+        """Time a block into ``histogram{stage=...}`` (and ``timings[stage]``)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe(histogram, elapsed, stage=stage)
+            if timings is not None:
+                timings[stage] = timings.get(stage, 0.0) + elapsed
+
+    def record_stages(self, timings, histogram='stage_seconds'):
+        """Observe a ``{stage: seconds}`` dict measured elsewhere"""
+        for stage, seconds in timings.items():
+            self.observe(histogram, seconds, stage=stage)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {key: ([*s[0]], s[1], s[2]) for key, s in series.items()}
+                          for name, series in self._histograms.items()}
+
+        for name, series in counters.items():
+            full = f'{self.prefix}_{name}_total'
+            lines += [f'# HELP {full} {self._help[name][1]}', f'# TYPE {full} counter']
+            lines += [f'{full}{_format_labels(key)} {value}' for key, value in sorted(series.items())]
+
+        for name, series in histograms.items():
+            full = f'{self.prefix}_{name}'
+            lines += [f'# HELP {full} {self._help[name][1]}', f'# TYPE {full} histogram']
+            bounds = [f'{bound:g}' for bound in self._buckets[name]] + ['+Inf']
+            for key, (counts, total, count) in sorted(series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(bounds, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{full}_bucket{_format_labels(key, [("le", bound)])} {cumulative}')
+                lines.append(f'{full}_sum{_format_labels(key)} {total:.6f}')
+                lines.append(f'{full}_count{_format_labels(key)} {count}')
+
+        declared = set()
+        for function in self._collectors:
+            for name, kind, help_text, value, labels in function():
+                full = f'{self.prefix}_{name}'
+                if full not in declared:
+                    lines += [f'# HELP {full} {help_text}', f'# TYPE {full} {kind}']
+                    declared.add(full)
+                if value is not None:
+                    lines.append(f'{full}{_format_labels(_label_key(labels))} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def configure_logging(level='INFO', stream=None, reset=False):
+    """Send the ``voicescreen`` logger through a queue; returns the logger
+
+    The listener thread is started once; calling this again only changes
+    the level. Forked workers inherit the handler but not the listener
+    thread, so they pass ``reset=True`` to start their own.
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    if isinstance(level, str):
+        level = getattr(logging, level.upper(), logging.INFO)
+    logger.setLevel(level)
+    if reset:
+        for handler in list(logger.handlers):
+            if isinstance(handler, logging.handlers.QueueHandler):
+                logger.removeHandler(handler)
+    if not any(isinstance(handler, logging.handlers.QueueHandler) for handler in logger.handlers):
+        records = queue.SimpleQueue()
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+        listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        logger.addHandler(logging.handlers.QueueHandler(records))
+        logger.propagate = False
+        logger.listener = listener
+    return logger
@@ -0,0 +1,218 @@
+"""Bounded in-process job queue for asynchronous analysis requests.
+
+A fixed pool of worker threads drains a bounded queue; ``submit`` raises
+``QueueFull`` instead of blocking so the HTTP layer can answer 429. Jobs
+can optionally be persisted to sqlite so queued work survives a restart.
+Each process opens its own sqlite connection; with pre-forked servers,
+pass ``recover=False`` and call ``recover()`` in exactly one worker.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+
+import numpy as np
+
+
+class QueueFull(Exception):
+    """Raised when the queue is at its maximum depth"""
+
+
+class JobQueue:
+    """Run ``handler(payload)`` on worker threads and keep the results"""
+
+    def __init__(self, handler, workers=2, max_depth=32, db_path=None, result_ttl=600,
+                 recover=True):
+        self.handler = handler
+        self.workers = workers
+        self.max_depth = max_depth
+        self.result_ttl = result_ttl
+        self._queue = queue.Queue(maxsize=max_depth)
+        self._jobs = {}
+        self._payloads = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._threads = []
+        self._latencies = deque(maxlen=512)
+        self._counters = {'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0}
+        self.db_path = db_path or None
+        self._db = None
+        self._db_pid = None
+        if self.db_path:
+            db = self._connection()
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, '
+                'payload BLOB, result TEXT, error TEXT, created REAL, started REAL, finished REAL)')
+            db.commit()
+            if recover:
+                self.recover()
+
+    def _connection(self):
+        """This process's sqlite connection, opened after a fork"""
+        if self._db_pid != os.getpid():
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db_pid = os.getpid()
+        return self._db
+
+    def recover(self):
+        """Re-queue persisted unfinished jobs and start the workers for them"""
+        if not self.db_path:
+            return 0
+        with self._lock:
+            requeued = self._recover()
+        # Workers otherwise start on the first submit, leaving recovered jobs queued
+        if requeued:
+            self.start()
+        return requeued
+
+    def _recover(self):
+        """Re-queue jobs that were pending or running when the process stopped
+
+        Returns the number of jobs put back on the queue.
+        """
+        requeued = 0
+        rows = self._connection().execute(
+            "SELECT id, status, payload, result, error, created, started, finished FROM jobs").fetchall()
+        for job_id, status, payload, result, error, created, started, finished in rows:
+            job = {'id': job_id, 'status': status, 'created': created,
+                   'started': started, 'finished': finished, 'error': error,
+                   'result': json.loads(result) if result else None}
+            if status in ('queued', 'running'):
+                if self._queue.full():
+                    job.update(status='failed', error='Queue full after restart', finished=time.time())
+                    self._persist(job)
+                else:
+                    job.update(status='queued', started=None)
+                    self._payloads[job_id] = payload
+                    self._queue.put_nowait(job_id)
+                    requeued += 1
+            self._jobs[job_id] = job
+        return requeued
+
+    def _persist(self, job, payload=None):
+        if not self.db_path:
+            return
+        db = self._connection()
+        db.execute(
+            'INSERT INTO jobs (id, status, payload, result, error, created, started, finished) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET status = excluded.status, '
+            'result = excluded.result, error = excluded.error, started = excluded.started, '
+            'finished = excluded.finished, payload = COALESCE(excluded.payload, jobs.payload)',
+            (job['id'], job['status'], payload,
+             json.dumps(job['result']) if job['result'] is not None else None,
+             job['error'], job['created'], job['started'], job['finished']))
+        if job['status'] in ('done', 'failed'):
+            db.execute('UPDATE jobs SET payload = NULL WHERE id = ?', (job['id'],))
+        db.commit()
+
+    def start(self):
+        """Start the worker threads (idempotent)"""
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'analysis-worker-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, payload):
+        """Queue a job and return its id; raises QueueFull when saturated"""
+        self.start()
+        job_id = uuid.uuid4().hex
+        job = {'id': job_id, 'status': 'queued', 'created': time.time(),
+               'started': None, 'finished': None, 'result': None, 'error': None}
+        with self._lock:
+            self._prune()
+            try:
+                self._queue.put_nowait(job_id)
+            except queue.Full:
+                self._counters['rejected'] += 1
+                raise QueueFull(f'Job queue is full ({self.max_depth} pending)')
+            self._jobs[job_id] = job
+            self._payloads[job_id] = payload
+            self._counters['submitted'] += 1
+            self._persist(job, payload)
+        return job_id
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                job = self._jobs.get(job_id)
+                payload = self._payloads.pop(job_id, None)
+                if job is None:
+                    continue
+                job['status'] = 'running'
+                job['started'] = time.time()
+                self._persist(job)
+                self._changed.notify_all()
+
+            try:
+                result, error, status = self.handler(payload), None, 'done'
+            except Exception as e:
+                result, error, status = None, str(e), 'failed'
+
+            with self._lock:
+                job.update(status=status, result=result, error=error, finished=time.time())
+                self._counters['completed' if status == 'done' else 'failed'] += 1
+                self._latencies.append((job['started'] - job['created'], job['finished'] - job['started']))
+                self._persist(job)
+                self._changed.notify_all()
+
+    def _prune(self):
+        """Forget finished jobs older than the result TTL (lock held)"""
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['finished'] is not None and job['finished'] < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+        if expired and self.db_path:
+            db = self._connection()
+            db.executemany('DELETE FROM jobs WHERE id = ?', [(job_id,) for job_id in expired])
+            db.commit()
+
+    def get(self, job_id):
+        """Snapshot of a job (status, timestamps, result or error) or None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job)
+            if job['status'] == 'queued':
+                snapshot['position'] = list(self._queue.queue).index(job_id) + 1 \
+                    if job_id in self._queue.queue else None
+            return snapshot
+
+    def wait(self, job_id, last_status=None, timeout=15.0):
+        """Block until the job's status differs from ``last_status``"""
+        deadline = time.time() + timeout
+        with self._changed:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None or job['status'] != last_status:
+                    break
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+        return self.get(job_id)
+
+    def stats(self):
+        """Queue depth, counters and wait/run latency percentiles (seconds)"""
+        with self._lock:
+            latencies = np.array(self._latencies) if self._latencies else np.zeros((0, 2))
+            running = sum(1 for job in self._jobs.values() if job['status'] == 'running')
+            stats = dict(self._counters, depth=self._queue.qsize(), max_depth=self.max_depth,
+                         running=running, workers=self.workers, persistent=self.db_path is not None)
+        for column, name in enumerate(('wait', 'run')):
+            if len(latencies):
+                p50, p95 = np.percentile(latencies[:, column], [50, 95])
+                stats[f'{name}_p50'] = round(float(p50), 4)
+                stats[f'{name}_p95'] = round(float(p95), 4)
+            else:
+                stats[f'{name}_p50'] = stats[f'{name}_p95'] = None
+        return stats
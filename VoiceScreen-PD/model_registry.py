@@ -0,0 +1,363 @@
+"""Versioned model registry with hot reload and an optional shadow model.
+
+Layout (``MODEL_REGISTRY_PATH``, default ``model/registry``)::
+
+    registry/
+        ACTIVE                 <- name of the serving version
+        SHADOW                 <- optional: version scored alongside it
+        20261016-101500/
+            model.npz          <- compiled export (see compiled_model.py)
+            manifest.json      <- version, feature names, metrics, source
+
+Pointer files are replaced atomically, so every worker process that polls
+the registry picks up a new ACTIVE version without a restart. A swap only
+replaces the reference returned by ``current()``: requests that already
+hold the previous bundle finish on it. A version whose feature names or
+dimension do not match the serving schema is rejected and the previous
+model keeps serving.
+
+When the registry is empty the legacy ``model/parkinson_model.npz`` (or
+the .pkl pair) is served as version ``legacy``.
+
+    python model_registry.py list
+    python model_registry.py publish [--activate]   # from model/*.pkl
+    python model_registry.py activate VERSION
+    python model_registry.py shadow VERSION|off
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from compiled_model import (COMPILED_MODEL_PATH, SOURCE_PATHS, CompiledModel, export_model,
+                            load_compiled_model)
+
+REGISTRY_PATH = 'model/registry'
+
+logger = logging.getLogger('voicescreen.model_registry')
+
+
+class IncompatibleModel(ValueError):
+    """Raised when a bundle does not match the serving feature schema"""
+
+
+class ModelBundle:
+    """One loaded model version; ``predict_proba`` takes unscaled rows"""
+
+    def __init__(self, version, predictor, feature_names=None, manifest=None):
+        self.version = version
+        self.predictor = predictor
+        self.feature_names = list(feature_names or [])
+        self.manifest = manifest or {}
+        self.loaded_at = time.time()
+
+    @property
+    def n_features(self):
+        if isinstance(self.predictor, CompiledModel):
+            return self.predictor.n_features
+        return int(self.predictor[1].n_features_in_)
+
+    @property
+    def classes(self):
+        if isinstance(self.predictor, CompiledModel):
+            return self.predictor.classes
+        return self.predictor[0].classes_
+
+    def predict_proba(self, X):
+        """Positive-class probability per row"""
+        if isinstance(self.predictor, CompiledModel):
+            return self.predictor.predict_proba(X)
+        model, scaler = self.predictor
+        return model.predict_proba(scaler.transform(np.atleast_2d(X)))[:, 1]
+
+    def validate(self, expected_features):
+        """Raise IncompatibleModel unless the bundle takes ``expected_features``"""
+        expected = list(expected_features)
+        if self.feature_names and self.feature_names != expected:
+            missing = sorted(set(expected) - set(self.feature_names))
+            extra = sorted(set(self.feature_names) - set(expected))
+            raise IncompatibleModel(
+                f"Model {self.version} feature names differ from the serving schema "
+                f"(missing {missing[:5]}, unexpected {extra[:5]})")
+        if self.n_features != len(expected):
+            raise IncompatibleModel(
+                f"Model {self.version} expects {self.n_features} features, "
+                f"the serving schema has {len(expected)}")
+
+    def describe(self):
+        return {'version': self.version, 'n_features': self.n_features,
+                'compiled': isinstance(self.predictor, CompiledModel),
+                'loaded_at': self.loaded_at, 'metrics': self.manifest.get('metrics')}
+
+
+def _write_pointer(path, version):
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w') as handle:
+        handle.write(version)
+    os.replace(temp_path, path)
+
+
+def _read_pointer(path):
+    try:
+        with open(path) as handle:
+            return handle.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+class ModelRegistry:
+    """Serve the ACTIVE version, hot-swapping it when the pointer changes"""
+
+    def __init__(self, root=REGISTRY_PATH, expected_features=None, legacy_path=COMPILED_MODEL_PATH,
+                 legacy_sources=SOURCE_PATHS):
+        self.root = root
+        self.expected_features = list(expected_features) if expected_features else None
+        self.legacy_path = legacy_path
+        self.legacy_sources = legacy_sources
+        self._active = None
+        self._shadow = None
+        self._lock = threading.Lock()
+        self._watcher = None
+        self.last_error = None
+        self._rejected = None
+        self._shadow_rejected = None
+        self.swaps = 0
+        # Shadow scoring happens off the request thread
+        self._shadow_queue = queue.Queue(maxsize=256)
+        self._shadow_thread = None
+        self._shadow_stats = {'scored': 0, 'dropped': 0, 'agree': 0, 'abs_diff_sum': 0.0, 'errors': 0}
+
+    # -- publishing ---------------------------------------------------------
+
+    def versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.isfile(os.path.join(self.root, name, 'manifest.json')))
+
+    def publish(self, model, scaler, feature_names, version=None, metrics=None, activate=False):
+        """Export ``model`` + ``scaler`` as a new version; returns its name"""
+        version = version or time.strftime('%Y%m%d-%H%M%S')
+        directory = os.path.join(self.root, version)
+        if os.path.exists(directory):
+            raise ValueError(f"Version {version} already exists")
+        staging = os.path.join(self.root, f'.{version}.staging')
+        os.makedirs(staging)
+        export_model(model, scaler, os.path.join(staging, 'model.npz'), feature_names=feature_names)
+        manifest = {'version': version, 'created': time.time(),
+                    'feature_names': list(feature_names), 'n_features': len(feature_names),
+                    'kind': type(model).__name__, 'metrics': metrics or {}}
+        with open(os.path.join(staging, 'manifest.json'), 'w') as handle:
+            json.dump(manifest, handle, indent=2)
+        # A version directory only ever appears complete
+        os.replace(staging, directory)
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version):
+        if version not in self.versions():
+            raise ValueError(f"Unknown model version {version!r}")
+        _write_pointer(os.path.join(self.root, 'ACTIVE'), version)
+
+    def set_shadow(self, version):
+        """Score ``version`` next to the active model (None turns it off)"""
+        path = os.path.join(self.root, 'SHADOW')
+        if version is None:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        if version not in self.versions():
+            raise ValueError(f"Unknown model version {version!r}")
+        _write_pointer(path, version)
+
+    # -- loading ------------------------------------------------------------
+
+    def _load_version(self, version):
+        directory = os.path.join(self.root, version)
+        with open(os.path.join(directory, 'manifest.json')) as handle:
+            manifest = json.load(handle)
+        compiled = CompiledModel.load(os.path.join(directory, 'model.npz'))
+        return ModelBundle(version, compiled, manifest.get('feature_names') or compiled.feature_names,
+                           manifest)
+
+    def _load_legacy(self):
+        compiled = load_compiled_model(self.legacy_path, self.legacy_sources)
+        if compiled is not None:
+            return ModelBundle('legacy', compiled, compiled.feature_names)
+        if not all(os.path.exists(path) for path in self.legacy_sources):
+            return None
+        import joblib
+        model = joblib.load(self.legacy_sources[0])
+        scaler = joblib.load(self.legacy_sources[1])
+        return ModelBundle('legacy', (model, scaler))
+
+    def _load_checked(self, version):
+        bundle = self._load_version(version) if version else self._load_legacy()
+        if bundle is not None and self.expected_features is not None:
+            bundle.validate(self.expected_features)
+        return bundle
+
+    def refresh(self):
+        """Swap in the ACTIVE/SHADOW versions if they changed; returns True on a swap"""
+        active_version = _read_pointer(os.path.join(self.root, 'ACTIVE'))
+        shadow_version = _read_pointer(os.path.join(self.root, 'SHADOW'))
+        swapped = False
+
+        current = self._active
+        wanted = active_version or 'legacy'
+        # A rejected version is not retried until the pointer moves
+        if (current is None or current.version != wanted) and wanted != self._rejected:
+            try:
+                bundle = self._load_checked(active_version)
+                if bundle is not None:
+                    with self._lock:
+                        self._active = bundle
+                        self.swaps += 1 if current is not None else 0
+                    self.last_error = self._rejected = None
+                    swapped = True
+                    logger.info("✅ Serving model version %s", bundle.version)
+            except Exception as e:
+                # Keep serving the previous version
+                self._rejected = wanted
+                self.last_error = str(e)
+                logger.warning("⚠️  Could not load model version %s: %s", wanted, e)
+
+        shadow = self._shadow
+        if shadow_version is None:
+            self._shadow = None
+        elif (shadow is None or shadow.version != shadow_version) and shadow_version != self._shadow_rejected:
+            try:
+                self._shadow = self._load_checked(shadow_version)
+                with self._lock:
+                    self._shadow_stats.update(scored=0, dropped=0, agree=0, abs_diff_sum=0.0, errors=0)
+                logger.info("👥 Shadow model version %s", shadow_version)
+            except Exception as e:
+                self._shadow = None
+                self._shadow_rejected = shadow_version
+                logger.warning("⚠️  Could not load shadow model %s: %s", shadow_version, e)
+        return swapped
+
+    def current(self):
+        """The serving bundle (hold on to it for the whole request) or None"""
+        return self._active
+
+    def start_watcher(self, interval=10.0):
+        """Poll the pointer files every ``interval`` seconds (daemon thread)"""
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.warning("⚠️  Model registry refresh failed: %s", e)
+
+        self._watcher = threading.Thread(target=watch, name='model-registry', daemon=True)
+        self._watcher.start()
+
+    def after_fork(self):
+        """Forget thread state inherited from the parent process"""
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._shadow_queue = queue.Queue(maxsize=256)
+        self._shadow_thread = None
+
+    # -- shadow scoring -----------------------------------------------------
+
+    def shadow(self, X, primary_proba):
+        """Queue rows already scored by the active model for the shadow model"""
+        if self._shadow is None:
+            return
+        if self._shadow_thread is None:
+            with self._lock:
+                if self._shadow_thread is None:
+                    self._shadow_thread = threading.Thread(target=self._score_shadow,
+                                                           name='shadow-model', daemon=True)
+                    self._shadow_thread.start()
+        try:
+            self._shadow_queue.put_nowait((np.array(X, dtype=np.float64), np.asarray(primary_proba)))
+        except queue.Full:
+            with self._lock:
+                self._shadow_stats['dropped'] += 1
+
+    def _score_shadow(self):
+        while True:
+            X, primary = self._shadow_queue.get()
+            bundle = self._shadow
+            if bundle is None:
+                continue
+            try:
+                proba = bundle.predict_proba(X)
+            except Exception:
+                with self._lock:
+                    self._shadow_stats['errors'] += 1
+                continue
+            agree = int(np.sum((proba > 0.5) == (primary > 0.5)))
+            abs_diff = float(np.sum(np.abs(proba - primary)))
+            with self._lock:
+                stats = self._shadow_stats
+                stats['scored'] += len(proba)
+                stats['agree'] += agree
+                stats['abs_diff_sum'] += abs_diff
+
+    def stats(self):
+        active, shadow = self._active, self._shadow
+        result = {'active': active.describe() if active else None, 'swaps': self.swaps,
+                  'versions': self.versions(), 'last_error': self.last_error, 'shadow': None}
+        if shadow is not None:
+            with self._lock:
+                counts = dict(self._shadow_stats)
+            scored = counts['scored']
+            result['shadow'] = dict(
+                shadow.describe(), scored=scored, dropped=counts['dropped'],
+                errors=counts['errors'],
+                agreement=round(counts['agree'] / scored, 4) if scored else None,
+                mean_abs_diff=round(counts['abs_diff_sum'] / scored, 4) if scored else None)
+        return result
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Manage the model registry')
+    parser.add_argument('--root', default=REGISTRY_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list')
+    publish = commands.add_parser('publish', help='publish model/*.pkl as a new version')
+    publish.add_argument('--version')
+    publish.add_argument('--activate', action='store_true')
+    commands.add_parser('activate').add_argument('version')
+    commands.add_parser('shadow').add_argument('version', help="version, or 'off'")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.root)
+    if args.command == 'list':
+        active = _read_pointer(os.path.join(args.root, 'ACTIVE'))
+        shadow = _read_pointer(os.path.join(args.root, 'SHADOW'))
+        for version in registry.versions():
+            marker = ' (active)' if version == active else ' (shadow)' if version == shadow else ''
+            print(f"{version}{marker}")
+    elif args.command == 'publish':
+        import joblib
+
+        model = joblib.load(SOURCE_PATHS[0])
+        scaler = joblib.load(SOURCE_PATHS[1])
+        existing = load_compiled_model()
+        names = existing.feature_names if existing is not None else []
+        if not names:
+            parser.error('the compiled export has no feature names; re-export it from the training script')
+        version = registry.publish(model, scaler, names, version=args.version, activate=args.activate)
+        print(f"✅ Published {version}{' and activated it' if args.activate else ''}")
+    elif args.command == 'activate':
+        registry.activate(args.version)
+        print(f"✅ {args.version} is now active")
+    elif args.command == 'shadow':
+        registry.set_shadow(None if args.version == 'off' else args.version)
+        print("✅ Shadow model updated")
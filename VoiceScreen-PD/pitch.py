@@ -0,0 +1,103 @@
+"""Pluggable pitch tracking backends for VoiceScreen PD.
+
+``fast`` is a fully vectorized YIN tracker that works on the frames shared
+with the feature engine; ``accurate`` keeps librosa's Viterbi-decoded pyin.
+Both return an f0 track aligned to the engine frames (hop 512, centered),
+so ``pitch_stats`` gives the same mean_f0/std_f0/f0_range contract.
+"""
+import numpy as np
+
+try:
+    import librosa
+    librosa_available = True
+except ImportError:
+    librosa_available = False
+
+FMIN = 80
+FMAX = 300
+
+# Returned when no voiced frame is found, as the original extractor did
+DEFAULT_PITCH_STATS = {'mean_f0': 120, 'std_f0': 10, 'f0_range': 50}
+
+
+def yin_track(frames, sr, fmin=FMIN, fmax=FMAX, threshold=0.1):
+    """Vectorized YIN over a (n_frames, frame_length) array
+
+    Returns ``(f0, voiced_flag)``; unvoiced frames have ``f0 = nan``.
+    """
+    frames = np.asarray(frames, dtype=np.float32)
+    n_frames, frame_length = frames.shape
+    tau_min = max(2, int(np.floor(sr / fmax)))
+    tau_max = min(frame_length // 2, int(np.ceil(sr / fmin)))
+    window = frame_length - tau_max
+
+    # Cross term sum_j x[j] * x[j + tau] for j < window, via one FFT per frame.
+    # A transform of frame_length points is enough: j + tau never wraps.
+    spectrum = np.fft.rfft(frames, axis=1)
+    head = np.fft.rfft(frames[:, :window], n=frame_length, axis=1)
+    cross = np.fft.irfft(spectrum * np.conj(head), n=frame_length, axis=1)[:, :tau_max + 1]
+
+    energy = np.zeros((n_frames, frame_length + 1), dtype=np.float64)
+    np.cumsum(np.square(frames, dtype=np.float64), axis=1, out=energy[:, 1:])
+    lags = np.arange(tau_max + 1)
+    shifted_energy = energy[:, lags + window] - energy[:, lags]
+    diff = energy[:, window:window + 1] + shifted_energy - 2.0 * cross
+    diff[:, 0] = 0.0
+    np.maximum(diff, 0.0, out=diff)
+
+    # Cumulative mean normalized difference
+    cumulative = np.cumsum(diff[:, 1:], axis=1)
+    cmndf = np.ones_like(diff)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cmndf[:, 1:] = np.where(cumulative > 0, diff[:, 1:] * lags[1:] / cumulative, 1.0)
+
+    # First local minimum under the threshold inside [tau_min, tau_max)
+    inner = cmndf[:, tau_min:tau_max]
+    is_min = (inner <= cmndf[:, tau_min - 1:tau_max - 1]) & (inner < cmndf[:, tau_min + 1:tau_max + 1])
+    candidates = is_min & (inner < threshold)
+    voiced = candidates.any(axis=1)
+    tau = tau_min + np.argmax(candidates, axis=1)
+
+    # Parabolic interpolation around the chosen lag
+    rows = np.arange(n_frames)
+    left, centre, right = cmndf[rows, tau - 1], cmndf[rows, tau], cmndf[rows, tau + 1]
+    curvature = left - 2.0 * centre + right
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shift = np.where(np.abs(curvature) > 1e-12, 0.5 * (left - right) / curvature, 0.0)
+    refined_tau = tau + np.clip(shift, -1.0, 1.0)
+
+    voiced &= energy[:, -1] > 1e-8 * frame_length
+    f0 = np.where(voiced, sr / refined_tau, np.nan)
+    return f0, voiced
+
+
+def pyin_track(y, sr, fmin=FMIN, fmax=FMAX, frame_length=2048, hop_length=512):
+    """librosa's probabilistic YIN, aligned to the engine frames"""
+    f0, voiced_flag, voiced_probs = librosa.pyin(
+        y, fmin=fmin, fmax=fmax, sr=sr, frame_length=frame_length, hop_length=hop_length)
+    return f0, voiced_flag & ~np.isnan(f0)
+
+
+PITCH_BACKENDS = ('fast', 'accurate')
+
+
+def track_pitch(y, sr, frames, backend='fast', fmin=FMIN, fmax=FMAX, hop_length=512):
+    """Run the selected backend and return ``(f0, voiced_flag)`` per frame"""
+    if backend == 'fast':
+        return yin_track(frames, sr, fmin=fmin, fmax=fmax)
+    if backend == 'accurate':
+        return pyin_track(y, sr, fmin=fmin, fmax=fmax,
+                          frame_length=frames.shape[1], hop_length=hop_length)
+    raise ValueError(f"Unknown pitch backend: {backend!r} (expected one of {PITCH_BACKENDS})")
+
+
+def pitch_stats(f0, voiced):
+    """mean_f0 / std_f0 / f0_range over the voiced frames"""
+    f0_clean = f0[voiced & ~np.isnan(f0)]
+    if len(f0_clean) == 0:
+        return dict(DEFAULT_PITCH_STATS)
+    return {
+        'mean_f0': float(np.mean(f0_clean)),
+        'std_f0': float(np.std(f0_clean)),
+        'f0_range': float(np.max(f0_clean) - np.min(f0_clean))
+    }
@@ -0,0 +1,123 @@
+"""Content negotiation and encodings for analysis results.
+
+Clients pick what they receive and how it is encoded:
+
+- ``?fields=compact`` or ``Prefer: return=minimal`` returns only the score
+  fields (risk_score, prediction, confidence, voiced_fraction), dropping
+  the per-feature values and stage timings.
+- ``?format=msgpack`` or ``Accept: application/msgpack`` encodes the body
+  with MessagePack; ``features`` is then a single bytes value holding the
+  feature vector as little-endian float32 in feature_schema.FEATURE_NAMES
+  order (``numpy.frombuffer(features, '<f4')`` restores it).
+
+The default stays the full JSON body. JSON is written by orjson when it is
+installed (OrjsonProvider), which also serializes NumPy scalars natively.
+"""
+from collections import namedtuple
+
+import numpy as np
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+from feature_schema import feature_vector
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+SCORE_FIELDS = ('filename', 'risk_score', 'prediction', 'confidence', 'voiced_fraction')
+ENCODINGS = ('json', 'msgpack')
+
+ResponseFormat = namedtuple('ResponseFormat', ['compact', 'encoding'])
+
+
+class NotAcceptable(ValueError):
+    """The requested encoding is not available on this server"""
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson when it is installed"""
+
+    def _orjson(self, obj, option=0):
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | option
+        return orjson.dumps(obj, default=self.default, option=options)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or 'indent' in kwargs or 'cls' in kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._orjson(obj).decode()
+
+    def response(self, *args, **kwargs):
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        if orjson is None or pretty:
+            return super().response(*args, **kwargs)
+        body = self._orjson(self._prepare_response_obj(args, kwargs), orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def negotiate(request):
+    """ResponseFormat for a request; raises NotAcceptable for unknown formats"""
+    fields = request.values.get('fields', '').lower()
+    compact = fields == 'compact' or 'return=minimal' in request.headers.get('Prefer', '')
+
+    encoding = request.values.get('format', '').lower()
+    if encoding:
+        if encoding not in ENCODINGS:
+            raise NotAcceptable(f"format must be one of {ENCODINGS}")
+        if encoding == 'msgpack' and msgpack is None:
+            raise NotAcceptable('msgpack is not installed on this server')
+    else:
+        offered = ['application/json'] + (list(MSGPACK_MIMETYPES) if msgpack is not None else [])
+        best = request.accept_mimetypes.best_match(offered, default='application/json')
+        encoding = 'msgpack' if best in MSGPACK_MIMETYPES else 'json'
+    return ResponseFormat(compact, encoding)
+
+
+def shape_result(result, fmt):
+    """One analysis result trimmed or packed for ``fmt``"""
+    if not isinstance(result, dict) or 'error' in result:
+        return result
+    if fmt.compact:
+        return {name: result[name] for name in SCORE_FIELDS if name in result}
+    if fmt.encoding == 'msgpack' and isinstance(result.get('features'), dict):
+        result = dict(result, features=pack_features(result['features']))
+    return result
+
+
+def shape_body(body, fmt):
+    """Apply ``shape_result`` to a result, a batch envelope or a job record"""
+    if not isinstance(body, dict):
+        return body
+    if isinstance(body.get('results'), list):
+        return dict(body, results=[shape_result(result, fmt) for result in body['results']])
+    if isinstance(body.get('result'), dict):
+        return dict(body, result=shape_result(body['result'], fmt))
+    return shape_result(body, fmt)
+
+
+def pack_features(features):
+    """Feature dict -> little-endian float32 bytes in schema order"""
+    return feature_vector(features).astype('<f4', copy=False).tobytes()
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+def encode(body, fmt, json_response):
+    """Response for an already shaped body; ``json_response`` is ``jsonify``"""
+    if fmt.encoding == 'msgpack':
+        payload = msgpack.packb(body, use_bin_type=True, default=_msgpack_default)
+        return Response(payload, mimetype=MSGPACK_MIMETYPES[0])
+    return json_response(body)
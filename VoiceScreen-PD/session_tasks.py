@@ -0,0 +1,114 @@
+"""Task-specific features for multi-utterance screening sessions.
+
+A session (POST /analyze/session) holds one recording per speech task:
+
+- ``vowel``: a sustained /a/, analysed by the FeatureEngine like a single
+  /analyze upload; its pitch, perturbation, spectral and MFCC features are
+  what the model scores.
+- ``reading``: a read passage. Pause and phonation statistics come from a
+  short-time energy envelope, and pitch variability in semitones (reduced
+  in hypokinetic dysarthria) from YIN on the engine frames.
+- ``ddk``: diadochokinesis (/pa-ta-ka/ repetitions). Syllable rate and
+  regularity come from the peaks of the same envelope, plus pauses.
+
+Reading and DDK features are computed from one decoded buffer at the
+engine rate; every value is prefixed with its task so the per-task results
+merge into one flat feature dict next to the schema features.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from pitch import track_pitch
+
+# Bump whenever task feature output changes so cached values are invalidated
+SESSION_TASKS_VERSION = 1
+
+TASKS = ('vowel', 'reading', 'ddk')
+
+# 25 ms frames every 10 ms resolve syllables at up to ~12/s
+ENVELOPE_FRAME_SECONDS = 0.025
+ENVELOPE_HOP_SECONDS = 0.010
+# Frames this far below the loudest one are silence
+SILENCE_DB = 35.0
+# Shorter gaps are stop closures and articulation, not pauses
+MIN_PAUSE_SECONDS = 0.15
+# A syllable nucleus rises this far above the dips around it
+SYLLABLE_PROMINENCE_DB = 6.0
+MAX_SYLLABLE_RATE = 12.0
+
+
+def envelope_db(y, sr, frame_seconds=ENVELOPE_FRAME_SECONDS, hop_seconds=ENVELOPE_HOP_SECONDS):
+    """Short-time RMS in dB relative to the loudest frame, one value per hop"""
+    n = max(1, int(frame_seconds * sr))
+    y = np.asarray(y, dtype=np.float32)
+    if len(y) < n:
+        y = np.pad(y, (0, n - len(y)))
+    frames = sliding_window_view(y, n)[::max(1, int(hop_seconds * sr))]
+    rms = np.sqrt(np.einsum('ij,ij->i', frames, frames) / n)
+    peak = rms.max()
+    if peak <= 0:
+        return np.full(len(rms), -np.inf)
+    return 20.0 * np.log10(np.maximum(rms, peak * 1e-10) / peak)
+
+
+def pause_stats(active, hop_seconds, min_pause=MIN_PAUSE_SECONDS):
+    """Pauses between the first and last active frame of an activity mask"""
+    if not active.any():
+        return {'pause_count': 0, 'pause_mean': 0.0, 'pause_fraction': 0.0, 'speaking_seconds': 0.0}
+    voiced = np.flatnonzero(active)
+    inner = active[voiced[0]:voiced[-1] + 1]
+    edges = np.flatnonzero(np.diff(np.concatenate([[1], inner.astype(np.int8), [1]])))
+    gaps = (edges[1::2] - edges[::2]) * hop_seconds
+    pauses = gaps[gaps >= min_pause]
+    speaking = len(inner) * hop_seconds
+    return {
+        'pause_count': int(len(pauses)),
+        'pause_mean': float(pauses.mean()) if len(pauses) else 0.0,
+        'pause_fraction': float(pauses.sum() / speaking),
+        'speaking_seconds': float(speaking),
+    }
+
+
+def reading_features(engine, y):
+    """Pauses, phonation ratio and semitone pitch variability of a read passage"""
+    envelope = envelope_db(y, engine.sr)
+    stats = pause_stats(envelope > -SILENCE_DB, ENVELOPE_HOP_SECONDS)
+
+    f0, voiced = track_pitch(y, engine.sr, engine.frame(y), backend='fast',
+                             hop_length=engine.hop_length)
+    f0 = f0[voiced & np.isfinite(f0) & (f0 > 0)]
+    semitones = 12.0 * np.log2(f0 / np.median(f0)) if len(f0) > 1 else np.zeros(1)
+    voiced_seconds = len(f0) * engine.hop_length / engine.sr
+    return {
+        'reading_pause_count': stats['pause_count'],
+        'reading_pause_mean': stats['pause_mean'],
+        'reading_pause_fraction': stats['pause_fraction'],
+        'reading_phonation_ratio': float(min(1.0, voiced_seconds / max(stats['speaking_seconds'], 1e-9))),
+        'reading_f0_sd_semitones': float(np.std(semitones)),
+    }
+
+
+def ddk_features(engine, y):
+    """Syllable rate, interval regularity and pauses of DDK repetitions"""
+    # Imported here: scipy.signal adds ~0.6 s to application import time
+    from scipy.signal import find_peaks
+
+    envelope = envelope_db(y, engine.sr)
+    peaks, _ = find_peaks(envelope, height=-SILENCE_DB + SYLLABLE_PROMINENCE_DB,
+                          prominence=SYLLABLE_PROMINENCE_DB,
+                          distance=max(1, int(1.0 / (MAX_SYLLABLE_RATE * ENVELOPE_HOP_SECONDS))))
+    intervals = np.diff(peaks) * ENVELOPE_HOP_SECONDS
+    stats = pause_stats(envelope > -SILENCE_DB, ENVELOPE_HOP_SECONDS)
+    return {
+        'ddk_syllables': int(len(peaks)),
+        'ddk_rate': float(len(intervals) / intervals.sum()) if len(intervals) else 0.0,
+        'ddk_interval_cv': float(intervals.std() / intervals.mean()) if len(intervals) > 1 else 0.0,
+        'ddk_pause_count': stats['pause_count'],
+    }
+
+
+# Extractors for the tasks analysed here; 'vowel' uses the FeatureEngine
+TASK_EXTRACTORS = {
+    'reading': reading_features,
+    'ddk': ddk_features,
+}
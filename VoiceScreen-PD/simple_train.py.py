@@ -7,6 +7,8 @@ try:
     from sklearn.preprocessing import StandardScaler
     from sklearn.model_selection import train_test_split
     import joblib
+    from compiled_model import SOURCE_PATHS, export_model
+    from feature_schema import FEATURE_INDEX, FEATURE_NAMES, N_FEATURES, N_MFCC
     sklearn_available = True
     print("✅ scikit-learn available")
 except ImportError:
@@ -23,22 +25,24 @@ def create_dummy_model():
     
     if sklearn_available:
         # Create realistic dataset
-        np.random.seed(42)
+        rng = np.random.default_rng(42)
         n_samples = 200
         
-        # Create features (26 features as in our app)
-        X = np.random.randn(n_samples, 26)
-        y = np.random.choice([0, 1], n_samples, p=[0.7, 0.3])
+        # One column per feature of the serving schema
+        X = rng.standard_normal((n_samples, N_FEATURES))
+        y = rng.choice([0, 1], n_samples, p=[0.7, 0.3])
         
         # Make it more realistic - Parkinson's patients have different feature patterns
-        for i in range(n_samples):
-            if y[i] == 1:  # Parkinson's cases
-                # Higher jitter and shimmer
-                X[i, 4:8] += np.random.normal(0.5, 0.1, 4)
-                # Lower HNR
-                X[i, 8] -= np.random.normal(0.3, 0.1)
-                # Different MFCC patterns
-                X[i, 9:22] += np.random.normal(0.2, 0.1, 13)
+        parkinsons = y == 1
+        n_parkinsons = int(parkinsons.sum())
+        jitter_shimmer = [FEATURE_INDEX['jitter_relative'], FEATURE_INDEX['shimmer_relative']]
+        mfccs = [FEATURE_INDEX[f'mfcc_{i+1}_{stat}'] for stat in ('mean', 'std') for i in range(N_MFCC)]
+        # Higher jitter and shimmer
+        X[np.ix_(parkinsons, jitter_shimmer)] += rng.normal(0.5, 0.1, (n_parkinsons, len(jitter_shimmer)))
+        # Lower HNR
+        X[parkinsons, FEATURE_INDEX['hnr']] -= rng.normal(0.3, 0.1, n_parkinsons)
+        # Different MFCC patterns
+        X[np.ix_(parkinsons, mfccs)] += rng.normal(0.2, 0.1, (n_parkinsons, len(mfccs)))
         
         # Simple model
         model = RandomForestClassifier(n_estimators=50, random_state=42, max_depth=10)
@@ -54,6 +58,7 @@ def create_dummy_model():
         # Save model
         joblib.dump(model, 'model/parkinson_model.pkl')
         joblib.dump(scaler, 'model/feature_scaler.pkl')
+        export_model(model, scaler, feature_names=FEATURE_NAMES, source_paths=SOURCE_PATHS)
         print("✅ Model trained and saved successfully!")
         print("📁 Model files created in 'model/' directory")
         
@@ -0,0 +1,78 @@
+"""Startup orchestration: keep import cheap and warm up heavy state later.
+
+``Warmup`` runs a list of named tasks (model loading, librosa/numba
+initialisation, an optional dummy extraction) in one of three modes:
+
+* ``eager``      - run at import time, like the original app
+* ``background`` - run in a daemon thread started at import time
+* ``lazy``       - run on the first call to ``wait()``
+
+Request handlers call ``wait()`` before touching the model or librosa, so
+a request that arrives during warm-up waits instead of being scored by the
+fallback simulation. ``ready`` backs the readiness probe.
+"""
+import threading
+import time
+
+STARTUP_MODES = ('eager', 'background', 'lazy')
+
+
+class Warmup:
+    """Run warm-up tasks once and expose readiness"""
+
+    def __init__(self, tasks, mode='background'):
+        if mode not in STARTUP_MODES:
+            raise ValueError(f"Unknown startup mode {mode!r} (expected one of {STARTUP_MODES})")
+        self.tasks = tasks
+        self.mode = mode
+        self.timings = {}
+        self.errors = {}
+        self.started_at = time.time()
+        self.ready_at = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._running = False
+
+    def start(self):
+        """Kick off warm-up according to the mode (idempotent)"""
+        if self.mode == 'eager':
+            self._run()
+        elif self.mode == 'background':
+            with self._lock:
+                if self._running or self._done.is_set():
+                    return
+                self._running = True
+            threading.Thread(target=self._run, name='warmup', daemon=True).start()
+
+    def _run(self):
+        with self._lock:
+            if self._done.is_set():
+                return
+            for name, task in self.tasks:
+                start = time.perf_counter()
+                try:
+                    task()
+                except Exception as e:
+                    self.errors[name] = str(e)
+                self.timings[name] = round(time.perf_counter() - start, 4)
+            self.ready_at = time.time()
+            self._done.set()
+
+    def wait(self, timeout=None):
+        """Block until warm-up has finished; lazy mode runs it here"""
+        if not self._done.is_set() and self.mode == 'lazy':
+            self._run()
+        return self._done.wait(timeout)
+
+    @property
+    def ready(self):
+        return self._done.is_set()
+
+    def status(self):
+        return {
+            'mode': self.mode,
+            'ready': self.ready,
+            'seconds_to_ready': round(self.ready_at - self.started_at, 4) if self.ready_at else None,
+            'task_seconds': dict(self.timings),
+            'errors': dict(self.errors)
+        }
@@ -75,6 +75,7 @@ class VoiceScreenApp {
         const defaultSettings = {
             audioQuality: 'medium',
             noiseReduction: true,
+            preExtract: false,
             autoStop: true,
             saveHistory: true,
             exportData: true,
@@ -98,6 +99,7 @@ class VoiceScreenApp {
             const settings = {
                 audioQuality: document.getElementById('audioQuality').value,
                 noiseReduction: document.getElementById('noiseReduction').checked,
+                preExtract: document.getElementById('preExtract').checked,
                 autoStop: document.getElementById('autoStop').checked,
                 saveHistory: document.getElementById('saveHistory').checked,
                 exportData: document.getElementById('exportData').checked,
@@ -135,6 +137,7 @@ class VoiceScreenApp {
     populateSettingsForm() {
         document.getElementById('audioQuality').value = this.settings.audioQuality;
         document.getElementById('noiseReduction').checked = this.settings.noiseReduction;
+        document.getElementById('preExtract').checked = this.settings.preExtract;
         document.getElementById('autoStop').checked = this.settings.autoStop;
         document.getElementById('saveHistory').checked = this.settings.saveHistory;
         document.getElementById('exportData').checked = this.settings.exportData;
@@ -145,6 +148,9 @@ class VoiceScreenApp {
     }
 
     applySettings() {
+        // Browser-side frame statistics (POST /analyze/pcm) replace live streaming
+        this.recorder.preExtractEnabled = this.settings.preExtract;
+        
         // Apply theme
         this.applyTheme(this.settings.theme);
         
@@ -539,6 +545,22 @@ class VoiceScreenApp {
             const audioBlob = await this.recorder.stopRecording();
             console.log(`🎹 Recording stopped. Blob size: ${audioBlob ? audioBlob.size : 0} bytes`);
             
+            // Pre-extracted recordings only need pitch, perturbation and MFCCs
+            const preExtractedResults = await this.recorder.finishPreExtraction();
+            if (preExtractedResults) {
+                console.log("⚡ Using pre-extracted analysis results");
+                this.presentResults(preExtractedResults);
+                return;
+            }
+            
+            // Live-streamed recordings were analyzed while speaking
+            const streamedResults = await this.recorder.finishStream();
+            if (streamedResults) {
+                console.log("⚡ Using live-streamed analysis results");
+                this.presentResults(streamedResults);
+                return;
+            }
+            
             if (audioBlob && audioBlob.size > 0) {
                 // Start analysis progress animation
                 this.simulateAnalysisProgress();
@@ -604,14 +626,7 @@ class VoiceScreenApp {
                 throw new Error(results.error);
             }
             
-            // Save to history
-            this.saveToHistory(results);
-            
-            // Show results section
-            this.showSection('resultsSection');
-            
-            // Display the results
-            this.displayAnalysisResults(results);
+            this.presentResults(results);
             
         } catch (error) {
             console.error('❌ Analysis error:', error);
@@ -620,6 +635,17 @@ class VoiceScreenApp {
         }
     }
 
+    presentResults(results) {
+        // Save to history
+        this.saveToHistory(results);
+        
+        // Show results section
+        this.showSection('resultsSection');
+        
+        // Display the results
+        this.displayAnalysisResults(results);
+    }
+
     displayAnalysisResults(results) {
         console.log("📊 Displaying analysis results");
         
@@ -0,0 +1,180 @@
+// AudioWorklet for pre-extraction mode (POST /analyze/pcm): quantizes the
+// mono input to 16-bit PCM and computes, for every frame the server's
+// FeatureEngine would cut, the FRAME_STATS row [rms, zcr, centroid, energy,
+// peak] on exactly those samples. Frames are centered (n_fft / 2 zeros on
+// both ends), Hann-windowed for the centroid, and each owns the hop of
+// samples around its center for energy and peak.
+const FRAME_STATS = 5;
+const ZERO_THRESHOLD = 1e-10;
+const FLOAT32_TINY = 1.1754943508222875e-38;
+
+class FeatureCaptureProcessor extends AudioWorkletProcessor {
+    constructor(options) {
+        super();
+        const config = (options && options.processorOptions) || {};
+        this.nFft = config.nFft || 2048;
+        this.hop = config.hopLength || 512;
+        this.sampleRate = config.sampleRate || sampleRate;
+        this.blockSize = config.blockSize || 4096;
+
+        this.pcm = new Int16Array(this.blockSize);
+        this.filled = 0;
+        this.stats = [];
+        this.frameCount = 0;
+        this.sampleCount = 0;
+
+        // Samples not yet consumed by a frame, starting with the centering pad
+        this.pending = new Float64Array(this.nFft * 2);
+        this.pendingLength = this.nFft / 2;
+
+        this.window = new Float64Array(this.nFft);
+        for (let n = 0; n < this.nFft; n++) {
+            this.window[n] = 0.5 - 0.5 * Math.cos(2 * Math.PI * n / this.nFft);
+        }
+        this.setupFft();
+
+        this.port.onmessage = (event) => {
+            if (event.data === 'flush') this.flush();
+        };
+    }
+
+    setupFft() {
+        const n = this.nFft;
+        this.bits = Math.round(Math.log2(n));
+        this.reversed = new Uint32Array(n);
+        for (let i = 0; i < n; i++) {
+            let r = 0;
+            for (let b = 0; b < this.bits; b++) r |= ((i >> b) & 1) << (this.bits - 1 - b);
+            this.reversed[i] = r;
+        }
+        this.cos = new Float64Array(n / 2);
+        this.sin = new Float64Array(n / 2);
+        for (let k = 0; k < n / 2; k++) {
+            this.cos[k] = Math.cos(2 * Math.PI * k / n);
+            this.sin[k] = -Math.sin(2 * Math.PI * k / n);
+        }
+        this.re = new Float64Array(n);
+        this.im = new Float64Array(n);
+    }
+
+    process(inputs) {
+        const channel = inputs[0] && inputs[0][0];
+        if (!channel) return true;
+
+        for (let i = 0; i < channel.length; i++) {
+            const q = Math.max(-32768, Math.min(32767, Math.round(channel[i] * 32768)));
+            this.pcm[this.filled++] = q;
+            if (this.filled === this.pcm.length) this.postPcm();
+            this.push(q / 32768);
+        }
+        return true;
+    }
+
+    push(sample) {
+        if (this.pendingLength === this.pending.length) {
+            const grown = new Float64Array(this.pending.length * 2);
+            grown.set(this.pending);
+            this.pending = grown;
+        }
+        this.pending[this.pendingLength++] = sample;
+        this.sampleCount += 1;
+        if (this.pendingLength >= this.nFft) this.consumeFrames();
+    }
+
+    consumeFrames() {
+        let offset = 0;
+        while (this.pendingLength - offset >= this.nFft) {
+            this.frameStats(this.pending.subarray(offset, offset + this.nFft));
+            offset += this.hop;
+        }
+        this.pending.copyWithin(0, offset, this.pendingLength);
+        this.pendingLength -= offset;
+    }
+
+    frameStats(frame) {
+        const n = this.nFft;
+        let power = 0;
+        let crossings = 0;
+        let previous = frame[0] < -ZERO_THRESHOLD;
+        for (let i = 0; i < n; i++) {
+            const x = frame[i];
+            power += x * x;
+            const negative = x < -ZERO_THRESHOLD;
+            if (i > 0 && negative !== previous) crossings += 1;
+            previous = negative;
+        }
+
+        // The hop this frame owns: hop samples starting half a hop before its center
+        let energy = 0;
+        let peak = 0;
+        const ownStart = n / 2 - Math.floor(this.hop / 2);
+        for (let i = ownStart; i < ownStart + this.hop; i++) {
+            const x = frame[i];
+            energy += x * x;
+            peak = Math.max(peak, Math.abs(x));
+        }
+
+        this.stats.push(Math.sqrt(power / n), crossings / n, this.centroid(frame), energy, peak);
+        this.frameCount += 1;
+    }
+
+    centroid(frame) {
+        const n = this.nFft;
+        const re = this.re;
+        const im = this.im;
+        for (let i = 0; i < n; i++) {
+            re[this.reversed[i]] = frame[i] * this.window[i];
+            im[i] = 0;
+        }
+        for (let size = 2; size <= n; size <<= 1) {
+            const half = size >> 1;
+            const step = n / size;
+            for (let start = 0; start < n; start += size) {
+                for (let k = 0; k < half; k++) {
+                    const c = this.cos[k * step];
+                    const s = this.sin[k * step];
+                    const a = start + k;
+                    const b = a + half;
+                    const tr = re[b] * c - im[b] * s;
+                    const ti = re[b] * s + im[b] * c;
+                    re[b] = re[a] - tr;
+                    im[b] = im[a] - ti;
+                    re[a] += tr;
+                    im[a] += ti;
+                }
+            }
+        }
+
+        // Bin k is at k * sr / n_fft, the server's linspace(0, sr / 2, n_fft / 2 + 1)
+        let total = 0;
+        let weighted = 0;
+        for (let k = 0; k <= n / 2; k++) {
+            const magnitude = Math.hypot(re[k], im[k]);
+            total += magnitude;
+            weighted += magnitude * k * this.sampleRate / n;
+        }
+        return weighted / (total < FLOAT32_TINY ? 1 : total);
+    }
+
+    postPcm() {
+        if (this.filled === 0 && this.stats.length === 0) return;
+        const pcm = this.pcm.slice(0, this.filled);
+        const stats = Float32Array.from(this.stats);
+        this.port.postMessage({ pcm, stats }, [pcm.buffer, stats.buffer]);
+        this.filled = 0;
+        this.stats = [];
+    }
+
+    flush() {
+        // The trailing centering pad completes the last frames
+        for (let i = 0; i < this.nFft / 2; i++) {
+            this.pending[this.pendingLength++] = 0;
+            if (this.pendingLength === this.pending.length) this.consumeFrames();
+        }
+        this.consumeFrames();
+        this.postPcm();
+        this.port.postMessage({ done: true, frames: this.frameCount, samples: this.sampleCount });
+    }
+}
+
+registerProcessor('feature-capture', FeatureCaptureProcessor);
@@ -0,0 +1,43 @@
+// AudioWorklet that forwards raw mono PCM to the main thread in blocks
+class PcmCaptureProcessor extends AudioWorkletProcessor {
+    constructor() {
+        super();
+        this.block = new Float32Array(4096);
+        this.filled = 0;
+
+        this.port.onmessage = (event) => {
+            if (event.data === 'flush') this.flush();
+        };
+    }
+
+    process(inputs) {
+        const channel = inputs[0] && inputs[0][0];
+        if (!channel) return true;
+
+        let offset = 0;
+        while (offset < channel.length) {
+            const count = Math.min(channel.length - offset, this.block.length - this.filled);
+            this.block.set(channel.subarray(offset, offset + count), this.filled);
+            this.filled += count;
+            offset += count;
+
+            if (this.filled === this.block.length) {
+                this.port.postMessage(this.block);
+                this.block = new Float32Array(4096);
+                this.filled = 0;
+            }
+        }
+        return true;
+    }
+
+    flush() {
+        // The last, partial block, then a marker that nothing else follows
+        if (this.filled > 0) {
+            this.port.postMessage(this.block.slice(0, this.filled));
+            this.filled = 0;
+        }
+        this.port.postMessage({ done: true });
+    }
+}
+
+registerProcessor('pcm-capture', PcmCaptureProcessor);
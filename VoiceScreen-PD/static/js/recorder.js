@@ -10,6 +10,26 @@ class AudioRecorder {
         this.canvasContext = null;
         this.recordingTimer = null;
         this.recordingStartTime = null;
+        
+        // Live streaming of raw PCM to /stream while recording
+        this.streamingEnabled = true;
+        this.streamReady = null;
+        this.streamQueue = Promise.resolve();
+        this.streamFailed = false;
+        this.streamCaptureDone = null;
+        this.pcmChunks = [];
+        this.pcmLength = 0;
+        this.captureNode = null;
+        
+        // On-device processing: an AudioWorklet computes the per-frame
+        // statistics and the recording is posted as 16-bit PCM to /analyze/pcm
+        this.preExtractEnabled = false;
+        this.preExtractConfig = null;
+        this.preExtractReady = null;
+        this.preExtractDone = null;
+        this.preExtracted = null;
+        this.pcmParts = [];
+        this.statsParts = [];
     }
 
     async startRecording(visualizerCanvas) {
@@ -26,7 +46,17 @@ class AudioRecorder {
             this.mediaRecorder = new MediaRecorder(this.stream);
             this.audioChunks = [];
             
-            this.setupAudioVisualization(visualizerCanvas);
+            // The audio graph must run at the server's analysis rate
+            if (this.preExtractEnabled && !this.preExtractConfig) {
+                this.preExtractConfig = await this.fetchPreExtractConfig();
+            }
+            const preExtract = this.preExtractEnabled && this.preExtractConfig;
+            this.setupAudioVisualization(visualizerCanvas, preExtract ? this.preExtractConfig.sample_rate : null);
+            if (preExtract) {
+                this.preExtractReady = this.openPreExtraction(this.preExtractConfig);
+            } else if (this.streamingEnabled) {
+                this.streamReady = this.openStream();
+            }
             
             this.mediaRecorder.ondataavailable = (event) => {
                 if (event.data.size > 0) {
@@ -51,8 +81,11 @@ class AudioRecorder {
     stopRecording() {
         return new Promise((resolve) => {
             if (this.mediaRecorder && this.isRecording) {
-                this.mediaRecorder.onstop = () => {
+                this.mediaRecorder.onstop = async () => {
                     const audioBlob = new Blob(this.audioChunks, { type: 'audio/wav' });
+                    // The last frames need the worklet's trailing pad before the graph closes
+                    await this.flushPreExtraction();
+                    await this.flushStreamCapture();
                     this.cleanup();
                     resolve(audioBlob);
                 };
@@ -71,20 +104,258 @@ class AudioRecorder {
         });
     }
 
-    setupAudioVisualization(canvas) {
+    setupAudioVisualization(canvas, sampleRate) {
         this.canvas = canvas;
         this.canvasContext = canvas.getContext('2d');
         
-        this.audioContext = new (window.AudioContext || window.webkitAudioContext)();
+        const AudioContextClass = window.AudioContext || window.webkitAudioContext;
+        try {
+            this.audioContext = sampleRate ? new AudioContextClass({ sampleRate }) : new AudioContextClass();
+            this.sourceNode = this.audioContext.createMediaStreamSource(this.stream);
+        } catch (error) {
+            // Some browsers cannot resample the microphone to another rate
+            console.warn('Using the default audio rate:', error);
+            if (this.audioContext) this.audioContext.close();
+            this.audioContext = new AudioContextClass();
+            this.sourceNode = this.audioContext.createMediaStreamSource(this.stream);
+        }
         this.analyser = this.audioContext.createAnalyser();
         this.analyser.fftSize = 256;
-        
-        const source = this.audioContext.createMediaStreamSource(this.stream);
-        source.connect(this.analyser);
+        this.sourceNode.connect(this.analyser);
         
         this.visualize();
     }
 
+    async openStream() {
+        this.streamFailed = false;
+        this.streamQueue = Promise.resolve();
+        this.pcmChunks = [];
+        this.pcmLength = 0;
+        
+        try {
+            if (!this.audioContext.audioWorklet) {
+                throw new Error('AudioWorklet not supported');
+            }
+            await this.audioContext.audioWorklet.addModule('/static/js/pcm-capture-processor.js');
+            if (!this.audioContext) {
+                return null;
+            }
+            
+            // Capture starts now; chunks are held until the session exists
+            let finished;
+            this.streamCaptureDone = new Promise((resolve) => { finished = resolve; });
+            this.captureNode = new AudioWorkletNode(this.audioContext, 'pcm-capture');
+            this.captureNode.port.onmessage = (event) => {
+                if (event.data.done) {
+                    finished(true);
+                    return;
+                }
+                this.queuePcm(event.data);
+            };
+            this.sourceNode.connect(this.captureNode);
+            // The processor outputs silence; connecting keeps it pulled by the graph
+            this.captureNode.connect(this.audioContext.destination);
+            
+            const response = await fetch('/stream', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ sample_rate: this.audioContext.sampleRate, format: 'f32' })
+            });
+            if (!response.ok) {
+                throw new Error(`Server error: ${response.status}`);
+            }
+            return await response.json();
+        } catch (error) {
+            console.warn('Live streaming unavailable, will upload after recording:', error);
+            this.streamFailed = true;
+            return null;
+        }
+    }
+
+    async fetchPreExtractConfig() {
+        try {
+            const response = await fetch('/analyze/pcm');
+            return response.ok ? await response.json() : null;
+        } catch (error) {
+            console.warn('On-device processing unavailable:', error);
+            return null;
+        }
+    }
+
+    async openPreExtraction(config) {
+        this.pcmParts = [];
+        this.statsParts = [];
+        
+        try {
+            if (!this.audioContext.audioWorklet) {
+                throw new Error('AudioWorklet not supported');
+            }
+            if (this.audioContext.sampleRate !== config.sample_rate) {
+                throw new Error(`Audio runs at ${this.audioContext.sampleRate} Hz, not ${config.sample_rate} Hz`);
+            }
+            await this.audioContext.audioWorklet.addModule('/static/js/feature-capture-processor.js');
+            if (!this.audioContext) {
+                return false;
+            }
+            
+            let finished;
+            this.preExtractDone = new Promise((resolve) => { finished = resolve; });
+            this.captureNode = new AudioWorkletNode(this.audioContext, 'feature-capture', {
+                processorOptions: {
+                    sampleRate: config.sample_rate,
+                    nFft: config.n_fft,
+                    hopLength: config.hop_length
+                }
+            });
+            let complete = false;
+            this.captureNode.port.onmessage = (event) => {
+                if (complete) return;
+                if (event.data.done) {
+                    complete = true;
+                    finished(event.data);
+                    return;
+                }
+                this.pcmParts.push(event.data.pcm);
+                this.statsParts.push(event.data.stats);
+            };
+            this.sourceNode.connect(this.captureNode);
+            // The processor outputs silence; connecting keeps it pulled by the graph
+            this.captureNode.connect(this.audioContext.destination);
+            return true;
+        } catch (error) {
+            console.warn('On-device processing unavailable, streaming instead:', error);
+            if (this.streamingEnabled && this.audioContext) {
+                this.streamReady = this.openStream();
+            }
+            return false;
+        }
+    }
+
+    async flushPreExtraction() {
+        if (!this.preExtractReady || this.preExtracted) return;
+        
+        this.preExtracted = this.preExtractReady.then(async (open) => {
+            if (!open || !this.captureNode) return null;
+            this.captureNode.port.postMessage('flush');
+            const timeout = new Promise((resolve) => setTimeout(() => resolve(null), 2000));
+            const done = await Promise.race([this.preExtractDone, timeout]);
+            if (!done) return null;
+            return {
+                pcm: new Blob(this.pcmParts, { type: 'application/octet-stream' }),
+                stats: new Blob(this.statsParts, { type: 'application/octet-stream' })
+            };
+        }).catch((error) => {
+            console.warn('On-device processing failed:', error);
+            return null;
+        });
+        await this.preExtracted;
+    }
+
+    async finishPreExtraction() {
+        // Resolves to the analysis results, or null to fall back to uploading
+        const preExtracted = this.preExtracted;
+        this.preExtracted = null;
+        this.preExtractReady = null;
+        if (!preExtracted) return null;
+        
+        try {
+            const capture = await preExtracted;
+            if (!capture) return null;
+            
+            const formData = new FormData();
+            formData.append('audio', capture.pcm, 'recording.pcm');
+            formData.append('frame_stats', capture.stats, 'frame_stats.f32');
+            formData.append('sample_rate', String(this.preExtractConfig.sample_rate));
+            const response = await fetch('/analyze/pcm', { method: 'POST', body: formData });
+            if (!response.ok) return null;
+            
+            const results = await response.json();
+            return results.error ? null : results;
+        } catch (error) {
+            console.warn('Pre-extracted analysis failed:', error);
+            return null;
+        }
+    }
+
+    async flushStreamCapture() {
+        // The worklet holds up to one partial block; collect it before the graph closes
+        const captureDone = this.streamCaptureDone;
+        this.streamCaptureDone = null;
+        if (!captureDone || !this.captureNode || this.streamFailed) return;
+        
+        this.captureNode.port.postMessage('flush');
+        const timeout = new Promise((resolve) => setTimeout(() => resolve(null), 2000));
+        await Promise.race([captureDone, timeout]);
+    }
+
+    queuePcm(samples) {
+        // Blocks still arrive after stop until the worklet is flushed
+        if (this.streamFailed) return;
+        
+        this.pcmChunks.push(samples);
+        this.pcmLength += samples.length;
+        
+        // Send roughly every half second of audio
+        if (this.audioContext && this.pcmLength >= this.audioContext.sampleRate / 2) {
+            this.flushPcm();
+        }
+    }
+
+    flushPcm() {
+        if (this.pcmLength === 0) return;
+        
+        const chunk = new Float32Array(this.pcmLength);
+        let offset = 0;
+        for (const part of this.pcmChunks) {
+            chunk.set(part, offset);
+            offset += part.length;
+        }
+        this.pcmChunks = [];
+        this.pcmLength = 0;
+        
+        // Chunks must arrive in order, so each upload waits for the previous one
+        this.streamQueue = this.streamQueue.then(async () => {
+            const session = await this.streamReady;
+            if (!session || this.streamFailed) return;
+            
+            const response = await fetch(session.chunk_url, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/octet-stream' },
+                body: chunk.buffer
+            });
+            if (!response.ok) {
+                this.streamFailed = true;
+            }
+        }).catch((error) => {
+            console.warn('Streaming chunk failed:', error);
+            this.streamFailed = true;
+        });
+    }
+
+    async finishStream() {
+        // Resolves to the analysis results, or null to fall back to uploading
+        if (!this.streamReady) return null;
+        
+        const streamReady = this.streamReady;
+        this.streamReady = null;
+        
+        try {
+            const session = await streamReady;
+            this.flushPcm();
+            await this.streamQueue;
+            if (!session || this.streamFailed) return null;
+            
+            const response = await fetch(session.finish_url, { method: 'POST' });
+            if (!response.ok) return null;
+            
+            const results = await response.json();
+            return results.error ? null : results;
+        } catch (error) {
+            console.warn('Finishing stream failed:', error);
+            return null;
+        }
+    }
+
     visualize() {
         if (!this.isRecording || !this.analyser) return;
 
@@ -140,6 +411,12 @@ class AudioRecorder {
     }
 
     cleanup() {
+        if (this.captureNode) {
+            this.captureNode.port.onmessage = null;
+            this.captureNode.disconnect();
+            this.captureNode = null;
+        }
+        this.sourceNode = null;
         if (this.audioContext) {
             this.audioContext.close();
             this.audioContext = null;
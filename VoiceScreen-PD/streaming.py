@@ -0,0 +1,612 @@
+"""Incremental feature extraction for audio that arrives in chunks.
+
+``StreamingExtractor`` consumes PCM while the user is still speaking. Each
+chunk is framed exactly like the batch engine frames the whole signal
+(centered, zero padded, same hop), so every analysis frame is identical;
+per-frame results are folded into running accumulators (Welford/Chan mean
+and variance, min/max, perturbation sums). ``finish`` only has to process
+the last few frames, so the final result is ready within milliseconds of
+the last chunk.
+
+The fast (YIN) pitch backend is always used: pyin's Viterbi decoding needs
+the whole utterance. Voice-activity gating needs the loudest frame of the
+whole recording, so the per-frame values it selects from are kept and the
+gate is applied in ``finish``. With ``pitch_backend='fast'`` the streamed
+features match ``FeatureEngine.extract`` up to floating point summation
+order, with or without VAD.
+"""
+import threading
+import time
+import uuid
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from feature_engine import dct_matrix
+from perturbation import N_SUMS, perturbation_frame_sums, perturbation_from_sums, perturbation_sums
+from pitch import DEFAULT_PITCH_STATS, pitch_stats, yin_track
+from vad import active_spans, voice_activity
+
+try:
+    import soxr
+    soxr_available = True
+except ImportError:
+    soxr_available = False
+
+SAMPLE_FORMATS = {'f32': np.dtype('<f4'), 's16': np.dtype('<i2')}
+
+
+class RunningStats:
+    """Running mean/variance over batches of rows (Chan et al. merge)"""
+
+    def __init__(self, size=1):
+        self.count = 0
+        self.mean = np.zeros(size, dtype=np.float64)
+        self.m2 = np.zeros(size, dtype=np.float64)
+
+    def update(self, values):
+        n = len(values)
+        if n == 0:
+            return
+        values = np.asarray(values, dtype=np.float64).reshape(n, -1)
+        batch_mean = values.mean(axis=0)
+        batch_m2 = np.square(values - batch_mean).sum(axis=0)
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self.m2 = self.m2 + batch_m2 + np.square(delta) * (self.count * n / total)
+        self.count = total
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / self.count) if self.count else np.zeros_like(self.m2)
+
+
+class FrameBuffer:
+    """Engine frames of a signal that arrives in chunks
+
+    Frames are cut exactly like ``FeatureEngine.frame`` cuts the whole
+    signal (centered, zero padded, same hop). Only the samples shared with
+    frames that are not complete yet are carried over, so the buffer never
+    holds more than one frame plus one chunk.
+    """
+
+    def __init__(self, engine, input_sr=None):
+        self.n_fft = engine.n_fft
+        self.hop_length = engine.hop_length
+        self.input_sr = input_sr or engine.sr
+        self._resampler = None
+        if self.input_sr != engine.sr:
+            if not soxr_available:
+                raise RuntimeError("soxr is required to stream at a different sample rate")
+            self._resampler = soxr.ResampleStream(self.input_sr, engine.sr, 1, dtype='float32')
+        # The buffer starts with the same zero padding the batch framing adds
+        self._buffer = np.zeros(self.n_fft // 2, dtype=np.float32)
+        self.samples = 0
+        self.frames = 0
+
+    @property
+    def resampling(self):
+        return self._resampler is not None
+
+    def resample(self, samples, last=False):
+        """``samples`` at the engine rate (unchanged when no resampling is needed)"""
+        if self._resampler is None:
+            return samples
+        return self._resampler.resample_chunk(samples, last=last)
+
+    def push(self, samples):
+        """Add engine-rate samples; returns the frames completed by them"""
+        self.samples += len(samples)
+        return self._cut(np.concatenate([self._buffer, samples]) if len(samples) else self._buffer)
+
+    def flush(self):
+        """Add the trailing padding, as in FeatureEngine.frame; returns the last frames"""
+        tail = self.n_fft // 2
+        short = self.n_fft - (self.samples + self.n_fft // 2 * 2)
+        if short > 0:
+            tail += short
+        return self._cut(np.concatenate([self._buffer, np.zeros(tail, dtype=np.float32)]))
+
+    def _cut(self, buffer):
+        n_fft, hop = self.n_fft, self.hop_length
+        if len(buffer) < n_fft:
+            self._buffer = buffer
+            return np.zeros((0, n_fft), dtype=np.float32)
+        n_frames = (len(buffer) - n_fft) // hop + 1
+        frames = sliding_window_view(buffer, n_fft)[::hop][:n_frames]
+        self._buffer = buffer[n_frames * hop:].copy()
+        self.frames += n_frames
+        return frames
+
+
+class StreamTooLong(ValueError):
+    """A stream ran past its maximum duration"""
+
+
+class StreamingExtractor:
+    """Feed PCM chunks, then ``finish()`` for the extract_voice_features dict
+
+    With VAD enabled, which frames count depends on the loudest frame of
+    the whole stream, so the per-frame values the gate selects from (RMS,
+    ZCR, spectral centroid, f0, owned-hop energy, perturbation sums and the
+    log-mel spectrum) are kept per chunk and reduced over the active frames
+    in ``finish()``, exactly as ``FeatureEngine.extract`` reduces them.
+    That is about 25 kB per second of audio, so ``max_seconds`` caps the
+    stream length and ``feed`` raises StreamTooLong past it.
+    """
+
+    def __init__(self, engine, input_sr=None, max_seconds=None):
+        self.engine = engine
+        self._frames = FrameBuffer(engine, input_sr)
+        self.input_sr = self._frames.input_sr
+        self.max_samples = None if max_seconds is None else int(max_seconds * self.input_sr)
+        self._input_samples = 0
+        self._frame_index = 0
+        self._sum_squares = 0.0
+        self._max_amplitude = 0.0
+        self._step = max(1, engine.n_fft // engine.hop_length)
+        # One dict of per-frame arrays per processed block of frames
+        self._chunks = []
+        self.timings = {}
+        self.finished = False
+
+    def _time(self, stage, start):
+        self.timings[stage] = self.timings.get(stage, 0.0) + time.perf_counter() - start
+
+    def feed(self, samples):
+        """Add a chunk of mono float32 samples at ``input_sr``"""
+        if self.finished:
+            raise RuntimeError("Stream already finished")
+        samples = np.asarray(samples, dtype=np.float32)
+        if self.max_samples is not None and self._input_samples + len(samples) > self.max_samples:
+            raise StreamTooLong(f"Streams are limited to {self.max_samples / self.input_sr:g} seconds")
+        self._input_samples += len(samples)
+        if self._frames.resampling:
+            start = time.perf_counter()
+            samples = self._frames.resample(samples)
+            self._time('resample', start)
+        self._append(samples)
+        return self._frame_index
+
+    def _append(self, samples):
+        if len(samples):
+            start = time.perf_counter()
+            self._sum_squares += float(np.dot(samples.astype(np.float64), samples))
+            self._max_amplitude = max(self._max_amplitude, float(np.max(np.abs(samples))))
+            self._time('amplitude', start)
+        frames = self._frames.push(samples)
+        if len(frames):
+            self._process(frames)
+
+    def _process(self, frames):
+        engine = self.engine
+        chunk = {}
+
+        start = time.perf_counter()
+        # Each frame owns the hop of samples around its centre (see
+        # FeatureEngine._sample_ranges); the gated RMS sums these
+        own = engine.n_fft // 2 - engine.hop_length // 2
+        hops = frames[:, own:own + engine.hop_length].astype(np.float64)
+        chunk['energy'] = np.einsum('ij,ij->i', hops, hops)
+        chunk['rms'] = engine.frame_rms(frames)
+        self._time('amplitude', start)
+
+        start = time.perf_counter()
+        chunk['f0'], chunk['voiced'] = yin_track(frames, engine.sr)
+        self._time('pitch', start)
+
+        start = time.perf_counter()
+        # Gated analysis takes every step-th *active* frame, which is only
+        # known at finish(); ungated it is every step-th frame of the stream
+        voiced = chunk['voiced']
+        if not engine.vad:
+            voiced = voiced & ((self._frame_index + np.arange(len(frames))) % self._step == 0)
+        chunk['perturbation'] = perturbation_frame_sums(frames, chunk['f0'], voiced, engine.sr)
+        self._time('perturbation', start)
+
+        start = time.perf_counter()
+        S = engine.magnitude_spectrogram(frames)
+        self._time('stft', start)
+
+        start = time.perf_counter()
+        chunk['centroid'] = engine.spectral_centroid(S)
+        chunk['zcr'] = engine.zero_crossing_rate(frames)
+        self._time('spectral', start)
+
+        start = time.perf_counter()
+        chunk['log_mel'] = engine.log_mel(S).astype(np.float32)
+        self._time('mfcc', start)
+
+        self._chunks.append(chunk)
+        self._frame_index += len(frames)
+
+    def _column(self, name):
+        return np.concatenate([chunk[name] for chunk in self._chunks])
+
+    def finish(self):
+        """Flush the tail and return ``(features, timings)``"""
+        if self.finished:
+            raise RuntimeError("Stream already finished")
+        if self._frames.samples == 0 and not self._frames.resampling:
+            raise ValueError("No audio received")
+        finish_start = time.perf_counter()
+        engine = self.engine
+
+        if self._frames.resampling:
+            self._append(self._frames.resample(np.zeros(0, dtype=np.float32), last=True))
+        if self._frames.samples == 0:
+            raise ValueError("No audio received")
+
+        frames = self._frames.flush()
+        if len(frames):
+            self._process(frames)
+        self.finished = True
+
+        features = {}
+        mask = None
+        zcr = self._column('zcr')
+        if engine.vad:
+            start = time.perf_counter()
+            active = voice_activity(self._column('rms'), zcr)
+            features['voiced_fraction'] = float(active.mean())
+            # Nothing detected: analyse everything, as the batch engine does
+            if active.any() and not active.all():
+                mask = active
+            self._time('vad', start)
+
+        def analysed(name):
+            column = self._column(name)
+            return column if mask is None else column[mask]
+
+        start = time.perf_counter()
+        if mask is None:
+            features['rms_energy'] = float(np.sqrt(self._sum_squares / self._frames.samples))
+        else:
+            ranges = engine._sample_ranges(active_spans(mask), self._frames.samples)
+            n_samples = sum(b - a for a, b in ranges)
+            features['rms_energy'] = float(np.sqrt(analysed('energy').sum() / max(1, n_samples)))
+        features['max_amplitude'] = self._max_amplitude
+        self._time('amplitude', start)
+
+        features.update(pitch_stats(analysed('f0'), analysed('voiced')))
+        sums = analysed('perturbation')
+        if engine.vad:
+            sums = sums[::self._step]
+        features.update(perturbation_from_sums(sums.sum(axis=0)))
+        features['spectral_centroid_mean'] = float(np.mean(analysed('centroid')))
+        features['zcr_mean'] = float(np.mean(zcr if mask is None else zcr[mask]))
+
+        start = time.perf_counter()
+        # Chunk by chunk, so the log-mel spectrum is never copied whole
+        cepstrum = CepstrumStats(engine)
+        log_mels = [chunk.pop('log_mel') for chunk in self._chunks]
+        if mask is not None:
+            bounds = np.cumsum([0] + [len(log_mel) for log_mel in log_mels])
+            log_mels = [log_mel[mask[a:b]] for log_mel, a, b in zip(log_mels, bounds, bounds[1:])]
+        cepstrum.peak = max(float(log_mel.max()) for log_mel in log_mels if len(log_mel))
+        for log_mel in log_mels:
+            cepstrum.add(log_mel, final=True)
+        mfcc_mean, mfcc_std = cepstrum.mean_std()
+        for i in range(engine.n_mfcc):
+            features[f'mfcc_{i+1}_mean'] = float(mfcc_mean[i])
+            features[f'mfcc_{i+1}_std'] = float(mfcc_std[i])
+        self._chunks = []
+        self._time('mfcc', start)
+
+        self.timings['finalize'] = time.perf_counter() - finish_start
+        return features, dict(self.timings)
+
+
+class CepstrumStats:
+    """Running MFCC mean/std that does not keep the log-mel frames
+
+    MFCCs floor the log-mel at ``top_db`` below its peak over the whole
+    recording, which is only known at the end. Values already below the
+    running floor (peak so far minus top_db) stay below the final one, so
+    they enter through separate sums that are multiplied by the final floor.
+    Values kept as they are become wrong only if the peak later rises past
+    them; then the sums restart and ``replay_until`` marks the frames a
+    second pass has to add again with the final floor (``add(final=True)``).
+    """
+
+    def __init__(self, engine):
+        self.top_db = engine.top_db
+        self.dct = dct_matrix(engine.n_mfcc, engine.n_mels).T.astype(np.float64)
+        self.peak = -np.inf
+        self.replay_until = 0
+        self._restart()
+
+    def _restart(self):
+        self.count = 0
+        # Per coefficient: sum a, sum a^2, sum a*b, sum b, sum b^2, where a
+        # is the cepstrum of the kept values and b of the floored positions
+        self._sums = np.zeros((5, self.dct.shape[1]), dtype=np.float64)
+        self._lowest_kept = np.inf
+
+    @property
+    def floor(self):
+        return -np.inf if self.top_db is None else self.peak - self.top_db
+
+    def add(self, log_mel, first_frame=0, final=False):
+        """Fold in log-mel frames; ``first_frame`` is the index of the first one"""
+        if not len(log_mel):
+            return
+        log_mel = np.asarray(log_mel, dtype=np.float64)
+        if not final:
+            peak = float(log_mel.max())
+            if peak > self.peak:
+                self.peak = peak
+                if self._lowest_kept < self.floor:
+                    self._restart()
+                    self.replay_until = first_frame
+        kept = log_mel >= self.floor
+        a = np.where(kept, log_mel, 0.0) @ self.dct
+        b = (~kept).astype(np.float64) @ self.dct
+        self._sums += np.stack([a.sum(axis=0), (a * a).sum(axis=0), (a * b).sum(axis=0),
+                                b.sum(axis=0), (b * b).sum(axis=0)])
+        self.count += len(log_mel)
+        if kept.any():
+            self._lowest_kept = min(self._lowest_kept, float(log_mel[kept].min()))
+
+    def mean_std(self):
+        """Per-coefficient mean and standard deviation"""
+        floor = 0.0 if self.top_db is None else self.floor
+        sum_a, sum_aa, sum_ab, sum_b, sum_bb = self._sums
+        mean = (sum_a + floor * sum_b) / self.count
+        square = (sum_aa + 2.0 * floor * sum_ab + floor * floor * sum_bb) / self.count
+        return mean, np.sqrt(np.maximum(square - mean * mean, 0.0))
+
+
+class BlockExtractor:
+    """``FeatureEngine.extract`` for a recording read block by block
+
+    ``read_blocks()`` must return a fresh iterator over mono float32 blocks
+    at ``input_sr`` each time it is called (see audio_io.read_blocks). Only
+    one block, the frames cut from it and fixed-size running statistics are
+    held at a time, so peak memory does not depend on the recording length.
+    The recording is read up to three times:
+
+    1. with VAD, frame RMS only: the gate threshold needs the loudest frame;
+    2. all features, folded into running statistics;
+    3. if the MFCC floor moved under already counted values (see
+       CepstrumStats), the spectrum of the frames before that point.
+
+    Pitch always uses the YIN backend, as for live streams. The features
+    match ``FeatureEngine.extract`` up to summation order, plus the block
+    edges of the streaming resampler when ``input_sr`` differs.
+    """
+
+    def __init__(self, engine, input_sr=None):
+        self.engine = engine
+        self.input_sr = input_sr or engine.sr
+        self.timings = {}
+
+    def _time(self, stage, start):
+        self.timings[stage] = self.timings.get(stage, 0.0) + time.perf_counter() - start
+
+    def _blocks(self, read_blocks, stop_frame=None):
+        """Yield ``(samples, first_frame, frames, n_samples)`` for one pass"""
+        buffer = FrameBuffer(self.engine, self.input_sr)
+        for block in read_blocks():
+            start = time.perf_counter()
+            samples = buffer.resample(np.asarray(block, dtype=np.float32))
+            if buffer.resampling:
+                self._time('resample', start)
+            frames = buffer.push(samples)
+            yield samples, buffer.frames - len(frames), frames, buffer.samples
+            if stop_frame is not None and buffer.frames >= stop_frame:
+                return
+        if buffer.resampling:
+            samples = buffer.resample(np.zeros(0, dtype=np.float32), last=True)
+            frames = buffer.push(samples)
+            yield samples, buffer.frames - len(frames), frames, buffer.samples
+        if buffer.samples == 0:
+            raise ValueError("No audio received")
+        frames = buffer.flush()
+        yield samples[:0], buffer.frames - len(frames), frames, buffer.samples
+
+    def _gate(self, frames):
+        """``(mask or None, zcr)`` for frames under the recording's VAD threshold"""
+        zcr = self.engine.zero_crossing_rate(frames)
+        if not self._gated:
+            return None, zcr
+        return voice_activity(self.engine.frame_rms(frames), zcr, peak=self._rms_peak), zcr
+
+    def extract(self, read_blocks):
+        """Run the passes; returns ``(features, timings)``"""
+        self._gated = self.engine.vad
+        if self._gated:
+            start = time.perf_counter()
+            self._rms_peak = 0.0
+            for _, _, frames, _ in self._blocks(read_blocks):
+                if len(frames):
+                    self._rms_peak = max(self._rms_peak, float(np.max(self.engine.frame_rms(frames))))
+            self._time('vad', start)
+
+        features = self._analyse(read_blocks)
+        if self._gated and self._active == 0:
+            # Nothing passed the gate: analyse everything, as the engine does
+            self._gated = False
+            features = {'voiced_fraction': 0.0, **self._analyse(read_blocks)}
+
+        if self._cepstrum.replay_until:
+            self._replay(read_blocks)
+        start = time.perf_counter()
+        mean, std = self._cepstrum.mean_std()
+        for i in range(self.engine.n_mfcc):
+            features[f'mfcc_{i+1}_mean'] = float(mean[i])
+            features[f'mfcc_{i+1}_std'] = float(std[i])
+        self._time('mfcc', start)
+        return features, dict(self.timings)
+
+    def _analyse(self, read_blocks):
+        engine = self.engine
+        step = max(1, engine.n_fft // engine.hop_length)
+        offset = engine.n_fft // 2 - engine.hop_length // 2
+        sum_squares, max_amplitude = 0.0, 0.0
+        span_squares, span_samples = 0.0, 0
+        f0_stats, f0_min, f0_max = RunningStats(), np.inf, -np.inf
+        perturbation = np.zeros(N_SUMS, dtype=np.float64)
+        centroid, zcr_stats = RunningStats(), RunningStats()
+        self._cepstrum = CepstrumStats(engine)
+        self._frames = self._active = 0
+        n_samples = 0
+
+        for samples, first_frame, frames, n_samples in self._blocks(read_blocks):
+            start = time.perf_counter()
+            if len(samples):
+                sum_squares += float(np.dot(samples.astype(np.float64), samples))
+                max_amplitude = max(max_amplitude, float(np.max(np.abs(samples))))
+            self._time('amplitude', start)
+            if not len(frames):
+                continue
+
+            start = time.perf_counter()
+            mask, zcr = self._gate(frames)
+            self._frames += len(frames)
+            if mask is not None:
+                # Each frame owns the hop around its centre (FeatureEngine._sample_ranges)
+                index = first_frame + np.flatnonzero(mask)
+                frames, zcr = frames[mask], zcr[mask]
+                owned = frames[:, offset:offset + engine.hop_length].astype(np.float64)
+                span_squares += float(np.einsum('ij,ij->', owned, owned))
+                begin = index * engine.hop_length - engine.hop_length // 2
+                span_samples += int(np.sum(np.minimum(begin + engine.hop_length, n_samples)
+                                           - np.maximum(begin, 0)))
+                self._time('vad', start)
+            first_active = self._active
+            self._active += len(frames)
+            if not len(frames):
+                continue
+
+            start = time.perf_counter()
+            f0, voiced = yin_track(frames, engine.sr)
+            f0_voiced = f0[voiced & ~np.isnan(f0)]
+            f0_stats.update(f0_voiced)
+            if len(f0_voiced):
+                f0_min = min(f0_min, float(f0_voiced.min()))
+                f0_max = max(f0_max, float(f0_voiced.max()))
+            self._time('pitch', start)
+
+            start = time.perf_counter()
+            perturbation += perturbation_sums(frames, f0, voiced, engine.sr, step=step,
+                                              first_frame=first_active)
+            self._time('perturbation', start)
+
+            start = time.perf_counter()
+            S = engine.magnitude_spectrogram(frames)
+            self._time('stft', start)
+
+            start = time.perf_counter()
+            centroid.update(engine.spectral_centroid(S))
+            zcr_stats.update(zcr)
+            self._time('spectral', start)
+
+            start = time.perf_counter()
+            self._cepstrum.add(engine.log_mel(S), first_frame)
+            self._time('mfcc', start)
+
+        features = {}
+        if self._gated:
+            features['voiced_fraction'] = self._active / self._frames
+        if self._gated and self._active < self._frames:
+            features['rms_energy'] = float(np.sqrt(span_squares / max(1, span_samples)))
+        else:
+            features['rms_energy'] = float(np.sqrt(sum_squares / n_samples))
+        features['max_amplitude'] = max_amplitude
+        if f0_stats.count:
+            features.update({'mean_f0': float(f0_stats.mean[0]), 'std_f0': float(f0_stats.std[0]),
+                             'f0_range': f0_max - f0_min})
+        else:
+            features.update(DEFAULT_PITCH_STATS)
+        features.update(perturbation_from_sums(perturbation))
+        features['spectral_centroid_mean'] = float(centroid.mean[0])
+        features['zcr_mean'] = float(zcr_stats.mean[0])
+        return features
+
+    def _replay(self, read_blocks):
+        """Add the frames before ``replay_until`` with the final MFCC floor"""
+        engine = self.engine
+        stop = self._cepstrum.replay_until
+        for _, first_frame, frames, _ in self._blocks(read_blocks, stop_frame=stop):
+            frames = frames[:max(0, stop - first_frame)]
+            if not len(frames):
+                continue
+            mask, _ = self._gate(frames)
+            if mask is not None:
+                frames = frames[mask]
+            start = time.perf_counter()
+            S = engine.magnitude_spectrogram(frames)
+            self._time('stft', start)
+            start = time.perf_counter()
+            self._cepstrum.add(engine.log_mel(S), first_frame, final=True)
+            self._time('mfcc', start)
+
+
+class StreamSessions:
+    """Open streaming sessions, with an idle timeout and a session limit"""
+
+    def __init__(self, engine, max_sessions=64, idle_timeout=120, max_seconds=None):
+        self.engine = engine
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_seconds = max_seconds
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def open(self, sample_rate=None, sample_format='f32'):
+        """Create a session and return its id"""
+        if sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f"Unsupported sample format {sample_format!r}")
+        extractor = StreamingExtractor(self.engine, input_sr=sample_rate,
+                                       max_seconds=self.max_seconds)
+        with self._lock:
+            self._expire()
+            if len(self._sessions) >= self.max_sessions:
+                raise RuntimeError("Too many open streams")
+            stream_id = uuid.uuid4().hex
+            self._sessions[stream_id] = {
+                'extractor': extractor,
+                'dtype': SAMPLE_FORMATS[sample_format],
+                'lock': threading.Lock(),
+                'last_seen': time.time()
+            }
+        return stream_id
+
+    def _expire(self):
+        cutoff = time.time() - self.idle_timeout
+        for stream_id in [key for key, session in self._sessions.items()
+                          if session['last_seen'] < cutoff]:
+            del self._sessions[stream_id]
+
+    def feed(self, stream_id, data):
+        """Decode a raw PCM chunk and feed it; returns frames processed, or None"""
+        session = self._get(stream_id)
+        if session is None:
+            return None
+        samples = np.frombuffer(data, dtype=session['dtype'])
+        if session['dtype'].kind == 'i':
+            samples = samples.astype(np.float32) / 32768.0
+        with session['lock']:
+            return session['extractor'].feed(samples)
+
+    def finish(self, stream_id):
+        """Close the session and return ``(features, timings)``, or None"""
+        with self._lock:
+            session = self._sessions.pop(stream_id, None)
+        if session is None:
+            return None
+        with session['lock']:
+            return session['extractor'].finish()
+
+    def _get(self, stream_id):
+        with self._lock:
+            session = self._sessions.get(stream_id)
+            if session is not None:
+                session['last_seen'] = time.time()
+            return session
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
@@ -1,99 +1,173 @@
-import pandas as pd
+import argparse
 import numpy as np
-from sklearn.model_selection import train_test_split, cross_val_score
+from scipy.stats import randint, uniform
+from sklearn.model_selection import train_test_split, cross_val_score, RandomizedSearchCV
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, classification_report
-import xgboost as xgb
 import joblib
 import os
 
-def load_and_prepare_data():
+try:
+    import xgboost as xgb
+    xgboost_available = True
+except ImportError:
+    xgboost_available = False
+
+from compiled_model import SOURCE_PATHS, export_model
+from feature_schema import FEATURE_INDEX, FEATURE_NAMES, N_FEATURES, N_MFCC
+
+# Search spaces for RandomizedSearchCV
+PARAM_DISTRIBUTIONS = {
+    'xgb': {
+        'n_estimators': randint(50, 400),
+        'max_depth': randint(2, 8),
+        'learning_rate': uniform(0.02, 0.28),
+        'subsample': uniform(0.6, 0.4),
+        'colsample_bytree': uniform(0.5, 0.5),
+    },
+    'rf': {
+        'n_estimators': randint(50, 400),
+        'max_depth': [4, 6, 8, 10, 14, None],
+        'min_samples_leaf': randint(1, 8),
+        'max_features': ['sqrt', 'log2', 0.5],
+    },
+}
+
+def load_and_prepare_data(n_samples=1000, seed=42):
     """
     Load and prepare the Parkinson's dataset for training
     Note: You'll need to download the dataset from UCI first
     """
     # For demonstration, we'll create synthetic data
     # In practice, download from: https://archive.ics.uci.edu/ml/datasets/parkinsons
-    
+    # or pass --audio-dir to train on recordings
+
     print("Loading and preparing data...")
-    
-    # This is a placeholder - replace with actual dataset loading
-    # Example structure based on UCI Parkinson's dataset
-    n_samples = 1000
-    n_features = 26
-    
-    # Synthetic data for demonstration
-    X = np.random.randn(n_samples, n_features)
-    
+    rng = np.random.default_rng(seed)
+
+    # Synthetic data for demonstration, one column per schema feature
+    X = rng.standard_normal((n_samples, N_FEATURES))
+
     # Simulate Parkinson's patterns
     # Parkinson's patients typically have:
     # - Higher jitter and shimmer
     # - Lower HNR
     # - Different MFCC patterns
-    parkinsons_mask = np.random.choice([0, 1], n_samples, p=[0.7, 0.3])
-    
-    for i in range(n_samples):
-        if parkinsons_mask[i] == 1:
-            # Simulate Parkinson's voice characteristics
-            X[i, 4:8] += 0.5  # Higher jitter/shimmer
-            X[i, 8] -= 0.3    # Lower HNR
-            X[i, 9:22] += np.random.normal(0, 0.2, 13)  # Different MFCCs
-    
+    parkinsons_mask = rng.choice([0, 1], n_samples, p=[0.7, 0.3])
+    parkinsons = parkinsons_mask == 1
+
+    jitter_shimmer = [FEATURE_INDEX['jitter_relative'], FEATURE_INDEX['shimmer_relative']]
+    mfccs = [FEATURE_INDEX[f'mfcc_{i+1}_{stat}'] for stat in ('mean', 'std') for i in range(N_MFCC)]
+    X[np.ix_(parkinsons, jitter_shimmer)] += 0.5  # Higher jitter/shimmer
+    X[parkinsons, FEATURE_INDEX['hnr']] -= 0.3    # Lower HNR
+    X[np.ix_(parkinsons, mfccs)] += rng.normal(0, 0.2, (parkinsons.sum(), len(mfccs)))  # Different MFCCs
+
     y = parkinsons_mask
-    
-    return X, y
 
-def train_model():
+    return X, y, list(FEATURE_NAMES)
+
+def load_recordings(audio_dir, store_path, labels_csv=None, workers=None):
+    """Features for a directory of recordings, via the columnar feature store"""
+    from feature_store import build_feature_store, store_matrix
+
+    print(f"Extracting features from {audio_dir} ...")
+    store, stats = build_feature_store(audio_dir, store_path, labels_csv=labels_csv, workers=workers)
+    print(f"Feature store {store_path}: {stats['files']} files, {stats['reused']} reused, "
+          f"{stats['extracted']} extracted, {stats['failed']} failed in {stats['seconds']:.1f}s")
+
+    X, y, names = store_matrix(store, FEATURE_NAMES)
+    if len(np.unique(y)) < 2:
+        raise ValueError("Need labelled recordings of both classes (see feature_store.LABEL_NAMES)")
+    return X, y, names
+
+def make_estimator(kind, random_state=42):
+    """Unfitted estimator; single-threaded so the search parallelizes over fits"""
+    if kind == 'xgb':
+        return xgb.XGBClassifier(n_estimators=100, max_depth=6, learning_rate=0.1,
+                                 random_state=random_state, n_jobs=1)
+    return RandomForestClassifier(n_estimators=100, max_depth=10, random_state=random_state, n_jobs=1)
+
+def train_model(X=None, y=None, feature_names=None, kind=None, n_iter=20, n_jobs=-1, cv=5):
     """Train the Parkinson's detection model"""
-    
+
     # Load data
-    X, y = load_and_prepare_data()
-    
+    if X is None:
+        X, y, feature_names = load_and_prepare_data()
+    if kind is None:
+        kind = 'xgb' if xgboost_available else 'rf'
+    # The app only loads models trained on the serving schema
+    if feature_names is None:
+        feature_names = list(FEATURE_NAMES)
+    if X.shape[1] != N_FEATURES or list(feature_names) != list(FEATURE_NAMES):
+        raise ValueError("Training columns must follow feature_schema.FEATURE_NAMES")
+
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, random_state=42, stratify=y
     )
-    
+
     # Scale features
     scaler = StandardScaler()
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
-    
-    # Train XGBoost model
-    print("Training XGBoost model...")
-    model = xgb.XGBClassifier(
-        n_estimators=100,
-        max_depth=6,
-        learning_rate=0.1,
-        random_state=42
-    )
-    
-    model.fit(X_train_scaled, y_train)
-    
+
+    # Hyperparameter search: every (candidate, fold) fit runs on its own core
+    if n_iter > 0:
+        print(f"Searching {n_iter} {kind} configurations ({cv}-fold CV, n_jobs={n_jobs})...")
+        search = RandomizedSearchCV(
+            make_estimator(kind), PARAM_DISTRIBUTIONS[kind], n_iter=n_iter, cv=cv,
+            scoring='accuracy', n_jobs=n_jobs, random_state=42, refit=True
+        )
+        search.fit(X_train_scaled, y_train)
+        model = search.best_estimator_
+        print(f"Best parameters: {search.best_params_}")
+        print(f"Best CV accuracy: {search.best_score_:.3f}")
+    else:
+        print(f"Training {kind} model...")
+        model = make_estimator(kind)
+        model.fit(X_train_scaled, y_train)
+
     # Evaluate model
     y_pred = model.predict(X_test_scaled)
     accuracy = accuracy_score(y_test, y_pred)
-    
+
     print(f"Model Accuracy: {accuracy:.3f}")
     print("\nClassification Report:")
     print(classification_report(y_test, y_pred))
-    
-    # Cross-validation
-    cv_scores = cross_val_score(model, X_train_scaled, y_train, cv=5)
+
+    # Cross-validation (folds in parallel)
+    cv_scores = cross_val_score(model, X_train_scaled, y_train, cv=cv, n_jobs=n_jobs)
     print(f"Cross-validation scores: {cv_scores}")
     print(f"Mean CV accuracy: {cv_scores.mean():.3f} (+/- {cv_scores.std() * 2:.3f})")
-    
+
     # Save model and scaler
     if not os.path.exists('model'):
         os.makedirs('model')
-    
+
     joblib.dump(model, 'model/parkinson_model.pkl')
     joblib.dump(scaler, 'model/feature_scaler.pkl')
-    
+    export_model(model, scaler, feature_names=feature_names, source_paths=SOURCE_PATHS)
+
     print("Model and scaler saved successfully!")
-    
+
     return model, scaler, accuracy
 
 if __name__ == '__main__':
-    train_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the Parkinson's voice model")
+    parser.add_argument('--audio-dir', help='directory of recordings (healthy/ and parkinsons/ subfolders)')
+    parser.add_argument('--labels', help='optional CSV of path,label rows relative to --audio-dir')
+    parser.add_argument('--store', default='model/feature_store.npz', help='feature store file')
+    parser.add_argument('--workers', type=int, default=None, help='extraction processes (default: all cores)')
+    parser.add_argument('--model', choices=['xgb', 'rf'], default=None)
+    parser.add_argument('--n-iter', type=int, default=20, help='search candidates (0 = fixed parameters)')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='parallel fits (-1 = all cores)')
+    args = parser.parse_args()
+
+    if args.model == 'xgb' and not xgboost_available:
+        parser.error('xgboost is not installed')
+    if args.audio_dir:
+        X, y, names = load_recordings(args.audio_dir, args.store, args.labels, args.workers)
+        train_model(X, y, names, kind=args.model, n_iter=args.n_iter, n_jobs=args.n_jobs)
+    else:
+        train_model(kind=args.model, n_iter=args.n_iter, n_jobs=args.n_jobs)
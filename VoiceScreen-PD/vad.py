@@ -0,0 +1,42 @@
+"""Energy/ZCR voice-activity detection on the engine frames.
+
+A frame is active when its RMS is within ``threshold_db`` of the loudest
+frame and its zero crossing rate is below ``max_zcr`` (silence with hiss
+and breath noise crosses zero far more often than phonation). Centered
+2048-sample frames already straddle each onset and decay, so no hangover is
+applied by default: padding the mask with near-silent edge frames inflates
+mfcc_1_std (see benchmarks/bench_vad.py). Both inputs are already computed
+by the feature engine, so the mask costs a few vector operations.
+"""
+import numpy as np
+
+# Defaults for the web recorder: a sustained vowel is far above 35 dB
+# below its own peak, and voiced frames cross zero < 0.25 per sample at 22 kHz
+VAD_THRESHOLD_DB = 35.0
+VAD_MAX_ZCR = 0.25
+VAD_HANGOVER = 0
+
+
+def voice_activity(rms, zcr, threshold_db=VAD_THRESHOLD_DB, max_zcr=VAD_MAX_ZCR,
+                   hangover=VAD_HANGOVER, peak=None):
+    """Boolean per-frame activity mask from frame RMS and ZCR
+
+    ``peak`` is the loudest frame RMS of the recording; it defaults to the
+    maximum of ``rms``, and is passed in when the frames come in blocks.
+    """
+    rms = np.asarray(rms, dtype=np.float64)
+    if peak is None:
+        peak = rms.max() if len(rms) else 0.0
+    if peak <= 0:
+        return np.zeros(len(rms), dtype=bool)
+    active = (rms >= peak * 10.0 ** (-threshold_db / 20.0)) & (np.asarray(zcr) < max_zcr)
+    if hangover > 0 and active.any():
+        kernel = np.ones(2 * hangover + 1)
+        active = np.convolve(active, kernel, mode='same') > 0
+    return active
+
+
+def active_spans(mask):
+    """``[(start, stop), ...]`` frame ranges where ``mask`` is True"""
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], mask.astype(np.int8), [0]])))
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
@@ -0,0 +1,17 @@
+"""WSGI entry point for production serving.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Importing this module finishes the warm-up (model, librosa, optional
+pre-warm extraction). With ``preload_app`` the gunicorn master does that
+once before forking, so every worker starts ready and shares those pages
+copy-on-write instead of loading its own copy.
+"""
+import gc
+
+from app import app, warmup
+
+warmup.wait()
+# Move the warmed-up objects out of the collector's generations: a GC pass
+# in a worker would otherwise write to (and so copy) every shared page
+gc.freeze()